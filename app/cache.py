@@ -0,0 +1,178 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from app.common import metrics
+from app.common.logs import logger
+from app.config import settings
+from app.models import Task
+from app.schemas import TaskVersioned
+
+CACHE_HITS = metrics.counter(
+    "task_cache_hits_total", "Task cache lookups served from the cache."
+)
+CACHE_MISSES = metrics.counter(
+    "task_cache_misses_total", "Task cache lookups that went to the database."
+)
+CACHE_EVICTIONS = metrics.counter(
+    "task_cache_evictions_total",
+    "Task cache entries dropped because the cache was full.",
+)
+CACHE_ENTRIES = metrics.gauge(
+    "task_cache_entries", "Entries held by the in-process task cache."
+)
+
+
+class TaskCache:
+    """Cache of single tasks by id.
+
+    ``set`` only stores a task newer than the cached one, so a read that
+    loaded the task before a concurrent write cannot overwrite what the
+    write cached. ``delete`` leaves a tombstone for the TTL, for the same
+    reason: a read that started before the delete cannot bring the task
+    back.
+    """
+
+    async def get(self, task_id: UUID) -> TaskVersioned | None:
+        return None
+
+    async def set(self, task_id: UUID, task: Task | TaskVersioned) -> None:
+        pass
+
+    async def delete(self, task_id: UUID) -> None:
+        pass
+
+
+class MemoryTaskCache(TaskCache):
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # A None task is a tombstone left by delete().
+        self._entries: OrderedDict[
+            UUID, tuple[float, TaskVersioned | None]
+        ] = OrderedDict()
+        CACHE_ENTRIES.set_function(lambda: len(self._entries))
+
+    def _live(
+        self, task_id: UUID
+    ) -> tuple[float, TaskVersioned | None] | None:
+        entry = self._entries.get(task_id)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[task_id]
+            return None
+        return entry
+
+    async def get(self, task_id: UUID) -> TaskVersioned | None:
+        entry = self._live(task_id)
+        if entry is None or entry[1] is None:
+            CACHE_MISSES.inc()
+            return None
+        self._entries.move_to_end(task_id)
+        CACHE_HITS.inc()
+        return entry[1]
+
+    async def set(self, task_id: UUID, task: Task | TaskVersioned) -> None:
+        task = TaskVersioned.model_validate(task)
+        entry = self._live(task_id)
+        # No await between the check and the store: this is the
+        # compare-and-set.
+        if entry is not None and (
+            entry[1] is None or entry[1].version >= task.version
+        ):
+            return
+        self._store(task_id, task)
+
+    async def delete(self, task_id: UUID) -> None:
+        self._store(task_id, None)
+
+    def _store(self, task_id: UUID, task: TaskVersioned | None) -> None:
+        self._entries[task_id] = (time.monotonic() + self.ttl, task)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.inc()
+
+
+# Compare-and-set in one round trip: store ARGV[1] unless the key holds a
+# tombstone or a task whose version is at least ARGV[2].
+REDIS_SET_IF_NEWER = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    if current == ARGV[4] then
+        return 0
+    end
+    if cjson.decode(current).version >= tonumber(ARGV[2]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+return 1
+"""
+REDIS_TOMBSTONE = b"deleted"
+
+
+class RedisTaskCache(TaskCache):
+    def __init__(self, client, ttl: float, prefix: str = "task:") -> None:
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._set_if_newer = client.register_script(REDIS_SET_IF_NEWER)
+
+    async def get(self, task_id: UUID) -> TaskVersioned | None:
+        try:
+            payload = await self.client.get(f"{self.prefix}{task_id}")
+        except Exception as e:
+            logger.warning("Task cache read failed for %s: %s", task_id, e)
+            payload = None
+        if payload is None or payload == REDIS_TOMBSTONE:
+            CACHE_MISSES.inc()
+            return None
+        CACHE_HITS.inc()
+        return TaskVersioned.model_validate_json(payload)
+
+    async def set(self, task_id: UUID, task: Task | TaskVersioned) -> None:
+        task = TaskVersioned.model_validate(task)
+        try:
+            await self._set_if_newer(
+                keys=[f"{self.prefix}{task_id}"],
+                args=[
+                    task.model_dump_json(),
+                    task.version,
+                    int(self.ttl * 1000),
+                    REDIS_TOMBSTONE,
+                ],
+            )
+        except Exception as e:
+            logger.warning("Task cache write failed for %s: %s", task_id, e)
+
+    async def delete(self, task_id: UUID) -> None:
+        try:
+            await self.client.set(
+                f"{self.prefix}{task_id}",
+                REDIS_TOMBSTONE,
+                px=int(self.ttl * 1000),
+            )
+        except Exception as e:
+            logger.warning("Task cache delete failed for %s: %s", task_id, e)
+
+
+def build_task_cache() -> TaskCache:
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryTaskCache(
+            settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS
+        )
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+        return RedisTaskCache(
+            redis.from_url(settings.CACHE_REDIS_URL),
+            settings.CACHE_TTL_SECONDS,
+        )
+    return TaskCache()
+
+
+task_cache = build_task_cache()
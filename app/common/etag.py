@@ -0,0 +1,61 @@
+import hashlib
+from typing import Iterable
+
+# Codings applied by the compression middleware. A strong ETag must differ
+# per content coding (RFC 9110, section 8.8.3), so a compressed response
+# carries the identity ETag with "-<coding>" appended: "3-gzip".
+CONTENT_CODINGS = ("gzip", "br", "zstd")
+
+
+def task_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def list_etag(tasks: Iterable) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for task in tasks:
+        digest.update(task.id.bytes)
+        digest.update(task.version.to_bytes(8, "big"))
+    return f'"{digest.hexdigest()}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    return f'{etag[:-1]}-{coding}"'
+
+
+def _strip_coding(tag: str) -> str:
+    for coding in CONTENT_CODINGS:
+        suffix = f'-{coding}"'
+        if tag.endswith(suffix):
+            return tag.removesuffix(suffix) + '"'
+    return tag
+
+
+def _split(header: str) -> list[str]:
+    # Tags of compressed variants validate the identity representation too.
+    return [
+        _strip_coding(tag.strip()) for tag in header.split(",") if tag.strip()
+    ]
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110, section 13.1.2).
+    if not header:
+        return False
+    tags = _split(header)
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def if_match_versions(header: str | None) -> list[int] | None:
+    # None means unconditional. Weak and foreign tags never match a strong
+    # comparison, so they are dropped.
+    if not header:
+        return None
+    tags = _split(header)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
@@ -0,0 +1,20 @@
+import csv
+import io
+from typing import Iterable, Sequence
+
+from app.common.serialization import dumps, task_row_to_dict
+
+EXPORT_COLUMNS = ("id", "title", "description", "status")
+
+
+def ndjson_chunk(rows: Iterable[Sequence]) -> bytes:
+    return b"".join(dumps(task_row_to_dict(row)) + b"\n" for row in rows)
+
+
+def csv_chunk(rows: Iterable[Sequence], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(task_row_to_dict(row).values() for row in rows)
+    return buffer.getvalue()
@@ -0,0 +1,46 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Return a time-ordered UUID version 7 (RFC 9562).
+
+    48 bits of Unix milliseconds, then a 12-bit counter (``rand_a``) that
+    is randomly seeded each millisecond and incremented for further ids in
+    the same millisecond, then 62 random bits. Ids from one process are
+    strictly increasing; if the counter runs out the timestamp is advanced
+    by a millisecond.
+    """
+    global _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Seed below 2**11 so the counter has room to grow.
+            _counter = random_bits >> 69
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp(value: uuid.UUID) -> float:
+    """Unix time in seconds encoded in a UUIDv7."""
+    return (value.int >> 80) / 1000
@@ -1,19 +1,157 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from app.common import metrics
+from app.config import settings
+
+LOG_RECORDS_DROPPED = metrics.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+)
+LOG_RECORDS_SUPPRESSED = metrics.counter(
+    "log_records_suppressed_total",
+    "Repeated warnings and errors dropped by the rate limiter.",
+)
+
+TEXT_FORMAT = (
+    "%(asctime)s | %(levelname)-8s | "
+    "%(module)s:%(funcName)s:%(lineno)d - %(message)s"
+)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_listeners: list[QueueListener] = []
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``burst`` records per call site and window.
+
+    Only records at ``level`` or above are limited. A call site is the
+    file, line and unformatted message, so lazy ``%s`` arguments keep
+    repeats of one error under one key. The first record after a window
+    with drops carries the number of dropped records as ``suppressed``.
+    """
+
+    max_keys = 1024
+
+    def __init__(
+        self,
+        burst: int,
+        window: float,
+        level: int = logging.WARNING,
+        clock=time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Per call site: [window start, records passed, records dropped]
+        self._sites: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.burst <= 0:
+            return True
+        key = (record.pathname, record.lineno, record.msg)
+        now = self.clock()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                if len(self._sites) >= self.max_keys:
+                    self._sites.clear()
+                site = self._sites[key] = [now, 0, 0]
+            elif now - site[0] >= self.window:
+                if site[2]:
+                    record.suppressed = site[2]
+                site[:] = [now, 0, 0]
+            if site[1] >= self.burst:
+                site[2] += 1
+                LOG_RECORDS_SUPPRESSED.inc()
+                return False
+            site[1] += 1
+            return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            message += f" [{suppressed} similar messages suppressed]"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.module}:{record.funcName}:{record.lineno}",
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to a QueueListener thread without formatting them.
+
+    The stock ``prepare`` renders the message on the calling thread; here
+    formatting and I/O both happen on the listener thread. Arguments are
+    therefore rendered a moment later, so they should not be mutated
+    after the logging call. A full queue drops the record instead of
+    blocking the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def make_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return TextFormatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+
 
 def get_logger(name: str = None, log_file: str = None) -> logging.Logger:
     logger = logging.getLogger(name or __name__)
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(settings.LOG_LEVEL)
 
     if logger.handlers:
         return logger
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(module)s:%(funcName)s:%(lineno)d - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    formatter = make_formatter()
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
@@ -24,17 +162,42 @@ def get_logger(name: str = None, log_file: str = None) -> logging.Logger:
     error_handler.setLevel(logging.WARNING)
     error_handler.setFormatter(formatter)
 
-    logger.addHandler(console_handler)
-    logger.addHandler(error_handler)
+    handlers = [console_handler, error_handler]
 
     if log_file:
         Path(log_file).parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    queue_handler = NonBlockingQueueHandler(
+        queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    )
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(
+        RateLimitFilter(
+            settings.LOG_RATE_LIMIT_BURST,
+            settings.LOG_RATE_LIMIT_WINDOW_SECONDS,
+        )
+    )
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _listeners.append(listener)
 
     return logger
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
+
 logger = get_logger()
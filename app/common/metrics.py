@@ -0,0 +1,255 @@
+import functools
+import inspect
+import math
+import time
+from bisect import bisect_left
+from contextlib import aclosing
+from typing import Callable, Iterable, Sequence
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> Iterable[tuple[str, tuple, tuple, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, names, values, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} "
+                f"{_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._inc(self._key(labels), amount)
+
+    def _inc(self, key: tuple, amount: float = 1) -> None:
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield "", self.label_names, key, value
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels) -> None:
+        self._functions[self._key(labels)] = function
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield "", self.label_names, key, value
+        for key, function in self._functions.items():
+            yield "", self.label_names, key, function()
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        self._observe(self._key(labels), value)
+
+    def _observe(self, key: tuple, value: float) -> None:
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self):
+        bucket_names = self.label_names + ("le",)
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                yield (
+                    "_bucket",
+                    bucket_names,
+                    key + (_format_value(bound),),
+                    cumulative,
+                )
+            yield "_sum", self.label_names, key, state[-1]
+            yield "_count", self.label_names, key, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return (
+            "\n".join(metric.render() for metric in self._metrics.values())
+            + "\n"
+        )
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labels=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labels))
+
+
+def gauge(name: str, documentation: str, labels=()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labels))
+
+
+def histogram(
+    name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(
+        Histogram(name, documentation, labels, buckets=buckets)
+    )
+
+
+def timed(histogram: Histogram, errors: Counter | None = None, **labels):
+    """Observe the duration of every call of an async function.
+
+    Async generators are timed from the first step until they are
+    exhausted or closed. Exceptions are counted in ``errors`` when it is
+    given; ``errors`` must have the same label names as ``histogram``.
+    """
+    key = histogram._key(labels)
+    error_key = errors._key(labels) if errors is not None else None
+
+    def decorator(function):
+        if inspect.isasyncgenfunction(function):
+
+            @functools.wraps(function)
+            async def generator_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    async with aclosing(function(*args, **kwargs)) as items:
+                        async for item in items:
+                            yield item
+                except Exception:
+                    if errors is not None:
+                        errors._inc(error_key)
+                    raise
+                finally:
+                    histogram._observe(key, time.perf_counter() - start)
+
+            return generator_wrapper
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors._inc(error_key)
+                raise
+            finally:
+                histogram._observe(key, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from app.exceptions import InvalidCursorError
+
+
+def _encode(payload: dict) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, parse):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return parse(json.loads(base64.urlsafe_b64decode(padded.encode())))
+    except (
+        binascii.Error, ValueError, KeyError, TypeError, AttributeError
+    ) as e:
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}") from e
+
+
+def encode_cursor(created_at: datetime, task_id: UUID) -> str:
+    return _encode({"created_at": created_at.isoformat(), "id": str(task_id)})
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    return _decode(
+        cursor,
+        lambda payload: (
+            datetime.fromisoformat(payload["created_at"]),
+            UUID(payload["id"]),
+        ),
+    )
+
+
+def encode_search_cursor(rank: float, task_id: UUID) -> str:
+    return _encode({"rank": rank, "id": str(task_id)})
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+    return _decode(
+        cursor,
+        lambda payload: (float(payload["rank"]), UUID(payload["id"])),
+    )
@@ -0,0 +1,32 @@
+import json
+from typing import Any, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    # Same bytes as starlette's JSONResponse.render for the plain types
+    # produced by task_row_to_dict.
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def task_row_to_dict(row: Sequence) -> dict:
+    # Rows start with (id, title, description, status) in TaskResponse
+    # field order; extra trailing columns are ignored.
+    return {
+        "id": str(row[0]),
+        "title": row[1],
+        "description": row[2],
+        "status": int(row[3]),
+    }
@@ -0,0 +1,109 @@
+"""Coalesce concurrent identical calls into one.
+
+A call made while an identical one (same key) is in flight waits for it
+and gets its result or exception instead of running again. Nothing is
+kept once the call finishes, so this is not a cache: it only flattens
+bursts of identical concurrent reads.
+"""
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.common import metrics
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = metrics.counter(
+    "single_flight_calls_total",
+    "Calls through a single-flight group: leaders ran the call, followers "
+    "shared the result of one already in flight.",
+    labels=("group", "role"),
+)
+SINGLE_FLIGHT_RATIO = metrics.gauge(
+    "single_flight_coalescing_ratio",
+    "Share of calls since start that were served by an in-flight call.",
+    labels=("group",),
+)
+SINGLE_FLIGHT_IN_FLIGHT = metrics.gauge(
+    "single_flight_in_flight",
+    "Calls currently in flight that new callers can join.",
+    labels=("group",),
+)
+
+
+class _Abandoned(Exception):
+    """The leading call was cancelled; a follower has to run it again."""
+
+
+def _retrieve(flight: asyncio.Future) -> None:
+    # A flight may end without followers; retrieving its exception keeps
+    # asyncio from logging it as never retrieved.
+    if not flight.cancelled():
+        flight.exception()
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._leaders = 0
+        self._followers = 0
+        SINGLE_FLIGHT_RATIO.set_function(self.coalescing_ratio, group=name)
+        SINGLE_FLIGHT_IN_FLIGHT.set_function(
+            lambda: len(self._flights), group=name
+        )
+
+    def coalescing_ratio(self) -> float:
+        calls = self._leaders + self._followers
+        return self._followers / calls if calls else 0.0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call()``, or share the call in flight for ``key``."""
+        if not self.enabled:
+            return await call()
+        while (flight := self._flights.get(key)) is not None:
+            try:
+                result = await asyncio.shield(flight)
+            except _Abandoned:
+                continue
+            except Exception:
+                self._count_follower()
+                raise
+            self._count_follower()
+            return result
+
+        flight = asyncio.get_running_loop().create_future()
+        flight.add_done_callback(_retrieve)
+        self._flights[key] = flight
+        self._leaders += 1
+        SINGLE_FLIGHT_CALLS.inc(group=self.name, role="leader")
+        try:
+            result = await call()
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        except BaseException:
+            flight.set_exception(_Abandoned())
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _count_follower(self) -> None:
+        self._followers += 1
+        SINGLE_FLIGHT_CALLS.inc(group=self.name, role="follower")
+
+    def invalidate(self, key: Hashable) -> None:
+        """Stop new callers from joining the call in flight for ``key``.
+
+        Called after a write commits: the call may have read the state
+        before the write, so only callers that were already waiting - and
+        so were concurrent with the write - share its result.
+        """
+        self._flights.pop(key, None)
+
+    def invalidate_all(self) -> None:
+        self._flights.clear()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +9,88 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
 
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int | None = None
+    DB_STATEMENTS_HEADER: bool = False
+    DB_WARM_UP_CONNECTIONS: int = 5
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_SECONDS: float = 5.0
+    DB_REPLICA_MAX_LAG_SECONDS: float = 0.0
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_RELOAD: bool = False
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    SERVER_ACCESS_LOG: bool = True
+
+    METRICS_ENABLED: bool = True
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREAD_MIN_SIZE: int = 65536
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CAPACITY: int = 0
+    ADMISSION_READ_LIMIT: int = 0
+    ADMISSION_WRITE_LIMIT: int = 10
+    ADMISSION_SCAN_LIMIT: int = 5
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_POOL_WAIT_SECONDS: float = 0.25
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    LOG_LEVEL: str = "DEBUG"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT_BURST: int = 10
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = 60.0
+
+    CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    TASK_ID_VERSION: Literal[4, 7] = 4
+    TASKS_PAGE_SIZE: int = 50
+    TASKS_FAST_JSON: bool = False
+    TASKS_SINGLE_FLIGHT: bool = True
+    TASKS_MAX_PAGE_SIZE: int = 500
+    TASKS_EXPORT_BATCH_SIZE: int = 1000
+    TASKS_BULK_MAX_ITEMS: int = 1000
+    TASKS_LOOKUP_MAX_ITEMS: int = 1000
+    TASKS_LOOKUP_CHUNK_SIZE: int = 1000
+    TASKS_STATS_MAX_HOURS: int = 168
+    TASKS_STATS_RECONCILE_SECONDS: float = 3600.0
+
+    FEED_BACKEND: Literal["auto", "memory", "postgres"] = "auto"
+    FEED_QUEUE_SIZE: int = 1000
+    FEED_HISTORY_SIZE: int = 10000
+    FEED_KEEPALIVE_SECONDS: float = 15.0
+
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_SINK: str = "none"
+    OUTBOX_FILE_PATH: str = "outbox.ndjson"
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 300.0
+    OUTBOX_RETENTION_SECONDS: float = 3600.0
+    OUTBOX_COMPACT_SECONDS: float = 60.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
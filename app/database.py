@@ -1,20 +1,224 @@
-from typing import AsyncGenerator
+import asyncio
+import math
+import time
+from contextlib import AsyncExitStack, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Awaitable, Callable, Iterator
+from fastapi import Request, Response
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+from app.common import metrics
 from app.common.logs import logger
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy import event, text
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    future=True,
-    echo=getattr(settings, "DB_ECHO", False),
+POOL_CHECKOUT_WAIT = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    labels=("pool",),
 )
+POOL_CHECKOUT_TIMEOUTS = metrics.counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that hit DB_POOL_TIMEOUT.",
+    labels=("pool",),
+)
+POOL_CHECKED_OUT = metrics.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    labels=("pool",),
+)
+POOL_CHECKED_IN = metrics.gauge(
+    "db_pool_checked_in",
+    "Idle connections held by the pool.",
+    labels=("pool",),
+)
+POOL_UTILIZATION = metrics.gauge(
+    "db_pool_utilization",
+    "Checked out connections relative to pool_size + max_overflow.",
+    labels=("pool",),
+)
+STATEMENT_DURATION = metrics.histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing SQL statements, by statement type.",
+    labels=("operation",),
+)
+STATEMENT_ERRORS = metrics.counter(
+    "db_statement_errors_total",
+    "SQL statements that raised an error, by statement type.",
+    labels=("operation",),
+)
+REPLICA_HEALTHY = metrics.gauge(
+    "db_replica_healthy",
+    "1 while a read replica is in rotation, 0 while it is ejected.",
+    labels=("pool",),
+)
+REPLICA_EJECTIONS = metrics.counter(
+    "db_replica_ejections_total",
+    "Times a read replica was taken out of rotation.",
+    labels=("pool",),
+)
+READ_SESSIONS = metrics.counter(
+    "db_read_sessions_total",
+    "Sessions opened for read-only requests, by the pool serving them.",
+    labels=("pool",),
+)
+STATEMENT_OPERATIONS = frozenset(
+    ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+)
+
+
+class RecentAverage:
+    """Moving average of recent samples that decays to zero when idle.
+
+    Each sample moves the average ``weight`` of the way towards it; the
+    average halves every ``half_life`` seconds, so a burst of slow samples
+    stops counting soon after it ends even if no new samples arrive.
+    """
+
+    def __init__(self, half_life: float = 1.0, weight: float = 0.2) -> None:
+        self.half_life = half_life
+        self.weight = weight
+        self._value = 0.0
+        self._updated = time.monotonic()
+
+    def value(self) -> float:
+        age = time.monotonic() - self._updated
+        return self._value * 0.5 ** (age / self.half_life)
+
+    def observe(self, sample: float) -> None:
+        current = self.value()
+        self._value = current + self.weight * (sample - current)
+        self._updated = time.monotonic()
+
+
+_recent_checkout_wait: dict[str, RecentAverage] = {}
+
+
+def recent_checkout_wait(name: str = "primary") -> float:
+    """Recent average checkout wait of pool ``name``, in seconds."""
+    average = _recent_checkout_wait.get(name)
+    return average.value() if average is not None else 0.0
+
+
+def _instrumented_pool(name: str) -> type[AsyncAdaptedQueuePool]:
+    recent_wait = _recent_checkout_wait.setdefault(name, RecentAverage())
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                POOL_CHECKOUT_TIMEOUTS.inc(pool=name)
+                raise
+            finally:
+                wait = time.perf_counter() - start
+                POOL_CHECKOUT_WAIT.observe(wait, pool=name)
+                recent_wait.observe(wait)
+
+    return InstrumentedPool
+
+
+# Custom settings read by the change feed and outbox triggers (see
+# app.models).
+FEED_SETTING = "app.task_feed"
+OUTBOX_SETTING = "app.task_outbox"
+
+
+def outbox_enabled() -> bool:
+    """Whether task writes record their events in task_outbox."""
+    return settings.OUTBOX_ENABLED and settings.OUTBOX_SINK != "none"
+
+
+@event.listens_for(Engine, "connect")
+def _register_outbox_function(dbapi_connection, connection_record):
+    # SQLite has no session settings, so its outbox triggers call
+    # task_outbox_enabled() instead. Of the drivers in use only sqlite3 and
+    # aiosqlite connections have create_function.
+    create_function = getattr(dbapi_connection, "create_function", None)
+    if create_function is not None:
+        create_function("task_outbox_enabled", 0, outbox_enabled)
+
+
+def feed_backend() -> str:
+    """FEED_BACKEND, with auto resolved from DATABASE_URL.
+
+    Every worker needs the writes of all the others, so auto picks
+    postgres whenever the database can deliver them.
+    """
+    if settings.FEED_BACKEND != "auto":
+        return settings.FEED_BACKEND
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        return "postgres"
+    return "memory"
+
+
+def engine_options(database_url: str, name: str) -> dict:
+    url = make_url(database_url)
+    options = {
+        "future": True,
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite" and url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return options
+    options.update(
+        poolclass=_instrumented_pool(name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.get_driver_name() == "asyncpg":
+        server_settings = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(
+                settings.DB_STATEMENT_TIMEOUT_MS
+            )
+        if feed_backend() == "postgres":
+            server_settings[FEED_SETTING] = "on"
+        if outbox_enabled():
+            server_settings[OUTBOX_SETTING] = "on"
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+    return options
+
+
+def make_engine(database_url: str, name: str) -> AsyncEngine:
+    new_engine = create_async_engine(
+        database_url, **engine_options(database_url, name)
+    )
+    if isinstance(new_engine.pool, AsyncAdaptedQueuePool):
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        POOL_CHECKED_OUT.set_function(
+            lambda: new_engine.pool.checkedout(), pool=name
+        )
+        POOL_CHECKED_IN.set_function(
+            lambda: new_engine.pool.checkedin(), pool=name
+        )
+        POOL_UTILIZATION.set_function(
+            lambda: new_engine.pool.checkedout() / capacity, pool=name
+        )
+    return new_engine
+
+
+engine = make_engine(settings.DATABASE_URL, "primary")
 
 SessionLocal = async_sessionmaker(
     autocommit=False,
@@ -26,13 +230,308 @@ SessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# Reads from a client that sends this header, or that wrote less than
+# DB_REPLICA_STICKY_SECONDS ago (see the cookie), go to the primary.
+CONSISTENCY_HEADER = "X-Consistency"
+STICKY_COOKIE = "primary_until"
+
+REPLICA_LAG_QUERY = text(
+    "SELECT COALESCE(EXTRACT(EPOCH FROM "
+    "now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+
+class ReplicaSet:
+    """Read replicas used round robin, skipping ejected ones.
+
+    A replica is ejected when a connection to it fails, or when a health
+    check finds it unreachable or - on PostgreSQL, with ``max_lag`` set -
+    lagging behind the primary. Only a passing health check puts it back.
+    """
+
+    def __init__(self, engines: dict[str, AsyncEngine], max_lag: float = 0):
+        self.engines = engines
+        self.max_lag = max_lag
+        self._healthy = list(engines)
+        self._next = 0
+        for name, replica in engines.items():
+            REPLICA_HEALTHY.set_function(
+                lambda name=name: float(name in self._healthy), pool=name
+            )
+            event.listen(
+                replica.sync_engine,
+                "handle_error",
+                lambda context, name=name: self._on_error(name, context),
+            )
+
+    @property
+    def healthy(self) -> list[str]:
+        return list(self._healthy)
+
+    def choose(self) -> tuple[str, AsyncEngine] | None:
+        if not self._healthy:
+            return None
+        self._next = (self._next + 1) % len(self._healthy)
+        name = self._healthy[self._next]
+        return name, self.engines[name]
+
+    def serves(self, bind: Engine) -> bool:
+        return any(
+            bind is replica.sync_engine for replica in self.engines.values()
+        )
+
+    def eject(self, name: str, reason) -> None:
+        if name in self._healthy:
+            self._healthy.remove(name)
+            REPLICA_EJECTIONS.inc(pool=name)
+            logger.warning("Replica %s ejected: %s", name, reason)
+
+    def restore(self, name: str) -> None:
+        if name not in self._healthy:
+            self._healthy.append(name)
+            logger.info("Replica %s restored", name)
+
+    def _on_error(self, name: str, context) -> None:
+        # No connection means connecting failed.
+        if context.is_disconnect or context.connection is None:
+            self.eject(name, context.original_exception)
+
+    @staticmethod
+    async def _lag(replica: AsyncEngine) -> float:
+        async with replica.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            # Overstated while the primary is idle: the last replayed
+            # transaction is then old even though nothing is missing.
+            return float(await conn.scalar(REPLICA_LAG_QUERY))
+
+    async def check(self, timeout: float) -> None:
+        for name, replica in self.engines.items():
+            try:
+                lag = await asyncio.wait_for(self._lag(replica), timeout)
+            except Exception as e:
+                self.eject(name, str(e) or type(e).__name__)
+                continue
+            if self.max_lag and lag > self.max_lag:
+                self.eject(name, f"{lag:.1f}s behind the primary")
+            else:
+                self.restore(name)
+
+    async def run_health_checks(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check(timeout=interval)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async def dispose(self) -> None:
+        for replica in self.engines.values():
+            await replica.dispose()
+
+
+def build_replicas() -> ReplicaSet | None:
+    urls = [
+        url.strip()
+        for url in settings.DB_REPLICA_URLS.split(",")
+        if url.strip()
+    ]
+    if not urls:
+        return None
+    return ReplicaSet(
+        {
+            f"replica-{i}": make_engine(url, f"replica-{i}")
+            for i, url in enumerate(urls)
+        },
+        max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    )
+
+
+replicas = build_replicas()
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+
+
+_statement_counter: ContextVar[StatementCounter | None] = ContextVar(
+    "statement_counter", default=None
+)
+
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    token = _statement_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _statement_counter.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, many):
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter.statements += 1
+
+
+def _statement_operation(statement: str) -> str:
+    words = statement.lstrip()[:7].split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in STATEMENT_OPERATIONS else "OTHER"
+
+
+if settings.METRICS_ENABLED:
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _start_statement_timer(
+        conn, cursor, statement, parameters, context, many
+    ):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _observe_statement(conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            STATEMENT_DURATION.observe(
+                time.perf_counter() - started,
+                operation=_statement_operation(statement),
+            )
+
+    @event.listens_for(Engine, "handle_error")
+    def _count_statement_error(exception_context):
+        if exception_context.statement is not None:
+            STATEMENT_ERRORS.inc(
+                operation=_statement_operation(exception_context.statement)
+            )
+
+
+async def get_db(response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """Primary session, for routes that write."""
+    if replicas is not None:
+        # Read-your-writes: the client's reads follow it to the primary
+        # until its replicas have most likely caught up.
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(math.ceil(time.time() + settings.DB_REPLICA_STICKY_SECONDS)),
+            max_age=math.ceil(settings.DB_REPLICA_STICKY_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
     async with SessionLocal() as db:
         yield db
 
 
+def _wants_primary(request: Request | None) -> bool:
+    if request is None:
+        return False
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "strong":
+        return True
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_session(request: Request | None = None) -> AsyncSession:
+    """Session for a read-only request.
+
+    Bound to a healthy replica, or to the primary when there is none or
+    the client needs to see its own writes.
+    """
+    chosen = None
+    if replicas is not None and not _wants_primary(request):
+        chosen = replicas.choose()
+    if chosen is None:
+        READ_SESSIONS.inc(pool="primary")
+        return SessionLocal()
+    name, replica = chosen
+    READ_SESSIONS.inc(pool=name)
+    return SessionLocal(bind=replica)
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """Whether ``db`` reads from a replica, which may lag the primary."""
+    return replicas is not None and replicas.serves(db.get_bind())
+
+
+async def get_read_db(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    async with read_session(request) as db:
+        yield db
+
+
+async def warm_up(
+    connections: int,
+    prepare: Callable[[AsyncSession], Awaitable[None]] | None = None,
+    bind: AsyncEngine | None = None,
+) -> None:
+    """Open ``connections`` pooled connections at once and prepare each.
+
+    Holding them together forces the pool of ``bind`` (the primary engine
+    by default) to establish that many; they go back to the pool idle.
+    Pools that cannot hold several connections (in-memory SQLite) are
+    warmed through a single one.
+    """
+    bind = bind or engine
+    if not isinstance(bind.pool, AsyncAdaptedQueuePool):
+        connections = min(connections, 1)
+    connections = min(connections, settings.DB_POOL_SIZE)
+    opened = []
+
+    async def connect() -> None:
+        opened.append(await bind.connect().start())
+
+    async with AsyncExitStack() as stack:
+        try:
+            await _run_all(connect() for _ in range(connections))
+        finally:
+            # The task group has waited for every connect to finish or be
+            # cancelled, so every connection that was opened is closed.
+            for conn in opened:
+                stack.push_async_callback(conn.close)
+        if prepare is not None:
+            await _run_all(
+                _prepare_connection(conn, prepare) for conn in opened
+            )
+
+
+async def _run_all(coroutines) -> None:
+    # Unlike gather, a task group cancels and waits for the remaining
+    # coroutines when one fails. The first failure is raised, as gather
+    # would.
+    try:
+        async with asyncio.TaskGroup() as group:
+            for coroutine in coroutines:
+                group.create_task(coroutine)
+    except ExceptionGroup as group:
+        raise group.exceptions[0]
+
+
+async def _prepare_connection(conn, prepare) -> None:
+    async with AsyncSession(bind=conn) as db:
+        await prepare(db)
+
+
+async def warm_up_replicas(
+    connections: int,
+    prepare: Callable[[AsyncSession], Awaitable[None]] | None = None,
+) -> None:
+    """Warm the pool of every replica; a replica that fails is ejected."""
+    if replicas is None:
+        return
+    for name, replica in replicas.engines.items():
+        try:
+            await warm_up(connections, prepare, bind=replica)
+        except Exception as e:
+            replicas.eject(name, str(e) or type(e).__name__)
+
+
 async def shutdown():
+    if replicas is not None:
+        await replicas.dispose()
     await engine.dispose()
 
 
@@ -43,3 +542,14 @@ async def check_db_connection() -> bool:
         return True
     except Exception:
         return False
+
+
+async def check_replicas() -> bool:
+    """Check every replica; False if replicas are configured but none is up.
+
+    Reads fall back to the primary meanwhile, but it is not sized for them.
+    """
+    if replicas is None:
+        return True
+    await replicas.check(timeout=settings.DB_REPLICA_CHECK_SECONDS)
+    return bool(replicas.healthy)
@@ -4,3 +4,11 @@ class TaskNotFoundError(Exception):
 
 class TaskAlreadyExistsError(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class TaskPreconditionFailedError(Exception):
+    pass
@@ -0,0 +1,296 @@
+"""Change feed: task mutations pushed to subscribers as Server-Sent Events.
+
+Each event gets a sequence number and is encoded once; the encoded
+message is kept in a bounded history for resuming and fanned out to
+every subscriber's bounded queue.
+
+ChangeFeed is an in-process broker: TaskService publishes an event after
+every committed create, update and delete, and each worker only sees its
+own writes. With PostgresChangeFeed the database publishes: triggers on
+tasks send every event with NOTIFY inside the write transaction, and
+every worker LISTENs, so all workers receive every event in commit order.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import AsyncIterator, Sequence
+from uuid import UUID
+
+from app.common import metrics
+from app.common.logs import logger
+from app.common.serialization import dumps
+from app.config import settings
+from app.database import feed_backend
+from app.models import FEED_CHANNEL, Task
+
+FEED_EVENTS = metrics.counter(
+    "task_feed_events_total",
+    "Task change events received by this worker's change feed.",
+    labels=("type",),
+)
+FEED_SUBSCRIBERS = metrics.gauge(
+    "task_feed_subscribers", "Open change feed subscriptions."
+)
+FEED_LAGGED = metrics.counter(
+    "task_feed_lagged_total",
+    "Subscribers disconnected because their queue was full.",
+)
+FEED_RESETS = metrics.counter(
+    "task_feed_resets_total",
+    "Subscriptions told to re-list because their position was lost.",
+)
+
+# Tells a subscriber to fetch the full list again: the events after its
+# last sequence number are no longer available.
+RESET_MESSAGE = b"event: reset\ndata: {}\n\n"
+KEEPALIVE_MESSAGE = b": keepalive\n\n"
+
+
+class EventType(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+def event_data(event_type: EventType, item: Task | UUID) -> bytes:
+    if isinstance(item, UUID):
+        return dumps({"type": event_type.value, "id": str(item), "task": None})
+    return dumps(
+        {
+            "type": event_type.value,
+            "id": str(item.id),
+            "task": {
+                "id": str(item.id),
+                "title": item.title,
+                "description": item.description,
+                "status": int(item.status),
+                "version": item.version,
+            },
+        }
+    )
+
+
+def sse_message(seq: int, event_type: str, data: bytes) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        seq,
+        event_type.encode(),
+        data,
+    )
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: asyncio.Queue
+    backlog: deque = field(default_factory=deque)
+    reset: bool = False
+    closed: bool = False
+
+
+class ChangeFeed:
+    # Sequence numbers are consecutive, so a history starting at after + 1
+    # continues ``after`` even once ``after`` itself has been evicted.
+    CONTIGUOUS_SEQUENCE = True
+
+    def __init__(self, queue_size: int, history_size: int) -> None:
+        self.queue_size = queue_size
+        self._history: deque[tuple[int, bytes]] = deque(maxlen=history_size)
+        self._subscribers: set[Subscription] = set()
+        self._seq = 0
+        FEED_SUBSCRIBERS.set_function(lambda: len(self._subscribers))
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        self._close_all()
+
+    async def publish(
+        self, event_type: EventType, items: Sequence[Task | UUID]
+    ) -> None:
+        """Publish one event per item; called after the write commits.
+
+        Never raises: the write has already succeeded.
+        """
+        try:
+            payloads = [event_data(event_type, item) for item in items]
+        except Exception as e:
+            logger.warning("Change feed encoding failed: %s", e)
+            return
+        for data in payloads:
+            self._seq += 1
+            self._dispatch(self._seq, event_type.value, data)
+
+    def _dispatch(self, seq: int, event_type: str, data: bytes) -> None:
+        message = sse_message(seq, event_type, data)
+        FEED_EVENTS.inc(type=event_type)
+        self._history.append((seq, message))
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Never wait for a slow consumer: drop it, and let it
+                # reconnect and resume from the history.
+                self._subscribers.discard(subscription)
+                subscription.closed = True
+                FEED_LAGGED.inc()
+
+    def _close_all(self) -> None:
+        for subscription in self._subscribers:
+            subscription.closed = True
+            try:
+                subscription.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        self._subscribers.clear()
+
+    def _lose_history(self) -> None:
+        # Events may have been missed: positions in the history can no
+        # longer be trusted, so every subscriber has to re-list.
+        self._history.clear()
+        self._close_all()
+
+    def subscribe(self, after: int | None = None) -> Subscription:
+        """Subscribe to events after sequence number ``after``.
+
+        Replay and registration happen without yielding to the event
+        loop, so no event is missed or delivered twice in between.
+        """
+        subscription = Subscription(asyncio.Queue(self.queue_size))
+        if after is not None:
+            positions = [seq for seq, _ in self._history]
+            if self.CONTIGUOUS_SEQUENCE and positions[:1] == [after + 1]:
+                start = 0
+            elif after in positions:
+                start = positions.index(after) + 1
+            else:
+                start = None
+            if start is not None:
+                subscription.backlog.extend(
+                    message for _, message in list(self._history)[start:]
+                )
+            elif positions or after != self._seq:
+                subscription.reset = True
+                FEED_RESETS.inc()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def stream(
+        self, after: int | None = None, keepalive: float | None = None
+    ) -> AsyncIterator[bytes]:
+        """Yield SSE messages until the subscriber falls behind."""
+        subscription = self.subscribe(after)
+        try:
+            if subscription.reset:
+                yield RESET_MESSAGE
+            while subscription.backlog:
+                yield subscription.backlog.popleft()
+            while True:
+                if subscription.closed and subscription.queue.empty():
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), keepalive
+                    )
+                except TimeoutError:
+                    message = KEEPALIVE_MESSAGE
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """Fan-out across workers through LISTEN/NOTIFY.
+
+    Events are sent by the task_feed_* triggers (see app.models) and
+    numbered by task_event_seq. Numbers are unique but, with concurrent
+    writers, not necessarily increasing in commit order; every worker
+    receives notifications in the same order, though, so a subscriber can
+    resume on any worker whose history still holds its last event. The
+    listener holds one pooled connection for the lifetime of the worker.
+    """
+
+    CHANNEL = FEED_CHANNEL
+    # task_event_seq has gaps (rolled back writes, other writers), so only
+    # an event still in the history proves nothing was missed after it.
+    CONTIGUOUS_SEQUENCE = False
+
+    def __init__(self, engine, queue_size: int, history_size: int) -> None:
+        super().__init__(queue_size, history_size)
+        self.engine = engine
+        self._listener: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await super().stop()
+
+    async def publish(
+        self, event_type: EventType, items: Sequence[Task | UUID]
+    ) -> None:
+        # The trigger has already queued the NOTIFY in the write's
+        # transaction; it is delivered when that transaction commits.
+        pass
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        seq, event_type, data = payload.split(":", 2)
+        self._dispatch(int(seq), event_type, data.encode())
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            lost = asyncio.Event()
+            try:
+                async with self.engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    driver.add_termination_listener(lambda _: lost.set())
+                    await driver.add_listener(self.CHANNEL, self._on_notify)
+                    delay = 1.0
+                    try:
+                        while not lost.is_set():
+                            try:
+                                await asyncio.wait_for(
+                                    lost.wait(),
+                                    settings.FEED_KEEPALIVE_SECONDS,
+                                )
+                            except TimeoutError:
+                                # A ping outside any transaction; notifies
+                                # are only delivered between transactions.
+                                await driver.execute("SELECT 1")
+                    finally:
+                        # Never hand a listening connection back to the
+                        # pool.
+                        await conn.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Change feed listener failed: %s", e)
+            self._lose_history()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+def build_change_feed() -> ChangeFeed:
+    if feed_backend() == "postgres":
+        from app.database import engine
+
+        return PostgresChangeFeed(
+            engine, settings.FEED_QUEUE_SIZE, settings.FEED_HISTORY_SIZE
+        )
+    return ChangeFeed(settings.FEED_QUEUE_SIZE, settings.FEED_HISTORY_SIZE)
+
+
+change_feed = build_change_feed()
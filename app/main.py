@@ -1,28 +1,162 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, PlainTextResponse
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from app.common import metrics
 from app.common.logs import logger
+from app.config import settings
+from app.database import (
+    check_db_connection,
+    check_replicas,
+    count_statements,
+    replicas,
+    shutdown,
+    warm_up,
+    warm_up_replicas,
+)
+from app.exceptions import TaskPreconditionFailedError
+from app.feed import change_feed
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.compression import (
+    CompressionMiddleware,
+    available_codecs,
+)
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.outbox import build_dispatcher
 
 from app.routes.tasks import router as tasks_router
+from app.services.stats_service import run_reconciliation
+from app.services.task_service import TaskService
+
+
+async def warm_up_worker() -> bool:
+    try:
+        await warm_up(settings.DB_WARM_UP_CONNECTIONS, TaskService.warm_up)
+    except Exception as e:
+        logger.error("Database warm-up failed: %s", e)
+        return False
+    await warm_up_replicas(
+        settings.DB_WARM_UP_CONNECTIONS,
+        lambda db: TaskService.warm_up(db, writes=False),
+    )
+    return await check_db_connection()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.warmed = await warm_up_worker()
+    await change_feed.start()
+    background = []
+    if settings.TASKS_STATS_RECONCILE_SECONDS > 0:
+        background.append(
+            run_reconciliation(settings.TASKS_STATS_RECONCILE_SECONDS)
+        )
+    if replicas is not None:
+        background.append(
+            replicas.run_health_checks(settings.DB_REPLICA_CHECK_SECONDS)
+        )
+    dispatcher = build_dispatcher() if settings.OUTBOX_ENABLED else None
+    if dispatcher is not None:
+        background.append(dispatcher.run(settings.OUTBOX_COMPACT_SECONDS))
+    tasks = [asyncio.create_task(job) for job in background]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if dispatcher is not None:
+        await dispatcher.sink.close()
+    # Open change feed streams count as in-flight requests: uvicorn cuts
+    # them at SERVER_GRACEFUL_SHUTDOWN_TIMEOUT, before this runs.
+    await change_feed.stop()
+    # Runs once per worker, after uvicorn has drained in-flight requests.
+    await shutdown()
 
-app = FastAPI(title="Task Manager API")
+
+app = FastAPI(title="Task Manager API", lifespan=lifespan)
 
 app.include_router(tasks_router, prefix="/tasks")
 
+# Innermost, so shed responses still carry CORS headers, a request id
+# and request metrics.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        codecs=available_codecs(
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_level=settings.COMPRESSION_BROTLI_LEVEL,
+            zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        ),
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        thread_min_size=settings.COMPRESSION_THREAD_MIN_SIZE,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-DB-Statements",
+        "ETag",
+        "X-Request-ID",
+        "Retry-After",
+    ],
 )
 
+app.add_middleware(RequestIdMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+if settings.DB_STATEMENTS_HEADER:
+
+    @app.middleware("http")
+    async def db_statements_header(request: Request, call_next):
+        with count_statements() as counter:
+            response = await call_next(request)
+        response.headers["X-DB-Statements"] = str(counter.statements)
+        return response
+
+
+@app.exception_handler(TaskPreconditionFailedError)
+async def precondition_failed_handler(
+    request: Request, exc: TaskPreconditionFailedError
+):
+    return JSONResponse(
+        status_code=412,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    logger.warning("Connection pool exhausted: %s", exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The server is overloaded, retry later."},
+        headers={
+            "Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+        },
+    )
+
 
 @app.exception_handler(SQLAlchemyError)
 async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
-    logger.error(f"Database error: {exc}")
+    logger.error("Database error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"detail": "A database error occurred."},
@@ -31,7 +165,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled error: {exc}")
+    logger.error("Unhandled error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"detail": "An internal server error occurred."},
@@ -44,5 +178,29 @@ async def index():
 
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    # A worker that started while the database was down warms up on the
+    # first probe that finds it reachable.
+    if not getattr(app.state, "warmed", False):
+        app.state.warmed = await warm_up_worker()
+    if (
+        app.state.warmed
+        and await check_db_connection()
+        and await check_replicas()
+    ):
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "unavailable"})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,240 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable
+
+from app.common import metrics
+from app.config import settings
+from app.database import recent_checkout_wait
+
+READ = "read"
+WRITE = "write"
+SCAN = "scan"
+# Waiting requests are admitted in this order.
+PRIORITY = (READ, WRITE, SCAN)
+
+ADMISSION_SHED = metrics.counter(
+    "http_requests_shed_total",
+    "Requests rejected with 503 by admission control, by class and reason.",
+    labels=("kind", "reason"),
+)
+ADMISSION_IN_FLIGHT = metrics.gauge(
+    "admission_in_flight",
+    "Admitted requests currently running, by class.",
+    labels=("kind",),
+)
+ADMISSION_QUEUED = metrics.gauge(
+    "admission_queued",
+    "Requests waiting for admission, by class.",
+    labels=("kind",),
+)
+ADMISSION_WAIT = metrics.histogram(
+    "admission_wait_seconds",
+    "Time queued requests waited for admission, by class.",
+    labels=("kind",),
+)
+
+ADMITTED_PREFIX = "/tasks/"
+# GET routes by admission class, matched on the raw path because the
+# router has not run yet. Any other GET under /tasks/ is a single-task
+# lookup, /tasks/{task_id}.
+GET_ROUTES = {
+    "/tasks/": SCAN,
+    "/tasks/export": SCAN,
+    "/tasks/search": SCAN,
+    "/tasks/stats": READ,
+    # A long-lived stream that holds no connection while it waits.
+    "/tasks/changes": None,
+}
+
+# POST routes that only read.
+READ_ONLY_POSTS = {
+    "/tasks/lookup": SCAN,
+}
+
+SHED_BODY = b'{"detail":"The server is overloaded, retry later."}'
+
+
+def classify(method: str, path: str) -> str | None:
+    """Admission class of a request, or None if it is never limited."""
+    if not path.startswith(ADMITTED_PREFIX):
+        return None
+    if method == "POST" and path in READ_ONLY_POSTS:
+        return READ_ONLY_POSTS[path]
+    if method not in ("GET", "HEAD"):
+        return WRITE
+    return GET_ROUTES.get(path, READ)
+
+
+class AdmissionController:
+    """Concurrency limits with a bounded, prioritised wait queue.
+
+    At most ``capacity`` requests run at once, and at most
+    ``limits[kind]`` of one class. A request that finds no free slot
+    waits in its class's queue; freed slots go to waiting reads first,
+    then writes, then scans. Instead of queueing, a request is shed when
+    its queue is full, when it waits longer than ``queue_timeout``, or -
+    for writes and scans - when ``pool_wait()`` shows that connection
+    checkouts already wait longer than ``pool_wait_threshold``.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        limits: dict[str, int],
+        queue_size: int = 100,
+        queue_timeout: float = 5.0,
+        pool_wait_threshold: float = 0.25,
+        pool_wait: Callable[[], float] = recent_checkout_wait,
+    ) -> None:
+        self.capacity = capacity
+        self.limits = {
+            kind: min(limits.get(kind) or capacity, capacity)
+            for kind in PRIORITY
+        }
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.pool_wait_threshold = pool_wait_threshold
+        self.pool_wait = pool_wait
+        self._running = dict.fromkeys(PRIORITY, 0)
+        self._total = 0
+        self._waiters: dict[str, deque[asyncio.Future]] = {
+            kind: deque() for kind in PRIORITY
+        }
+        for kind in PRIORITY:
+            ADMISSION_IN_FLIGHT.set_function(
+                lambda kind=kind: self._running[kind], kind=kind
+            )
+            ADMISSION_QUEUED.set_function(
+                lambda kind=kind: len(self._waiters[kind]), kind=kind
+            )
+
+    def _has_slot(self, kind: str) -> bool:
+        return (
+            self._total < self.capacity
+            and self._running[kind] < self.limits[kind]
+        )
+
+    def _take(self, kind: str) -> None:
+        self._running[kind] += 1
+        self._total += 1
+
+    async def acquire(self, kind: str) -> str | None:
+        """Wait for a slot; returns why the request was shed, or None."""
+        if kind != READ and self.pool_wait() > self.pool_wait_threshold:
+            return "pool_saturated"
+        waiters = self._waiters[kind]
+        # Waiters only exist while their class has no free slot, so a
+        # newcomer never overtakes a queued request of its own class or a
+        # higher one.
+        if not waiters and self._has_slot(kind):
+            self._take(kind)
+            return None
+        if len(waiters) >= self.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            # The slot may have been handed over just as the wait ran out.
+            if not waiter.cancelled():
+                return None
+            if waiter in waiters:
+                waiters.remove(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(kind)
+            elif waiter in waiters:
+                waiters.remove(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT.observe(time.perf_counter() - start, kind=kind)
+        return None
+
+    def release(self, kind: str) -> None:
+        self._running[kind] -= 1
+        self._total -= 1
+        for waiting in PRIORITY:
+            waiters = self._waiters[waiting]
+            while waiters and self._has_slot(waiting):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._take(waiting)
+                    waiter.set_result(None)
+
+
+def build_controller() -> AdmissionController:
+    capacity = settings.ADMISSION_CAPACITY or (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+    return AdmissionController(
+        capacity,
+        {
+            READ: settings.ADMISSION_READ_LIMIT,
+            WRITE: settings.ADMISSION_WRITE_LIMIT,
+            SCAN: settings.ADMISSION_SCAN_LIMIT,
+        },
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        pool_wait_threshold=settings.ADMISSION_POOL_WAIT_SECONDS,
+    )
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware shedding load before it reaches the pool.
+
+    Requests to /tasks routes are classified as cheap reads, writes or
+    list scans and admitted through an
+    AdmissionController. A shed request gets 503 with Retry-After at
+    once, instead of queueing behind the connection pool until
+    DB_POOL_TIMEOUT turns it into a 500 the client no longer waits for.
+    The slot is held until the response body has been sent, so streamed
+    exports count for their whole duration.
+    """
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController | None = None,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.controller = controller or build_controller()
+        self.retry_after = str(retry_after).encode("ascii")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        kind = classify(scope["method"], scope["path"])
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await self.controller.acquire(kind)
+        if reason is not None:
+            ADMISSION_SHED.inc(kind=kind, reason=reason)
+            await self._shed(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(kind)
+
+    async def _shed(self, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(SHED_BODY)).encode()),
+                    (b"retry-after", self.retry_after),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": SHED_BODY})
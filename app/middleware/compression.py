@@ -0,0 +1,267 @@
+import asyncio
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.common import metrics
+from app.common.etag import coded_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+COMPRESSED_RESPONSES = metrics.counter(
+    "http_responses_compressed_total",
+    "Responses sent with a Content-Encoding, by encoding.",
+    labels=("encoding",),
+)
+COMPRESSION_BYTES_IN = metrics.counter(
+    "http_compression_input_bytes_total",
+    "Response body bytes before compression, by encoding.",
+    labels=("encoding",),
+)
+COMPRESSION_BYTES_OUT = metrics.counter(
+    "http_compression_output_bytes_total",
+    "Response body bytes after compression, by encoding.",
+    labels=("encoding",),
+)
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+)
+# Events must reach the client one by one, not when a proxy or the
+# compressor decides to flush.
+INCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+class _ZlibStream:
+    def __init__(self, level: int) -> None:
+        # wbits=31: gzip container.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+class _BrotliStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        if final:
+            return compressed + self._compressor.finish()
+        return compressed + self._compressor.flush()
+
+
+class _ZstdStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush = (
+            zstandard.COMPRESSOBJ_FLUSH_FINISH
+            if final
+            else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+class Codec:
+    """A content coding at a fixed level.
+
+    ``stream()`` returns a compressor whose output for every chunk can be
+    decoded on its own arrival, so chunked responses keep flowing.
+    """
+
+    def __init__(self, name: str, stream_class, level: int) -> None:
+        self.name = name
+        self.stream_class = stream_class
+        self.level = level
+
+    def stream(self):
+        return self.stream_class(self.level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.stream().compress(data, final=True)
+
+
+def available_codecs(
+    gzip_level: int = 6, brotli_level: int = 4, zstd_level: int = 3
+) -> list[Codec]:
+    """Codecs in server preference order; brotli and zstd if installed."""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(Codec("zstd", _ZstdStream, zstd_level))
+    if brotli is not None:
+        codecs.append(Codec("br", _BrotliStream, brotli_level))
+    codecs.append(Codec("gzip", _ZlibStream, gzip_level))
+    return codecs
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(header: str | None, codecs: list[Codec]) -> Codec | None:
+    """The codec the client accepts with the highest q-value.
+
+    Ties go to the earlier codec in ``codecs``.
+    """
+    if not header:
+        return None
+    accepted = _accepted_encodings(header)
+    chosen, best = None, 0.0
+    for codec in codecs:
+        quality = accepted.get(codec.name, accepted.get("*", 0.0))
+        if quality > best:
+            chosen, best = codec, quality
+    return chosen
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(
+        COMPRESSIBLE_TYPES
+    ) and not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses by Accept-Encoding.
+
+    A single-message body is compressed when it reaches ``min_size``; a
+    streamed body is compressed chunk by chunk, each chunk flushed so the
+    client can decode it as soon as it arrives. Chunks of at least
+    ``thread_min_size`` bytes are compressed in a worker thread (zlib,
+    brotli and zstd release the GIL) so other requests keep running.
+
+    A compressed response gets its own ETag, the identity one with the
+    coding appended (``"3-gzip"``); a 304 answering a conditional request
+    for that variant gets it as well. The routes strip the suffix when
+    they parse If-None-Match and If-Match.
+    """
+
+    def __init__(
+        self,
+        app,
+        codecs: list[Codec] | None = None,
+        min_size: int = 1024,
+        thread_min_size: int = 65536,
+    ) -> None:
+        self.app = app
+        self.codecs = codecs if codecs is not None else available_codecs()
+        self.min_size = min_size
+        self.thread_min_size = thread_min_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        codec = negotiate(request_headers.get("accept-encoding"), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None
+
+        async def send_compressed(message) -> None:
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether the
+                # response is worth compressing.
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                headers = MutableHeaders(scope=response_start)
+                if response_start["status"] == 304:
+                    self._revalidated_etag(
+                        headers, codec, request_headers.get("if-none-match")
+                    )
+                if (
+                    response_start["status"] in (204, 304)
+                    or not _compressible(headers)
+                    or (not more_body and len(body) < self.min_size)
+                ):
+                    await send(response_start)
+                    await send(message)
+                    return
+                stream = codec.stream()
+                compressed = await self._compress(stream, body, not more_body)
+                headers["Content-Encoding"] = codec.name
+                if "etag" in headers:
+                    headers["ETag"] = coded_etag(headers["etag"], codec.name)
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(compressed))
+                COMPRESSED_RESPONSES.inc(encoding=codec.name)
+                await send(response_start)
+            elif stream is None:
+                await send(message)
+                return
+            else:
+                compressed = await self._compress(stream, body, not more_body)
+            COMPRESSION_BYTES_IN.inc(len(body), encoding=codec.name)
+            COMPRESSION_BYTES_OUT.inc(len(compressed), encoding=codec.name)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": compressed,
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _revalidated_etag(
+        headers: MutableHeaders, codec: Codec, if_none_match: str | None
+    ) -> None:
+        # The 304 describes the variant the client holds: the compressed
+        # one if that is what its If-None-Match names.
+        if "etag" not in headers or not if_none_match:
+            return
+        coded = coded_etag(headers["etag"], codec.name)
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if coded in tags or f"W/{coded}" in tags:
+            headers["ETag"] = coded
+
+    async def _compress(self, stream, data: bytes, final: bool) -> bytes:
+        if len(data) >= self.thread_min_size:
+            return await asyncio.to_thread(stream.compress, data, final)
+        return stream.compress(data, final)
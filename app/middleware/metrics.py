@@ -0,0 +1,79 @@
+import time
+
+from app.common import metrics
+
+HTTP_REQUESTS = metrics.counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    labels=("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body is sent.",
+    labels=("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    labels=("method",),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """Full path template of the route that handled the request.
+
+    Routes of an included router keep their own path (``/{task_id}``)
+    without the include prefix, so the prefix is recovered as the part of
+    the request path in front of what the route's pattern matches.
+    """
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_regex"):
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    for start, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[start:]):
+            return path[:start] + route.path
+    return route.path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and latencies.
+
+    Requests are labelled with the matched route template
+    (``/tasks/{task_id}``) rather than the raw path, so label cardinality
+    stays bounded. The route is only known once the router has run, which
+    is why the in-flight gauge is labelled by method alone.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_code)
+            HTTP_REQUEST_DURATION.observe(duration, method=method, route=route)
@@ -0,0 +1,51 @@
+import uuid
+
+from app.common.logs import request_id
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+def _incoming_request_id(headers) -> str | None:
+    for name, value in headers:
+        if name == REQUEST_ID_HEADER:
+            if len(value) <= MAX_REQUEST_ID_LENGTH and value.isascii():
+                decoded = value.decode("ascii")
+                if decoded.isprintable():
+                    return decoded
+            return None
+    return None
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware binding an X-Request-ID to the request.
+
+    A well-formed incoming X-Request-ID is reused, otherwise a new one is
+    generated. The id is echoed in the response and stored in
+    ``app.common.logs.request_id`` so log records can be correlated.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current = _incoming_request_id(scope["headers"]) or uuid.uuid4().hex
+
+        async def send_with_request_id(message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (REQUEST_ID_HEADER, current.encode("ascii")),
+                ]
+            await send(message)
+
+        token = request_id.set(current)
+        await self.app(scope, receive, send_with_request_id)
+        # Not reset on error: the handler for unhandled exceptions runs
+        # further out, in the same task, and should still log the id.
+        request_id.reset(token)
@@ -24,6 +24,16 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search structures are dialect specific and are created
+    # by migrations and DDL events rather than mapped on the models.
+    if type_ == "table" and name.startswith("tasks_fts"):
+        return False
+    if name in ("search_vector", "ix_tasks_search_vector"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -44,6 +54,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -75,6 +86,7 @@ def do_run_migrations(connection):
         compare_type=True,
         compare_server_default=True,
         render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
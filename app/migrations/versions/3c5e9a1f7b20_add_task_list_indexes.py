@@ -0,0 +1,37 @@
+"""add task list indexes
+
+Revision ID: 3c5e9a1f7b20
+Revises: 81897812ea1a
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e9a1f7b20'
+down_revision: Union[str, Sequence[str], None] = '81897812ea1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tasks_status_id', 'tasks', ['status', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_tasks_title_prefix',
+        'tasks',
+        ['title'],
+        unique=False,
+        postgresql_ops={'title': 'varchar_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_title_prefix', table_name='tasks')
+    op.drop_index('ix_tasks_status_id', table_name='tasks')
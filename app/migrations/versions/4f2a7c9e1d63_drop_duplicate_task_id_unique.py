@@ -0,0 +1,45 @@
+"""drop duplicate unique constraint on tasks.id
+
+Revision ID: 4f2a7c9e1d63
+Revises: 9d41b6e0c8a3
+Create Date: 2026-10-18 15:02:44.610385
+
+The initial migration declared both PRIMARY KEY (id) and UNIQUE (id), so
+PostgreSQL maintains two identical B-trees (tasks_pkey and tasks_id_key)
+on every insert. Dropping the constraint only takes a brief ACCESS
+EXCLUSIVE lock; no data is rewritten. SQLite keeps its autoindex: removing
+it there would mean recreating the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a7c9e1d63'
+down_revision: Union[str, Sequence[str], None] = '9d41b6e0c8a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE tasks DROP CONSTRAINT IF EXISTS tasks_id_key')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Build the index without blocking writes, then attach it.
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS tasks_id_key '
+            'ON tasks (id)'
+        )
+    op.execute(
+        'ALTER TABLE tasks ADD CONSTRAINT tasks_id_key '
+        'UNIQUE USING INDEX tasks_id_key'
+    )
@@ -0,0 +1,33 @@
+"""add sequence for change feed events
+
+Revision ID: 5b9e3f71a2c4
+Revises: c4e8b2d6f190
+Create Date: 2026-10-18 19:32:40.118274
+
+FEED_BACKEND=postgres numbers the events it publishes through NOTIFY
+with task_event_seq. SQLite has no sequences; its in-process feed keeps
+its own counter.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e3f71a2c4'
+down_revision: Union[str, Sequence[str], None] = 'c4e8b2d6f190'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.CreateSequence(sa.Sequence('task_event_seq')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.DropSequence(sa.Sequence('task_event_seq')))
@@ -0,0 +1,34 @@
+"""add task version
+
+Revision ID: 9d41b6e0c8a3
+Revises: 3c5e9a1f7b20
+Create Date: 2026-10-18 12:40:05.118930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41b6e0c8a3'
+down_revision: Union[str, Sequence[str], None] = '3c5e9a1f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'version', sa.Integer(), server_default='1', nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,106 @@
+"""add task full-text search
+
+Revision ID: a7d3f1c5e92b
+Revises: e6c1a9b47d08
+Create Date: 2026-10-18 16:48:03.551902
+
+PostgreSQL: a stored generated tsvector column over title (weight A) and
+description (weight B) with the 'simple' configuration, plus a GIN index
+built with CREATE INDEX CONCURRENTLY. Adding a stored generated column
+rewrites the table under an ACCESS EXCLUSIVE lock, so run this revision
+in a maintenance window on large tables.
+
+SQLite: an FTS5 table kept in sync by triggers, backfilled from tasks.
+
+Expected plan for GET /tasks/search?q=...:
+
+    Limit -> Sort (top-N heapsort) on ts_rank(...) DESC, id
+      -> Bitmap Heap Scan on tasks
+           Recheck Cond: (search_vector @@ websearch_to_tsquery(...))
+           -> Bitmap Index Scan on ix_tasks_search_vector
+
+Ranking touches every match, so rare terms answer in a few milliseconds
+on millions of rows while very common terms scale with their match
+count; see benchmarks/search.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3f1c5e92b'
+down_revision: Union[str, Sequence[str], None] = 'e6c1a9b47d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', description), 'B')"
+)
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+    "USING fts5(id UNINDEXED, title, description)",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks "
+    "BEGIN INSERT INTO tasks_fts (id, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks "
+    "BEGIN DELETE FROM tasks_fts WHERE id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update "
+    "AFTER UPDATE OF title, description ON tasks "
+    "BEGIN DELETE FROM tasks_fts WHERE id = old.id; "
+    "INSERT INTO tasks_fts (id, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO tasks_fts (id, title, description) "
+    "SELECT id, title, description FROM tasks",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS tasks_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_fts_insert",
+    "DROP TABLE IF EXISTS tasks_fts",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+    if dialect != 'postgresql':
+        return
+    op.execute(
+        'ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED'
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_search_vector', table_name='tasks', if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_search_vector',
+            'tasks',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+        return
+    if dialect != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_search_vector', table_name='tasks', if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_column('tasks', 'search_vector')
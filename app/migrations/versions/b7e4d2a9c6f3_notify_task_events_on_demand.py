@@ -0,0 +1,123 @@
+"""send change feed NOTIFY from tasks triggers, only when enabled
+
+Revision ID: b7e4d2a9c6f3
+Revises: f5a2c8e4d1b6
+Create Date: 2026-10-18 23:48:20.604113
+
+The task_outbox_notify trigger called pg_notify for every write, whether
+or not any worker used FEED_BACKEND=postgres. NOTIFY is not free: at
+commit it takes a database-wide lock on the notification queue, so every
+transaction that notified commits one at a time. The task_feed_* triggers
+on tasks replace it and only notify on connections with
+app.task_feed = 'on', which the engine sets when FEED_BACKEND resolves to
+postgres. Writers that leave it unset (FEED_BACKEND=memory, psql, batch
+jobs) commit without the lock, and their writes do not reach the feed.
+The trade-off is that the setting is per connection: a deployment mixing
+feed backends gets a partial feed, and clients writing outside the app
+must set it themselves to be seen.
+
+Events no longer depend on task_outbox rows, so they are numbered by the
+recreated task_event_seq.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d2a9c6f3'
+down_revision: Union[str, Sequence[str], None] = 'f5a2c8e4d1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANNEL = 'task_events'
+SETTING = 'app.task_feed'
+MAX_PAYLOAD_BYTES = 7900
+STATUS_NUMBER = (
+    "CASE status WHEN 'created' THEN 1 WHEN 'in_progress' THEN 2 "
+    "WHEN 'completed' THEN 3 END"
+)
+EVENTS = (
+    # event type, operation, transition table, transition rows
+    ('created', 'INSERT', 'NEW TABLE AS new_rows', 'new_rows'),
+    ('updated', 'UPDATE', 'NEW TABLE AS new_rows', 'new_rows'),
+    ('deleted', 'DELETE', 'OLD TABLE AS old_rows', 'old_rows'),
+)
+OUTBOX_TASK = (
+    "CASE WHEN payload IS NULL THEN NULL ELSE json_build_object("
+    "'id', task_id, 'title', payload->'title', "
+    "'description', payload->'description', "
+    "'status', payload->'status', 'version', payload->'version') END"
+)
+
+
+def feed_notify(event_type: str, rows: str) -> str:
+    task = (
+        'NULL'
+        if event_type == 'deleted'
+        else "json_build_object('id', id, 'title', title, "
+        "'description', description, "
+        f"'status', {STATUS_NUMBER}, 'version', version)"
+    )
+    return (
+        f"IF current_setting('{SETTING}', true) = 'on' THEN "
+        f"PERFORM pg_notify('{CHANNEL}', seq || ':{event_type}:' "
+        f'|| CASE WHEN octet_length(data) <= {MAX_PAYLOAD_BYTES} '
+        'THEN data ELSE short END) '
+        "FROM (SELECT nextval('task_event_seq') AS seq, "
+        f"json_build_object('type', '{event_type}', 'id', id, "
+        f"'task', {task})::text AS data, "
+        f"json_build_object('type', '{event_type}', 'id', id, 'task', NULL)"
+        f'::text AS short FROM {rows}) AS events ORDER BY seq; END IF;'
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP TRIGGER IF EXISTS task_outbox_notify ON task_outbox')
+    op.execute('DROP FUNCTION IF EXISTS task_outbox_notify()')
+    op.execute(sa.schema.CreateSequence(sa.Sequence('task_event_seq')))
+    for event_type, operation, transition, rows in EVENTS:
+        name = f'task_feed_{operation.lower()}'
+        op.execute(
+            f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN '
+            + feed_notify(event_type, rows)
+            + ' RETURN NULL; END $$'
+        )
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {operation} ON tasks '
+            f'REFERENCING {transition} FOR EACH STATEMENT '
+            f'EXECUTE FUNCTION {name}()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for _, operation, _, _ in EVENTS:
+        name = f'task_feed_{operation.lower()}'
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON tasks')
+        op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+    op.execute(sa.schema.DropSequence(sa.Sequence('task_event_seq')))
+    op.execute(
+        'CREATE OR REPLACE FUNCTION task_outbox_notify() RETURNS trigger '
+        'LANGUAGE plpgsql AS $$ BEGIN '
+        f"PERFORM pg_notify('{CHANNEL}', id || ':' || event_type || ':' "
+        f'|| CASE WHEN octet_length(data) <= {MAX_PAYLOAD_BYTES} '
+        'THEN data ELSE short END) '
+        'FROM (SELECT id, event_type, json_build_object('
+        f"'type', event_type, 'id', task_id, 'task', {OUTBOX_TASK})::text "
+        "AS data, json_build_object('type', event_type, 'id', task_id, "
+        "'task', NULL)::text AS short FROM new_rows) AS events ORDER BY id; "
+        'RETURN NULL; END $$'
+    )
+    op.execute(
+        'CREATE TRIGGER task_outbox_notify AFTER INSERT ON task_outbox '
+        'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT '
+        'EXECUTE FUNCTION task_outbox_notify()'
+    )
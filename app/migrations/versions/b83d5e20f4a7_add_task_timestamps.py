@@ -0,0 +1,41 @@
+"""add task created_at and updated_at
+
+Revision ID: b83d5e20f4a7
+Revises: 4f2a7c9e1d63
+Create Date: 2026-10-18 15:09:12.274851
+
+now() is stable, so on PostgreSQL 11+ both columns are added without a
+table rewrite: existing rows read the default recorded at ALTER time.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83d5e20f4a7'
+down_revision: Union[str, Sequence[str], None] = '4f2a7c9e1d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in ('created_at', 'updated_at'):
+        op.add_column(
+            'tasks',
+            sa.Column(
+                name,
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,203 @@
+"""add incrementally maintained task statistics
+
+Revision ID: c4e8b2d6f190
+Revises: a7d3f1c5e92b
+Create Date: 2026-10-18 18:05:12.417390
+
+task_status_counts holds the number of tasks per status and task_activity
+the tasks created and completed per UTC hour, both kept current by
+triggers on tasks so GET /tasks/stats reads a few dozen rows instead of
+counting the table. On PostgreSQL the triggers are statement level (one
+counter update per status per statement, also for bulk writes) and each
+backend writes to its own shard of every counter row; SQLite uses row
+triggers and a single shard.
+
+The triggers are created before the backfill in the same transaction.
+Creating them locks tasks against writes until commit, so no write can
+fall between the backfill and the first trigger run. Hourly creations
+are backfilled from created_at; past completions have no timestamp and
+start at zero.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8b2d6f190'
+down_revision: Union[str, Sequence[str], None] = 'a7d3f1c5e92b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARD = 'mod(pg_backend_pid(), 16)'
+STATUS_UPSERT = (
+    'INSERT INTO task_status_counts AS c (status, shard, count) '
+    'SELECT status, {shard}, sum(delta) FROM ({rows}) AS changes '
+    'GROUP BY status HAVING sum(delta) <> 0 ORDER BY status '
+    'ON CONFLICT (status, shard) '
+    'DO UPDATE SET count = c.count + excluded.count;'
+)
+CHANGED = (
+    'FROM old_rows o JOIN new_rows n ON n.id = o.id '
+    'WHERE n.status <> o.status'
+)
+POSTGRESQL_UPGRADE = (
+    'CREATE OR REPLACE FUNCTION task_stats_insert() RETURNS trigger '
+    'LANGUAGE plpgsql AS $$ BEGIN '
+    + STATUS_UPSERT.format(
+        shard=SHARD, rows='SELECT status, 1 AS delta FROM new_rows'
+    )
+    + ' INSERT INTO task_activity AS a (bucket, shard, created, completed) '
+    f"SELECT date_trunc('hour', created_at, 'UTC'), {SHARD}, "
+    'count(*), 0 FROM new_rows GROUP BY 1 ORDER BY 1 '
+    'ON CONFLICT (bucket, shard) '
+    'DO UPDATE SET created = a.created + excluded.created; '
+    'RETURN NULL; END $$',
+    'CREATE OR REPLACE FUNCTION task_stats_update() RETURNS trigger '
+    'LANGUAGE plpgsql AS $$ BEGIN '
+    + STATUS_UPSERT.format(
+        shard=SHARD,
+        rows=f'SELECT o.status, -1 AS delta {CHANGED} '
+        f'UNION ALL SELECT n.status, 1 {CHANGED}',
+    )
+    + ' INSERT INTO task_activity AS a (bucket, shard, created, completed) '
+    f"SELECT date_trunc('hour', now(), 'UTC'), {SHARD}, 0, count(*) "
+    f"{CHANGED} AND n.status = 'completed' HAVING count(*) > 0 "
+    'ON CONFLICT (bucket, shard) '
+    'DO UPDATE SET completed = a.completed + excluded.completed; '
+    'RETURN NULL; END $$',
+    'CREATE OR REPLACE FUNCTION task_stats_delete() RETURNS trigger '
+    'LANGUAGE plpgsql AS $$ BEGIN '
+    + STATUS_UPSERT.format(
+        shard=SHARD, rows='SELECT status, -1 AS delta FROM old_rows'
+    )
+    + ' RETURN NULL; END $$',
+    'CREATE TRIGGER task_stats_insert AFTER INSERT ON tasks '
+    'REFERENCING NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT EXECUTE FUNCTION task_stats_insert()',
+    'CREATE TRIGGER task_stats_update AFTER UPDATE ON tasks '
+    'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT EXECUTE FUNCTION task_stats_update()',
+    'CREATE TRIGGER task_stats_delete AFTER DELETE ON tasks '
+    'REFERENCING OLD TABLE AS old_rows '
+    'FOR EACH STATEMENT EXECUTE FUNCTION task_stats_delete()',
+    'INSERT INTO task_status_counts (status, shard, count) '
+    'SELECT status, 0, count(*) FROM tasks GROUP BY status',
+    'INSERT INTO task_activity (bucket, shard, created, completed) '
+    "SELECT date_trunc('hour', created_at, 'UTC'), 0, count(*), 0 "
+    'FROM tasks GROUP BY 1',
+)
+POSTGRESQL_DOWNGRADE = (
+    'DROP TRIGGER IF EXISTS task_stats_delete ON tasks',
+    'DROP TRIGGER IF EXISTS task_stats_update ON tasks',
+    'DROP TRIGGER IF EXISTS task_stats_insert ON tasks',
+    'DROP FUNCTION IF EXISTS task_stats_delete()',
+    'DROP FUNCTION IF EXISTS task_stats_update()',
+    'DROP FUNCTION IF EXISTS task_stats_insert()',
+)
+
+
+def sqlite_status_upsert(status: str, delta: int) -> str:
+    return (
+        'INSERT INTO task_status_counts (status, shard, count) '
+        f'VALUES ({status}, 0, {delta}) ON CONFLICT (status, shard) '
+        f'DO UPDATE SET count = count + {delta};'
+    )
+
+
+def sqlite_activity_upsert(timestamp: str, column: str) -> str:
+    return (
+        f'INSERT INTO task_activity (bucket, shard, {column}) '
+        f"VALUES (substr({timestamp}, 1, 13) || ':00:00.000000', 0, 1) "
+        'ON CONFLICT (bucket, shard) '
+        f'DO UPDATE SET {column} = {column} + 1;'
+    )
+
+
+SQLITE_UPGRADE = (
+    'CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON tasks '
+    'BEGIN '
+    + sqlite_status_upsert('new.status', 1)
+    + sqlite_activity_upsert('new.created_at', 'created')
+    + ' END',
+    'CREATE TRIGGER IF NOT EXISTS task_stats_update '
+    'AFTER UPDATE OF status ON tasks WHEN new.status <> old.status BEGIN '
+    + sqlite_status_upsert('old.status', -1)
+    + sqlite_status_upsert('new.status', 1)
+    + ' END',
+    'CREATE TRIGGER IF NOT EXISTS task_stats_complete '
+    'AFTER UPDATE OF status ON tasks '
+    "WHEN new.status = 'completed' AND old.status <> new.status BEGIN "
+    + sqlite_activity_upsert("datetime('now')", 'completed')
+    + ' END',
+    'CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON tasks '
+    'BEGIN ' + sqlite_status_upsert('old.status', -1) + ' END',
+    'INSERT INTO task_status_counts (status, shard, count) '
+    'SELECT status, 0, count(*) FROM tasks GROUP BY status',
+    'INSERT INTO task_activity (bucket, shard, created, completed) '
+    "SELECT substr(created_at, 1, 13) || ':00:00.000000', 0, count(*), 0 "
+    'FROM tasks GROUP BY 1',
+)
+SQLITE_DOWNGRADE = (
+    'DROP TRIGGER IF EXISTS task_stats_delete',
+    'DROP TRIGGER IF EXISTS task_stats_complete',
+    'DROP TRIGGER IF EXISTS task_stats_update',
+    'DROP TRIGGER IF EXISTS task_stats_insert',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_status_counts',
+        sa.Column(
+            'status',
+            sa.Enum(
+                'created', 'in_progress', 'completed',
+                name='status', native_enum=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column('shard', sa.Integer(), server_default='0', nullable=False),
+        sa.Column(
+            'count', sa.BigInteger(), server_default='0', nullable=False
+        ),
+        sa.PrimaryKeyConstraint('status', 'shard'),
+    )
+    op.create_table(
+        'task_activity',
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('shard', sa.Integer(), server_default='0', nullable=False),
+        sa.Column(
+            'created', sa.BigInteger(), server_default='0', nullable=False
+        ),
+        sa.Column(
+            'completed', sa.BigInteger(), server_default='0', nullable=False
+        ),
+        sa.PrimaryKeyConstraint('bucket', 'shard'),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statements = POSTGRESQL_UPGRADE
+    elif dialect == 'sqlite':
+        statements = SQLITE_UPGRADE
+    else:
+        statements = ()
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statements = POSTGRESQL_DOWNGRADE
+    elif dialect == 'sqlite':
+        statements = SQLITE_DOWNGRADE
+    else:
+        statements = ()
+    for statement in statements:
+        op.execute(statement)
+    op.drop_table('task_activity')
+    op.drop_table('task_status_counts')
@@ -0,0 +1,115 @@
+"""record task_outbox events only when the outbox is enabled
+
+Revision ID: c9f1e5b3a8d2
+Revises: b7e4d2a9c6f3
+Create Date: 2026-10-19 00:21:37.915246
+
+The outbox triggers inserted a row for every task write, even with
+OUTBOX_ENABLED=false: no dispatcher delivered the rows and compaction
+only deletes delivered ones, so task_outbox grew without bound and every
+write paid for the extra insert. The triggers now only record events when
+the app has the outbox enabled with a sink: on PostgreSQL for connections
+with app.task_outbox = 'on', which the engine sets; on SQLite when the
+task_outbox_enabled() function the app registers on every connection
+returns true. Writes from other clients (psql, batch jobs) record no
+events unless they set app.task_outbox themselves; on SQLite they fail
+with "no such function" unless they register it.
+
+Rows already accumulated while the outbox was disabled are kept; delete
+them with DELETE FROM task_outbox WHERE delivered_at IS NULL if no sink
+will ever read them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f1e5b3a8d2'
+down_revision: Union[str, Sequence[str], None] = 'b7e4d2a9c6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SETTING = 'app.task_outbox'
+STATUS_NUMBER = (
+    "CASE {row}.status WHEN 'created' THEN 1 WHEN 'in_progress' THEN 2 "
+    "WHEN 'completed' THEN 3 END"
+)
+EVENTS = (
+    # event type, operation, row alias
+    ('created', 'INSERT', 'new'),
+    ('updated', 'UPDATE', 'new'),
+    ('deleted', 'DELETE', 'old'),
+)
+
+
+def outbox_insert(event_type: str, row: str, function: str) -> str:
+    payload = (
+        'NULL'
+        if event_type == 'deleted'
+        else f"{function}('title', {row}.title, "
+        f"'description', {row}.description, "
+        f"'status', {STATUS_NUMBER.format(row=row)}, "
+        f"'version', {row}.version)"
+    )
+    return (
+        'INSERT INTO task_outbox (event_type, task_id, payload) '
+        f"SELECT '{event_type}', {row}.id, {payload}"
+    )
+
+
+def postgresql_functions(guarded: bool) -> list[str]:
+    statements = []
+    for event_type, operation, alias in EVENTS:
+        rows = f'{alias}_rows'
+        insert = (
+            outbox_insert(event_type, rows, 'json_build_object')
+            + f' FROM {rows};'
+        )
+        if guarded:
+            insert = (
+                f"IF current_setting('{SETTING}', true) = 'on' THEN "
+                f'{insert} END IF;'
+            )
+        statements.append(
+            f'CREATE OR REPLACE FUNCTION task_outbox_{operation.lower()}() '
+            'RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN '
+            f'{insert} RETURN NULL; END $$'
+        )
+    return statements
+
+
+def sqlite_triggers(guarded: bool) -> list[str]:
+    statements = []
+    for event_type, operation, alias in EVENTS:
+        name = f'task_outbox_{operation.lower()}'
+        when = 'WHEN task_outbox_enabled() ' if guarded else ''
+        statements += [
+            f'DROP TRIGGER IF EXISTS {name}',
+            f'CREATE TRIGGER {name} AFTER {operation} ON tasks {when}BEGIN '
+            + outbox_insert(event_type, alias, 'json_object')
+            + '; END',
+        ]
+    return statements
+
+
+def replace_triggers(guarded: bool) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statements = postgresql_functions(guarded)
+    elif dialect == 'sqlite':
+        statements = sqlite_triggers(guarded)
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    replace_triggers(guarded=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    replace_triggers(guarded=False)
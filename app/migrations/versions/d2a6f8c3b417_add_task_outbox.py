@@ -0,0 +1,140 @@
+"""add transactional outbox for task events
+
+Revision ID: d2a6f8c3b417
+Revises: 5b9e3f71a2c4
+Create Date: 2026-10-18 20:41:09.562817
+
+task_outbox receives one row per inserted, updated and deleted task,
+written by triggers in the transaction of the write. Like the counter
+triggers, the PostgreSQL ones are statement level over transition
+tables. app.outbox.OutboxDispatcher delivers pending rows (served by the
+partial index ix_task_outbox_pending) and deletes delivered ones after
+OUTBOX_RETENTION_SECONDS. Existing tasks get no events.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f8c3b417'
+down_revision: Union[str, Sequence[str], None] = '5b9e3f71a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_NUMBER = (
+    "CASE {row}.status WHEN 'created' THEN 1 WHEN 'in_progress' THEN 2 "
+    "WHEN 'completed' THEN 3 END"
+)
+EVENTS = (
+    # event type, operation, transition table, row alias
+    ('created', 'INSERT', 'NEW TABLE AS new_rows', 'new'),
+    ('updated', 'UPDATE', 'NEW TABLE AS new_rows', 'new'),
+    ('deleted', 'DELETE', 'OLD TABLE AS old_rows', 'old'),
+)
+
+
+def outbox_insert(event_type: str, row: str, function: str) -> str:
+    payload = (
+        'NULL'
+        if event_type == 'deleted'
+        else f"{function}('title', {row}.title, "
+        f"'description', {row}.description, "
+        f"'status', {STATUS_NUMBER.format(row=row)}, "
+        f"'version', {row}.version)"
+    )
+    return (
+        'INSERT INTO task_outbox (event_type, task_id, payload) '
+        f"SELECT '{event_type}', {row}.id, {payload}"
+    )
+
+
+def postgresql_upgrade() -> list[str]:
+    statements = []
+    for event_type, operation, transition, alias in EVENTS:
+        name = f'task_outbox_{operation.lower()}'
+        rows = f'{alias}_rows'
+        statements += [
+            f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN '
+            + outbox_insert(event_type, rows, 'json_build_object')
+            + f' FROM {rows}; RETURN NULL; END $$',
+            f'CREATE TRIGGER {name} AFTER {operation} ON tasks '
+            f'REFERENCING {transition} FOR EACH STATEMENT '
+            f'EXECUTE FUNCTION {name}()',
+        ]
+    return statements
+
+
+def sqlite_upgrade() -> list[str]:
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS task_outbox_{operation.lower()} '
+        f'AFTER {operation} ON tasks BEGIN '
+        + outbox_insert(event_type, alias, 'json_object')
+        + '; END'
+        for event_type, operation, _, alias in EVENTS
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_outbox',
+        sa.Column(
+            'id',
+            sa.BigInteger().with_variant(sa.Integer(), 'sqlite'),
+            nullable=False,
+        ),
+        sa.Column('event_type', sa.String(length=16), nullable=False),
+        sa.Column('task_id', sa.UUID(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            'available_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            'attempts', sa.Integer(), server_default='0', nullable=False
+        ),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_task_outbox_pending',
+        'task_outbox',
+        ['id'],
+        postgresql_where=sa.text('delivered_at IS NULL'),
+        sqlite_where=sa.text('delivered_at IS NULL'),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statements = postgresql_upgrade()
+    elif dialect == 'sqlite':
+        statements = sqlite_upgrade()
+    else:
+        statements = []
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for _, operation, _, _ in EVENTS:
+        name = f'task_outbox_{operation.lower()}'
+        if dialect == 'postgresql':
+            op.execute(f'DROP TRIGGER IF EXISTS {name} ON tasks')
+            op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+        elif dialect == 'sqlite':
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_index('ix_task_outbox_pending', table_name='task_outbox')
+    op.drop_table('task_outbox')
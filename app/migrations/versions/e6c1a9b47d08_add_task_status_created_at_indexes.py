@@ -0,0 +1,113 @@
+"""add task indexes for (created_at, id) keyset listing
+
+Revision ID: e6c1a9b47d08
+Revises: b83d5e20f4a7
+Create Date: 2026-10-18 15:21:37.905163
+
+GET /tasks/ orders by (created_at, id) and pages with a row comparison,
+optionally filtered by status and title prefix. Each index is built with
+CREATE INDEX CONCURRENTLY outside the migration transaction, so writes
+continue while it builds. A failed concurrent build leaves an INVALID
+index behind; every step drops it first, so rerunning the migration is
+safe.
+
+Expected plans on PostgreSQL, one Limit node over an index scan with no
+Sort in every case:
+
+    -- first page / next page
+    SELECT ... FROM tasks WHERE (created_at, id) > ($1, $2)
+    ORDER BY created_at, id LIMIT $3
+      Limit -> Index Scan using ix_tasks_created_at_id
+                 Index Cond: (ROW(created_at, id) > ROW($1, $2))
+
+    -- open statuses: status is rendered inline, so the partial index
+    -- predicate is matched even for prepared statements
+    ... WHERE status = 'created' AND (created_at, id) > ($1, $2) ...
+      Limit -> Index Scan using ix_tasks_status_created_created_at
+
+    -- completed, or any status under a generic plan
+    ... WHERE status = 'completed' AND (created_at, id) > ($1, $2) ...
+      Limit -> Index Scan using ix_tasks_status_created_at
+                 Index Cond: (status = 'completed' AND
+                              ROW(created_at, id) > ROW($1, $2))
+
+    -- title prefix: ix_tasks_title_prefix (varchar_pattern_ops) turns
+    -- LIKE 'abc%' into a range scan, followed by a top-N Sort when the
+    -- prefix matches few rows; for broad prefixes the planner prefers
+    -- walking ix_tasks_created_at_id with a Filter.
+
+ix_tasks_status_id (status, id) served the old id ordering and is
+dropped. Status stays a VARCHAR: converting it to a smallint would
+rewrite the table under an exclusive lock, and the indexes above make its
+width irrelevant to these lookups.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c1a9b47d08'
+down_revision: Union[str, Sequence[str], None] = 'b83d5e20f4a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATUSES = ('created', 'in_progress')
+
+
+def _indexes() -> list[tuple[str, list[str], str | None]]:
+    return [
+        ('ix_tasks_created_at_id', ['created_at', 'id'], None),
+        (
+            'ix_tasks_status_created_at',
+            ['status', 'created_at', 'id'],
+            None,
+        ),
+        *(
+            (
+                f'ix_tasks_status_{status}_created_at',
+                ['created_at', 'id'],
+                f"status = '{status}'",
+            )
+            for status in OPEN_STATUSES
+        ),
+    ]
+
+
+def _create_index(name: str, columns: list[str], where: str | None):
+    op.drop_index(
+        name, table_name='tasks', if_exists=True,
+        postgresql_concurrently=True,
+    )
+    op.create_index(
+        name,
+        'tasks',
+        columns,
+        unique=False,
+        postgresql_concurrently=True,
+        postgresql_where=sa.text(where) if where else None,
+        sqlite_where=sa.text(where) if where else None,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns, where in _indexes():
+            _create_index(name, columns, where)
+        op.drop_index(
+            'ix_tasks_status_id', table_name='tasks', if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _create_index('ix_tasks_status_id', ['status', 'id'], None)
+        for name, _, _ in reversed(_indexes()):
+            op.drop_index(
+                name, table_name='tasks', if_exists=True,
+                postgresql_concurrently=True,
+            )
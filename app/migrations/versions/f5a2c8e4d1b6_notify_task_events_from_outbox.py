@@ -0,0 +1,65 @@
+"""send change feed events with NOTIFY from the outbox trigger
+
+Revision ID: f5a2c8e4d1b6
+Revises: d2a6f8c3b417
+Create Date: 2026-10-18 23:05:52.317406
+
+FEED_BACKEND=postgres used to NOTIFY on a separate connection after the
+write committed, numbering events with task_event_seq. A statement-level
+trigger on task_outbox now sends every event inside the write
+transaction, numbered by its outbox row id, so PostgreSQL delivers it at
+commit and in commit order. task_event_seq is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a2c8e4d1b6'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f8c3b417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANNEL = 'task_events'
+MAX_PAYLOAD_BYTES = 7900
+TASK = (
+    "CASE WHEN payload IS NULL THEN NULL ELSE json_build_object("
+    "'id', task_id, 'title', payload->'title', "
+    "'description', payload->'description', "
+    "'status', payload->'status', 'version', payload->'version') END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        'CREATE OR REPLACE FUNCTION task_outbox_notify() RETURNS trigger '
+        'LANGUAGE plpgsql AS $$ BEGIN '
+        f"PERFORM pg_notify('{CHANNEL}', id || ':' || event_type || ':' "
+        f'|| CASE WHEN octet_length(data) <= {MAX_PAYLOAD_BYTES} '
+        'THEN data ELSE short END) '
+        'FROM (SELECT id, event_type, json_build_object('
+        f"'type', event_type, 'id', task_id, 'task', {TASK})::text AS data, "
+        "json_build_object('type', event_type, 'id', task_id, 'task', NULL)"
+        '::text AS short FROM new_rows) AS events ORDER BY id; '
+        'RETURN NULL; END $$'
+    )
+    op.execute(
+        'CREATE TRIGGER task_outbox_notify AFTER INSERT ON task_outbox '
+        'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT '
+        'EXECUTE FUNCTION task_outbox_notify()'
+    )
+    op.execute(sa.schema.DropSequence(sa.Sequence('task_event_seq')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(sa.schema.CreateSequence(sa.Sequence('task_event_seq')))
+    op.execute('DROP TRIGGER IF EXISTS task_outbox_notify ON task_outbox')
+    op.execute('DROP FUNCTION IF EXISTS task_outbox_notify()')
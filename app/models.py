@@ -1,7 +1,27 @@
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import (
+    DDL,
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    String,
+    Enum,
+    Index,
+    Integer,
+    Sequence,
+    column,
+    event,
+    func,
+    table,
+    text,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from app.database import Base
+from app.common.ids import uuid7
+from app.config import settings
+from app.database import FEED_SETTING, OUTBOX_SETTING, Base
 import uuid
+from datetime import datetime, timezone
 from enum import IntEnum
 
 
@@ -11,14 +31,47 @@ class Status(IntEnum):
     completed = 3
 
 
+OPEN_STATUSES = (Status.created, Status.in_progress)
+
+
+def new_task_id() -> uuid.UUID:
+    if settings.TASK_ID_VERSION == 7:
+        return uuid7()
+    return uuid.uuid4()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _open_status_index(status: Status) -> Index:
+    where = text(f"status = '{status.name}'")
+    return Index(
+        f"ix_tasks_status_{status.name}_created_at",
+        "created_at",
+        "id",
+        postgresql_where=where,
+        sqlite_where=where,
+    )
+
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at", "status", "created_at", "id"),
+        *(_open_status_index(status) for status in OPEN_STATUSES),
+        Index(
+            "ix_tasks_title_prefix",
+            "title",
+            postgresql_ops={"title": "varchar_pattern_ops"},
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
-        unique=True,
+        default=new_task_id,
         nullable=False,
     )
     title = Column(String, nullable=False)
@@ -26,3 +79,397 @@ class Task(Base):
     status = Column(
         Enum(Status, native_enum=False), default=Status.created, nullable=False
     )
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # Set in Python so every row carries microseconds in the same format;
+    # the server default covers rows written outside the application.
+    created_at = Column(
+        DateTime(timezone=True),
+        default=utcnow,
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+# Full-text search. PostgreSQL keeps a generated tsvector column with a
+# GIN index; SQLite keeps an FTS5 table in sync through triggers. Neither
+# is mapped on Task, so ordinary queries never load them.
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', description), 'B')"
+)
+POSTGRESQL_SEARCH_DDL = (
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector "
+    "ON tasks USING gin (search_vector)",
+)
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+    "USING fts5(id UNINDEXED, title, description)",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks "
+    "BEGIN INSERT INTO tasks_fts (id, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks "
+    "BEGIN DELETE FROM tasks_fts WHERE id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update "
+    "AFTER UPDATE OF title, description ON tasks "
+    "BEGIN DELETE FROM tasks_fts WHERE id = old.id; "
+    "INSERT INTO tasks_fts (id, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+)
+
+search_fts = table("tasks_fts", column("tasks_fts"), column("id"))
+
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
+
+
+# Aggregated statistics, maintained by triggers inside the transaction of
+# every write to tasks, so GET /tasks/stats never scans tasks. Concurrent
+# PostgreSQL writers spread their increments over STATS_SHARDS rows per
+# key (picked by backend pid) instead of queueing on one hot row; readers
+# sum the shards. SQLite has a single writer and always uses shard 0.
+STATS_SHARDS = 16
+
+
+class TaskStatusCount(Base):
+    __tablename__ = "task_status_counts"
+
+    status = Column(Enum(Status, native_enum=False), primary_key=True)
+    shard = Column(
+        Integer, primary_key=True, default=0, server_default="0"
+    )
+    count = Column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+
+
+class TaskActivity(Base):
+    """Tasks created, and status changes to completed, per UTC hour.
+
+    Both are event counts: deleting a task does not take back its
+    creation or completion.
+    """
+
+    __tablename__ = "task_activity"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    shard = Column(
+        Integer, primary_key=True, default=0, server_default="0"
+    )
+    created = Column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+    completed = Column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+
+
+# The triggers on tasks write to the counter tables: create those first.
+Task.__table__.add_is_dependent_on(TaskStatusCount.__table__)
+Task.__table__.add_is_dependent_on(TaskActivity.__table__)
+
+_PG_SHARD = f"mod(pg_backend_pid(), {STATS_SHARDS})"
+_PG_STATUS_UPSERT = (
+    "INSERT INTO task_status_counts AS c (status, shard, count) "
+    "SELECT status, {shard}, sum(delta) FROM ({rows}) AS changes "
+    "GROUP BY status HAVING sum(delta) <> 0 ORDER BY status "
+    "ON CONFLICT (status, shard) "
+    "DO UPDATE SET count = c.count + excluded.count;"
+)
+_PG_CHANGED = (
+    "FROM old_rows o JOIN new_rows n ON n.id = o.id "
+    "WHERE n.status <> o.status"
+)
+_PG_COMPLETED = Status.completed.name
+POSTGRESQL_STATS_DDL = (
+    "CREATE OR REPLACE FUNCTION task_stats_insert() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    + _PG_STATUS_UPSERT.format(
+        shard=_PG_SHARD, rows="SELECT status, 1 AS delta FROM new_rows"
+    )
+    + " INSERT INTO task_activity AS a (bucket, shard, created, completed) "
+    f"SELECT date_trunc('hour', created_at, 'UTC'), {_PG_SHARD}, "
+    "count(*), 0 FROM new_rows GROUP BY 1 ORDER BY 1 "
+    "ON CONFLICT (bucket, shard) "
+    "DO UPDATE SET created = a.created + excluded.created; "
+    "RETURN NULL; END $$",
+    "CREATE OR REPLACE FUNCTION task_stats_update() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    + _PG_STATUS_UPSERT.format(
+        shard=_PG_SHARD,
+        rows=f"SELECT o.status, -1 AS delta {_PG_CHANGED} "
+        f"UNION ALL SELECT n.status, 1 {_PG_CHANGED}",
+    )
+    + " INSERT INTO task_activity AS a (bucket, shard, created, completed) "
+    f"SELECT date_trunc('hour', now(), 'UTC'), {_PG_SHARD}, 0, count(*) "
+    f"{_PG_CHANGED} AND n.status = '{_PG_COMPLETED}' HAVING count(*) > 0 "
+    "ON CONFLICT (bucket, shard) "
+    "DO UPDATE SET completed = a.completed + excluded.completed; "
+    "RETURN NULL; END $$",
+    "CREATE OR REPLACE FUNCTION task_stats_delete() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    + _PG_STATUS_UPSERT.format(
+        shard=_PG_SHARD, rows="SELECT status, -1 AS delta FROM old_rows"
+    )
+    + " RETURN NULL; END $$",
+    # Statement-level triggers see all rows of a bulk write at once and
+    # touch each counter row once per statement.
+    "CREATE TRIGGER task_stats_insert AFTER INSERT ON tasks "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_insert()",
+    "CREATE TRIGGER task_stats_update AFTER UPDATE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_update()",
+    "CREATE TRIGGER task_stats_delete AFTER DELETE ON tasks "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_stats_delete()",
+)
+
+
+def _sqlite_status_upsert(status: str, delta: int) -> str:
+    return (
+        "INSERT INTO task_status_counts (status, shard, count) "
+        f"VALUES ({status}, 0, {delta}) ON CONFLICT (status, shard) "
+        f"DO UPDATE SET count = count + {delta};"
+    )
+
+
+def _sqlite_activity_upsert(timestamp: str, column: str) -> str:
+    # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS[.ffffff]'.
+    return (
+        f"INSERT INTO task_activity (bucket, shard, {column}) "
+        f"VALUES (substr({timestamp}, 1, 13) || ':00:00.000000', 0, 1) "
+        "ON CONFLICT (bucket, shard) "
+        f"DO UPDATE SET {column} = {column} + 1;"
+    )
+
+
+SQLITE_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON tasks "
+    "BEGIN "
+    + _sqlite_status_upsert("new.status", 1)
+    + _sqlite_activity_upsert("new.created_at", "created")
+    + " END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_update "
+    "AFTER UPDATE OF status ON tasks WHEN new.status <> old.status BEGIN "
+    + _sqlite_status_upsert("old.status", -1)
+    + _sqlite_status_upsert("new.status", 1)
+    + " END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_complete "
+    "AFTER UPDATE OF status ON tasks "
+    f"WHEN new.status = '{Status.completed.name}' "
+    "AND old.status <> new.status BEGIN "
+    + _sqlite_activity_upsert("datetime('now')", "completed")
+    + " END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON tasks "
+    "BEGIN " + _sqlite_status_upsert("old.status", -1) + " END",
+)
+
+for _statement in POSTGRESQL_STATS_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+for _statement in SQLITE_STATS_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+
+class TaskOutbox(Base):
+    """Task events awaiting delivery by app.outbox.OutboxDispatcher.
+
+    Rows are written by triggers on tasks, in the transaction of the
+    write that caused them. ``payload`` holds the task after the change
+    (None for deletes).
+
+    Nothing would deliver or delete the rows without a dispatcher, so the
+    triggers only record events while app.database.outbox_enabled(): on
+    PostgreSQL for connections with app.task_outbox = 'on' (set by the
+    engine), on SQLite through the task_outbox_enabled() function the app
+    registers on every connection.
+    """
+
+    __tablename__ = "task_outbox"
+    __table_args__ = (
+        Index(
+            "ix_task_outbox_pending",
+            "id",
+            postgresql_where=text("delivered_at IS NULL"),
+            sqlite_where=text("delivered_at IS NULL"),
+        ),
+    )
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    event_type = Column(String(16), nullable=False)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSON)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    available_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    attempts = Column(Integer, server_default="0", nullable=False)
+    last_error = Column(Text)
+    delivered_at = Column(DateTime(timezone=True))
+
+
+Task.__table__.add_is_dependent_on(TaskOutbox.__table__)
+
+
+def _status_number(status: str) -> str:
+    # Events carry the numeric status, as the API does.
+    whens = " ".join(f"WHEN '{s.name}' THEN {s.value}" for s in Status)
+    return f"CASE {status} {whens} END"
+
+
+def _outbox_insert(event_type: str, row: str, select: str) -> str:
+    payload = (
+        "NULL"
+        if event_type == "deleted"
+        else f"{select}_object('title', {row}.title, "
+        f"'description', {row}.description, "
+        f"'status', {_status_number(f'{row}.status')}, "
+        f"'version', {row}.version)"
+    )
+    return (
+        "INSERT INTO task_outbox (event_type, task_id, payload) "
+        f"SELECT '{event_type}', {row}.id, {payload}"
+    )
+
+
+POSTGRESQL_OUTBOX_DDL = tuple(
+    statement
+    for event_type, operation, rows, transition in (
+        ("created", "INSERT", "new_rows", "NEW TABLE AS new_rows"),
+        ("updated", "UPDATE", "new_rows", "NEW TABLE AS new_rows"),
+        ("deleted", "DELETE", "old_rows", "OLD TABLE AS old_rows"),
+    )
+    for statement in (
+        f"CREATE OR REPLACE FUNCTION task_outbox_{operation.lower()}() "
+        "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        f"IF current_setting('{OUTBOX_SETTING}', true) = 'on' THEN "
+        + _outbox_insert(event_type, rows, "json_build")
+        + f" FROM {rows}; END IF; RETURN NULL; END $$",
+        f"CREATE TRIGGER task_outbox_{operation.lower()} "
+        f"AFTER {operation} ON tasks REFERENCING {transition} "
+        "FOR EACH STATEMENT "
+        f"EXECUTE FUNCTION task_outbox_{operation.lower()}()",
+    )
+)
+SQLITE_OUTBOX_DDL = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS task_outbox_{operation.lower()} "
+    f"AFTER {operation} ON tasks WHEN task_outbox_enabled() BEGIN "
+    + _outbox_insert(event_type, row, "json")
+    + "; END"
+    for event_type, operation, row in (
+        ("created", "INSERT", "new"),
+        ("updated", "UPDATE", "new"),
+        ("deleted", "DELETE", "old"),
+    )
+)
+
+for _statement in POSTGRESQL_OUTBOX_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+for _statement in SQLITE_OUTBOX_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+# Change feed: triggers on tasks send every event with NOTIFY from the write
+# transaction, so it costs no extra round trip, is sent if and only if the
+# write commits, and listeners receive events in commit order. NOTIFY takes
+# a database-wide lock at commit that serializes committing writers, so
+# the triggers only notify on connections with app.task_feed = 'on', which
+# the engine sets when FEED_BACKEND resolves to postgres (see
+# app.database.engine_options). NOTIFY payloads are limited to 8000 bytes;
+# larger events go out without the task body and subscribers fetch it.
+FEED_CHANNEL = "task_events"
+FEED_MAX_PAYLOAD_BYTES = 7900
+
+# Sequence numbers of change feed events.
+TASK_EVENT_SEQUENCE = Sequence("task_event_seq", metadata=Base.metadata)
+
+
+def _feed_notify(event_type: str, rows: str) -> str:
+    task = (
+        "NULL"
+        if event_type == "deleted"
+        else "json_build_object('id', id, 'title', title, "
+        "'description', description, "
+        f"'status', {_status_number('status')}, 'version', version)"
+    )
+    return (
+        f"IF current_setting('{FEED_SETTING}', true) = 'on' THEN "
+        f"PERFORM pg_notify('{FEED_CHANNEL}', seq || ':{event_type}:' "
+        f"|| CASE WHEN octet_length(data) <= {FEED_MAX_PAYLOAD_BYTES} "
+        "THEN data ELSE short END) "
+        "FROM (SELECT nextval('task_event_seq') AS seq, "
+        f"json_build_object('type', '{event_type}', 'id', id, "
+        f"'task', {task})::text AS data, "
+        f"json_build_object('type', '{event_type}', 'id', id, 'task', NULL)"
+        f"::text AS short FROM {rows}) AS events ORDER BY seq; END IF;"
+    )
+
+
+POSTGRESQL_FEED_DDL = tuple(
+    statement
+    for event_type, operation, rows, transition in (
+        ("created", "INSERT", "new_rows", "NEW TABLE AS new_rows"),
+        ("updated", "UPDATE", "new_rows", "NEW TABLE AS new_rows"),
+        ("deleted", "DELETE", "old_rows", "OLD TABLE AS old_rows"),
+    )
+    for statement in (
+        f"CREATE OR REPLACE FUNCTION task_feed_{operation.lower()}() "
+        "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        + _feed_notify(event_type, rows)
+        + " RETURN NULL; END $$",
+        f"CREATE TRIGGER task_feed_{operation.lower()} "
+        f"AFTER {operation} ON tasks REFERENCING {transition} "
+        "FOR EACH STATEMENT "
+        f"EXECUTE FUNCTION task_feed_{operation.lower()}()",
+    )
+)
+
+for _statement in POSTGRESQL_FEED_DDL:
+    event.listen(
+        Task.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
@@ -0,0 +1,280 @@
+"""Deliver task events from the task_outbox table to a sink.
+
+With OUTBOX_ENABLED and a sink, triggers on tasks write an outbox row in
+the same transaction as every insert, update and delete, so an event
+exists if and only if its change committed. OutboxDispatcher claims
+pending rows in batches, hands them to a sink and marks them delivered; a
+failed batch is retried with exponential backoff. Delivery is at least
+once: a crash between the sink accepting a batch and the commit marking
+it delivered sends it again. Events of one task can overtake each other
+when a batch is retried, so consumers should compare ``task.version``.
+
+Every worker runs a dispatcher; on PostgreSQL they claim disjoint
+batches with FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import importlib
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Sequence
+
+from sqlalchemy import BigInteger, any_, bindparam, delete, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from app.common import metrics
+from app.common.logs import logger
+from app.common.serialization import dumps
+from app.config import settings
+from app.models import TaskOutbox, utcnow
+
+OUTBOX_DELIVERED = metrics.counter(
+    "outbox_events_delivered_total", "Outbox events accepted by the sink."
+)
+OUTBOX_FAILURES = metrics.counter(
+    "outbox_delivery_failures_total",
+    "Outbox batches the sink rejected; their events are retried.",
+)
+OUTBOX_COMPACTED = metrics.counter(
+    "outbox_events_compacted_total",
+    "Delivered outbox rows deleted after the retention period.",
+)
+OUTBOX_LAG = metrics.histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from the write that produced an event to its delivery.",
+)
+
+ERROR_MAX_LENGTH = 500
+
+
+class OutboxSink:
+    """Receives batches of events; raising makes the batch retry."""
+
+    async def send(self, events: Sequence[dict]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class QueueSink(OutboxSink):
+    def __init__(self, queue: asyncio.Queue | None = None) -> None:
+        self.queue = queue if queue is not None else asyncio.Queue()
+
+    async def send(self, events: Sequence[dict]) -> None:
+        for event in events:
+            await self.queue.put(event)
+
+
+class FileSink(OutboxSink):
+    """Append events to a file as newline-delimited JSON."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def _write(self, chunk: bytes) -> None:
+        with self.path.open("ab") as file:
+            file.write(chunk)
+
+    async def send(self, events: Sequence[dict]) -> None:
+        chunk = b"".join(dumps(event) + b"\n" for event in events)
+        await asyncio.to_thread(self._write, chunk)
+
+
+def event_from_row(row) -> dict:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "task_id": str(row.task_id),
+        "task": row.payload,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        sink: OutboxSink,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        retry_base: float = 1.0,
+        retry_max: float = 300.0,
+        retention: float = 3600.0,
+        clock: Callable = utcnow,
+    ) -> None:
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention = timedelta(seconds=retention)
+        self.clock = clock
+
+    @staticmethod
+    def _id_in(db: AsyncSession, ids: list[int]):
+        if db.get_bind().dialect.name == "postgresql":
+            return TaskOutbox.id == any_(
+                bindparam("ids", ids, type_=ARRAY(BigInteger))
+            )
+        return TaskOutbox.id.in_(ids)
+
+    def _claim_query(self, now):
+        return (
+            select(
+                TaskOutbox.id,
+                TaskOutbox.event_type,
+                TaskOutbox.task_id,
+                TaskOutbox.payload,
+                TaskOutbox.created_at,
+                TaskOutbox.attempts,
+            )
+            .where(
+                TaskOutbox.delivered_at.is_(None),
+                TaskOutbox.available_at <= now,
+            )
+            .order_by(TaskOutbox.id)
+            .limit(self.batch_size)
+            # Concurrent dispatchers skip each other's claimed rows
+            # instead of waiting for them; ignored by SQLite.
+            .with_for_update(skip_locked=True)
+        )
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2**attempts)
+
+    async def dispatch_batch(self) -> int:
+        """Deliver one batch; returns the number of events it held."""
+        async with self.session_factory() as db:
+            now = self.clock()
+            rows = (await db.execute(self._claim_query(now))).all()
+            if not rows:
+                await db.rollback()
+                return 0
+            ids = [row.id for row in rows]
+            # The row locks are held while the sink works, so another
+            # dispatcher never delivers the same batch concurrently.
+            try:
+                await self.sink.send([event_from_row(row) for row in rows])
+            except Exception as e:
+                OUTBOX_FAILURES.inc()
+                attempts = max(row.attempts for row in rows)
+                delay = self._retry_delay(attempts)
+                logger.warning(
+                    "Outbox delivery of %s events failed, retrying in %ss: "
+                    "%s",
+                    len(rows),
+                    delay,
+                    e,
+                )
+                await db.execute(
+                    update(TaskOutbox)
+                    .where(self._id_in(db, ids))
+                    .values(
+                        attempts=TaskOutbox.attempts + 1,
+                        available_at=now + timedelta(seconds=delay),
+                        last_error=str(e)[:ERROR_MAX_LENGTH],
+                    )
+                )
+                await db.commit()
+                return len(rows)
+            delivered_at = self.clock()
+            await db.execute(
+                update(TaskOutbox)
+                .where(self._id_in(db, ids))
+                .values(delivered_at=delivered_at)
+            )
+            await db.commit()
+        OUTBOX_DELIVERED.inc(len(rows))
+        for row in rows:
+            created_at = row.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=delivered_at.tzinfo)
+            OUTBOX_LAG.observe(
+                max(0.0, (delivered_at - created_at).total_seconds())
+            )
+        return len(rows)
+
+    async def compact(self) -> int:
+        """Delete delivered rows older than the retention period."""
+        cutoff = self.clock() - self.retention
+        deleted = 0
+        async with self.session_factory() as db:
+            while True:
+                batch = (
+                    select(TaskOutbox.id)
+                    .where(TaskOutbox.delivered_at < cutoff)
+                    .order_by(TaskOutbox.id)
+                    .limit(self.batch_size)
+                    .scalar_subquery()
+                )
+                result = await db.execute(
+                    delete(TaskOutbox)
+                    .where(TaskOutbox.id.in_(batch))
+                    .execution_options(synchronize_session=False)
+                )
+                # Short transactions: compaction never holds locks on a
+                # large part of the table.
+                await db.commit()
+                deleted += result.rowcount
+                if result.rowcount < self.batch_size:
+                    break
+        OUTBOX_COMPACTED.inc(deleted)
+        return deleted
+
+    async def run(self, compact_interval: float = 60.0) -> None:
+        compacted_at = time.monotonic()
+        while True:
+            try:
+                delivered = await self.dispatch_batch()
+                if time.monotonic() - compacted_at >= compact_interval:
+                    compacted_at = time.monotonic()
+                    await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Outbox dispatcher failed: %s", e)
+                delivered = 0
+            # A full batch means more are likely waiting.
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+def build_sink() -> OutboxSink | None:
+    """The configured sink, or None for OUTBOX_SINK=none."""
+    if settings.OUTBOX_SINK == "file":
+        return FileSink(settings.OUTBOX_FILE_PATH)
+    if ":" in settings.OUTBOX_SINK:
+        # "package.module:factory", called without arguments.
+        module, _, name = settings.OUTBOX_SINK.partition(":")
+        return getattr(importlib.import_module(module), name)()
+    return None
+
+
+def build_dispatcher() -> OutboxDispatcher:
+    """A dispatcher for the configured sink.
+
+    Raises RuntimeError for OUTBOX_SINK=none, so that OUTBOX_ENABLED=true
+    without a sink fails at startup: the triggers record no events without
+    a sink (see app.database.outbox_enabled), and the outbox would
+    silently stay empty.
+    """
+    from app.database import SessionLocal
+
+    sink = build_sink()
+    if sink is None:
+        raise RuntimeError(
+            "OUTBOX_ENABLED=true requires OUTBOX_SINK (file or "
+            '"package.module:factory")'
+        )
+    return OutboxDispatcher(
+        SessionLocal,
+        sink,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        poll_interval=settings.OUTBOX_POLL_SECONDS,
+        retry_max=settings.OUTBOX_RETRY_MAX_SECONDS,
+        retention=settings.OUTBOX_RETENTION_SECONDS,
+    )
@@ -1,36 +1,331 @@
-from fastapi import APIRouter, Depends, status
+from enum import Enum
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from sqlalchemy.orm import Session
 
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.common.etag import (
+    if_match_versions,
+    if_none_match,
+    list_etag,
+    task_etag,
+)
+from app.common.export import csv_chunk, ndjson_chunk
+from app.common.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+from app.common.serialization import dumps, task_row_to_dict
+from app.config import settings
+from app.exceptions import InvalidCursorError
+from app.feed import change_feed
+from app.models import Status
+from app.schemas import (
+    BulkItemStatus,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskLookupResult,
+    TaskUpdate,
+    TaskResponse,
+    TaskStats,
+)
+from app.services.stats_service import StatsService
 from app.services.task_service import TaskService
-from app.database import get_db
+from app.database import get_db, get_read_db, read_session
 
 
 router = APIRouter()
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+async def _export_chunks(
+    db: Session, export_format: ExportFormat, task_status: Status | None
+):
+    # A request-scoped session from a dependency may be closed before the
+    # body is streamed, so the export owns its session for the whole
+    # response.
+    async with db:
+        header = True
+        async for rows in TaskService.stream_tasks(
+            db, settings.TASKS_EXPORT_BATCH_SIZE, status=task_status
+        ):
+            if export_format is ExportFormat.csv:
+                yield csv_chunk(rows, header=header)
+                header = False
+            else:
+                yield ndjson_chunk(rows)
+        if export_format is ExportFormat.csv and header:
+            yield csv_chunk([], header=True)
+
+
 @router.get(
     "/", response_model=list[TaskResponse], status_code=status.HTTP_200_OK
 )
-async def get_tasks(db: Session = Depends(get_db)):
-    tasks = await TaskService.get_tasks(db)
+async def get_tasks(
+    response: Response,
+    limit: int = Query(
+        settings.TASKS_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE
+    ),
+    cursor: str | None = None,
+    task_status: Status | None = Query(None, alias="status"),
+    title_prefix: str | None = None,
+    if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+    get_page = (
+        TaskService.get_task_rows
+        if settings.TASKS_FAST_JSON
+        else TaskService.get_tasks
+    )
+    tasks = await get_page(
+        db,
+        limit=limit + 1,
+        after=after,
+        status=task_status,
+        title_prefix=title_prefix,
+    )
+    headers = {}
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(
+            tasks[-1].created_at, tasks[-1].id
+        )
+    headers["ETag"] = list_etag(tasks)
+    if if_none_match(if_none_match_header, headers["ETag"]):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    if settings.TASKS_FAST_JSON:
+        return Response(
+            dumps([task_row_to_dict(row) for row in tasks]),
+            media_type="application/json",
+            headers=headers,
+        )
+    response.headers.update(headers)
     return tasks
 
 
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_tasks(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    task_status: Status | None = Query(None, alias="status"),
+):
+    chunks = _export_chunks(read_session(request), export_format, task_status)
+    if export_format is ExportFormat.csv:
+        return StreamingResponse(
+            chunks,
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": 'attachment; filename="tasks.csv"'
+            },
+        )
+    return StreamingResponse(
+        chunks,
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/changes", status_code=status.HTTP_200_OK)
+async def stream_changes(
+    after: int | None = Query(None, ge=0),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+):
+    # EventSource sends Last-Event-ID on reconnect; it wins over ?after=.
+    return StreamingResponse(
+        change_feed.stream(
+            last_event_id if last_event_id is not None else after,
+            keepalive=settings.FEED_KEEPALIVE_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats", response_model=TaskStats, status_code=status.HTTP_200_OK)
+async def get_task_stats(
+    hours: int = Query(24, ge=1, le=settings.TASKS_STATS_MAX_HOURS),
+    db: Session = Depends(get_read_db),
+):
+    return await StatsService.get_stats(db, hours)
+
+
+@router.get(
+    "/search",
+    response_model=list[TaskResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(
+        settings.TASKS_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE
+    ),
+    cursor: str | None = None,
+    task_status: Status | None = Query(None, alias="status"),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+    rows = await TaskService.search_tasks(
+        db, q, limit=limit + 1, after=after, status=task_status
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_search_cursor(
+            rows[-1].rank, rows[-1].Task.id
+        )
+    return [row.Task for row in rows]
+
+
 @router.post(
     "/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_task(task_create: TaskCreate, db: Session = Depends(get_db)):
+async def create_task(
+    task_create: TaskCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+):
     task = await TaskService.create_task(db, task_create)
+    response.headers["ETag"] = task_etag(task.version)
     return task
 
 
+@router.post(
+    "/bulk",
+    response_model=list[TaskBulkResult],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_tasks(
+    tasks_create: list[TaskCreate] = Body(
+        ..., min_length=1, max_length=settings.TASKS_BULK_MAX_ITEMS
+    ),
+    db: Session = Depends(get_db),
+):
+    tasks = await TaskService.create_tasks(db, tasks_create)
+    return [
+        TaskBulkResult(id=task.id, result=BulkItemStatus.created, task=task)
+        for task in tasks
+    ]
+
+
+@router.patch(
+    "/bulk",
+    response_model=list[TaskBulkResult],
+    status_code=status.HTTP_200_OK,
+)
+async def update_tasks(
+    tasks_update: list[TaskBulkUpdate] = Body(
+        ..., min_length=1, max_length=settings.TASKS_BULK_MAX_ITEMS
+    ),
+    db: Session = Depends(get_db),
+):
+    updated = {
+        task.id: task
+        for task in await TaskService.update_tasks(db, tasks_update)
+    }
+    return [
+        TaskBulkResult(
+            id=item.id,
+            result=BulkItemStatus.updated,
+            task=updated[item.id],
+        )
+        if item.id in updated
+        else TaskBulkResult(id=item.id, result=BulkItemStatus.not_found)
+        for item in tasks_update
+    ]
+
+
+@router.delete(
+    "/bulk",
+    response_model=list[TaskBulkResult],
+    status_code=status.HTTP_200_OK,
+)
+async def delete_tasks(
+    task_ids: list[UUID] = Body(
+        ..., min_length=1, max_length=settings.TASKS_BULK_MAX_ITEMS
+    ),
+    db: Session = Depends(get_db),
+):
+    deleted = set(await TaskService.delete_tasks(db, task_ids))
+    return [
+        TaskBulkResult(
+            id=task_id,
+            result=BulkItemStatus.deleted
+            if task_id in deleted
+            else BulkItemStatus.not_found,
+        )
+        for task_id in task_ids
+    ]
+
+
+@router.post(
+    "/lookup", response_model=TaskLookupResult, status_code=status.HTTP_200_OK
+)
+async def lookup_tasks(
+    task_ids: list[UUID] = Body(
+        ..., min_length=1, max_length=settings.TASKS_LOOKUP_MAX_ITEMS
+    ),
+    db: Session = Depends(get_read_db),
+):
+    # Duplicates are looked up and returned once, in request order.
+    task_ids = list(dict.fromkeys(task_ids))
+    found = {
+        row.id: row
+        for row in await TaskService.get_tasks_by_ids(
+            db, task_ids, settings.TASKS_LOOKUP_CHUNK_SIZE
+        )
+    }
+    return TaskLookupResult(
+        tasks=[found[task_id] for task_id in task_ids if task_id in found],
+        missing=[task_id for task_id in task_ids if task_id not in found],
+    )
+
+
 @router.get(
     "/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK
 )
-async def get_task(task_id: UUID, db: Session = Depends(get_db)):
+async def get_task(
+    task_id: UUID,
+    response: Response,
+    if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_read_db),
+):
     task = await TaskService.get_task(db, task_id)
+    etag = task_etag(task.version)
+    if if_none_match(if_none_match_header, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
     return task
 
 
@@ -38,12 +333,23 @@ async def get_task(task_id: UUID, db: Session = Depends(get_db)):
     "/{task_id}", response_model=TaskResponse, status_code=status.HTTP_200_OK
 )
 async def update_task(
-    task_id: UUID, task_update: TaskUpdate, db: Session = Depends(get_db)
+    task_id: UUID,
+    task_update: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: Session = Depends(get_db),
 ):
-    task = await TaskService.update_task(db, task_id, task_update)
+    task = await TaskService.update_task(
+        db, task_id, task_update, if_match_versions(if_match)
+    )
+    response.headers["ETag"] = task_etag(task.version)
     return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(task_id: UUID, db: Session = Depends(get_db)):
-    await TaskService.delete_task(db, task_id)
+async def delete_task(
+    task_id: UUID,
+    if_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    await TaskService.delete_task(db, task_id, if_match_versions(if_match))
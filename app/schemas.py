@@ -1,3 +1,6 @@
+from datetime import datetime
+from enum import Enum
+
 from pydantic import BaseModel
 from uuid import UUID
 from .models import Status
@@ -9,9 +12,19 @@ class TaskCreate(BaseModel):
 
 
 class TaskUpdate(BaseModel):
-    title: str | None
-    description: str | None
-    status: Status | None
+    """Fields to change; omitted and null fields are left unchanged.
+
+    PATCH /tasks/{id} and PATCH /tasks/bulk treat them alike. No field can
+    be cleared: all of them are required on a task.
+    """
+
+    title: str | None = None
+    description: str | None = None
+    status: Status | None = None
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: UUID
 
 
 class TaskResponse(BaseModel):
@@ -21,3 +34,39 @@ class TaskResponse(BaseModel):
     status: Status
 
     model_config = {'from_attributes': True}
+
+
+class TaskVersioned(TaskResponse):
+    version: int
+
+
+class BulkItemStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+    not_found = "not_found"
+
+
+class TaskBulkResult(BaseModel):
+    id: UUID
+    result: BulkItemStatus
+    task: TaskResponse | None = None
+
+
+class TaskLookupResult(BaseModel):
+    tasks: list[TaskResponse]
+    missing: list[UUID]
+
+
+class StatsBucket(BaseModel):
+    start: datetime
+    created: int
+    completed: int
+
+
+class TaskStats(BaseModel):
+    total: int
+    # Keyed by the numeric status value, as ``status`` is everywhere
+    # else; JSON object keys are strings, so "1" is Status.created.
+    by_status: dict[Status, int]
+    buckets: list[StatsBucket]
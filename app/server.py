@@ -0,0 +1,55 @@
+"""Launch the API with uvicorn using the SERVER_* settings.
+
+    python -m app.server
+
+Production mode runs SERVER_WORKERS processes (0 means one per available
+CPU). uvloop and httptools are used when installed
+(``pip install "uvicorn[standard]"``). SERVER_RELOAD=true switches to the
+single-process auto-reloading development server instead.
+"""
+import os
+
+import uvicorn
+
+from app.common.logs import logger
+from app.config import settings
+from app.feed import feed_backend
+
+
+def worker_count() -> int:
+    if settings.SERVER_RELOAD:
+        return 1
+    return settings.SERVER_WORKERS or os.process_cpu_count() or 1
+
+
+def server_options() -> dict:
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        "access_log": settings.SERVER_ACCESS_LOG,
+    }
+    if settings.SERVER_RELOAD:
+        options.update(reload=True, reload_dirs=["app"])
+    else:
+        options.update(workers=worker_count())
+    return options
+
+
+def main() -> None:
+    options = server_options()
+    if options.get("workers", 1) > 1 and feed_backend() == "memory":
+        logger.warning(
+            "FEED_BACKEND=memory with %s workers: change feed subscribers "
+            "only receive writes handled by their own worker",
+            options["workers"],
+        )
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import func, literal, true, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.future import select
+
+from app.common import metrics
+from app.common.logs import logger
+from app.database import SessionLocal
+from app.models import Status, Task, TaskActivity, TaskStatusCount
+from app.schemas import StatsBucket, TaskStats
+
+# Any constant shared by all workers; serialises concurrent reconciliations.
+RECONCILE_LOCK_ID = 0x7461736B
+
+STATS_DRIFT = metrics.counter(
+    "task_stats_drift_total",
+    "Absolute corrections applied to the per-status task counters.",
+    labels=("status",),
+)
+
+
+def _hour(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; buckets are always UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+class StatsService:
+    @staticmethod
+    def _drift_query():
+        # One statement, so both sides come from the same snapshot: a
+        # concurrent write shows up in tasks and in the counters or in
+        # neither, and only real drift remains.
+        sides = union_all(
+            select(Task.status, func.count().label("delta")).group_by(
+                Task.status
+            ),
+            select(
+                TaskStatusCount.status,
+                (-func.sum(TaskStatusCount.count)).label("delta"),
+            ).group_by(TaskStatusCount.status),
+        ).subquery()
+        drift = func.sum(sides.c.delta)
+        return (
+            select(sides.c.status, drift.label("drift"))
+            .group_by(sides.c.status)
+            .having(drift != 0)
+        )
+
+    @staticmethod
+    def _apply_drift_statement(db: AsyncSession):
+        if db.get_bind().dialect.name == "postgresql":
+            insert = postgresql.insert
+        else:
+            insert = sqlite.insert
+        drift = StatsService._drift_query().subquery()
+        statement = insert(TaskStatusCount).from_select(
+            ["status", "shard", "count"],
+            # SQLite would read ON CONFLICT after a bare FROM as a join
+            # constraint; a WHERE clause ends the SELECT unambiguously.
+            select(drift.c.status, literal(0), drift.c.drift).where(true()),
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[TaskStatusCount.status, TaskStatusCount.shard],
+            set_={"count": TaskStatusCount.count + statement.excluded.count},
+        )
+
+    @staticmethod
+    async def get_stats(db: AsyncSession, hours: int) -> TaskStats:
+        since = _hour(datetime.now(timezone.utc)) - timedelta(
+            hours=hours - 1
+        )
+        try:
+            counts = await db.execute(
+                select(
+                    TaskStatusCount.status, func.sum(TaskStatusCount.count)
+                ).group_by(TaskStatusCount.status)
+            )
+            activity = await db.execute(
+                select(
+                    TaskActivity.bucket,
+                    func.sum(TaskActivity.created),
+                    func.sum(TaskActivity.completed),
+                )
+                .where(TaskActivity.bucket >= since)
+                .group_by(TaskActivity.bucket)
+            )
+        except SQLAlchemyError as e:
+            logger.error("Database error on get_stats: %s", e)
+            raise
+        by_status = dict.fromkeys(Status, 0)
+        for status, count in counts:
+            by_status[Status(status)] = int(count)
+        buckets = {
+            since + timedelta(hours=offset): [0, 0] for offset in range(hours)
+        }
+        for bucket, created, completed in activity:
+            buckets[_hour(bucket)] = [int(created), int(completed)]
+        return TaskStats(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            buckets=[
+                StatsBucket(start=start, created=created, completed=completed)
+                for start, (created, completed) in sorted(buckets.items())
+            ],
+        )
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> Dict[Status, int]:
+        """Recount tasks per status and fold any drift into the counters.
+
+        Returns the corrections applied. Creations and completions per
+        hour are event counts that cannot be recomputed from tasks and
+        are left as they are.
+        """
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                await db.execute(
+                    select(func.pg_advisory_xact_lock(RECONCILE_LOCK_ID))
+                )
+            result = await db.execute(StatsService._drift_query())
+            drift = {row.status: int(row.drift) for row in result}
+            if drift:
+                # Recomputed inside the statement and added as an
+                # increment, so writes committed meanwhile are not lost.
+                await db.execute(StatsService._apply_drift_statement(db))
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error on reconcile_stats: %s", e)
+            raise
+        for status, delta in drift.items():
+            STATS_DRIFT.inc(abs(delta), status=status.name)
+            logger.warning(
+                "Task counter for %s drifted by %s; corrected",
+                status.name,
+                delta,
+            )
+        return drift
+
+
+async def run_reconciliation(interval: float) -> None:
+    """Reconcile the task counters every ``interval`` seconds, forever."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await StatsService.reconcile(db)
+        except Exception as e:
+            logger.error("Task stats reconciliation failed: %s", e)
@@ -1,104 +1,651 @@
-from typing import List
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Sequence
 from uuid import UUID
 
+from sqlalchemy import (
+    Row,
+    and_,
+    any_,
+    bindparam,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.future import select
 
+from app import cache, feed
+from app.common import metrics
 from app.common.logs import logger
-from app.exceptions import TaskNotFoundError, TaskAlreadyExistsError
-from app.models import Task
-from app.schemas import TaskCreate, TaskUpdate
+from app.common.singleflight import SingleFlight
+from app.config import settings
+from app.database import is_replica_session
+from app.exceptions import (
+    TaskAlreadyExistsError,
+    TaskNotFoundError,
+    TaskPreconditionFailedError,
+)
+from app.models import SEARCH_CONFIG, Task, Status, search_fts
+from app.schemas import (
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskUpdate,
+    TaskVersioned,
+)
+
+BULK_UPDATE_COLUMNS = ("title", "description", "status")
+TASK_ROW_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.version,
+    Task.created_at,
+)
+
+SERVICE_DURATION = metrics.histogram(
+    "task_service_duration_seconds",
+    "Time spent in TaskService methods.",
+    labels=("method",),
+)
+SERVICE_ERRORS = metrics.counter(
+    "task_service_errors_total",
+    "TaskService calls that raised, including not-found and conflicts.",
+    labels=("method",),
+)
+
+# Concurrent identical reads share one query. Keys start with the bound
+# engine, so reads from different databases never share a result.
+TASK_FLIGHTS = SingleFlight("task", enabled=settings.TASKS_SINGLE_FLIGHT)
+LIST_FLIGHTS = SingleFlight("list", enabled=settings.TASKS_SINGLE_FLIGHT)
+
+
+def _timed(function):
+    if not settings.METRICS_ENABLED:
+        return function
+    return metrics.timed(
+        SERVICE_DURATION, SERVICE_ERRORS, method=function.__name__
+    )(function)
 
 
 class TaskService:
     @staticmethod
-    async def _get_task_or_raise(db: AsyncSession, task_id: str) -> Task:
+    def _is_postgresql(db: AsyncSession) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def _id_in(db: AsyncSession, ids: List[UUID]):
+        if TaskService._is_postgresql(db):
+            # A single array parameter keeps one prepared statement for any
+            # number of ids.
+            return Task.id == any_(
+                bindparam("ids", ids, type_=ARRAY(Task.id.type))
+            )
+        return Task.id.in_(ids)
+
+    @staticmethod
+    def _bulk_update_statement(
+        db: AsyncSession, updates: List[TaskBulkUpdate]
+    ):
+        columns = [Task.__table__.c[name] for name in BULK_UPDATE_COLUMNS]
+        if TaskService._is_postgresql(db):
+            rows = values(
+                column("id", Task.id.type),
+                *(column(col.name, col.type) for col in columns),
+                name="bulk_update",
+            ).data(
+                [
+                    (item.id, *(getattr(item, col.name) for col in columns))
+                    for item in updates
+                ]
+            )
+            return (
+                update(Task)
+                .where(Task.id == rows.c.id)
+                .values(
+                    {
+                        **{
+                            col.name: func.coalesce(rows.c[col.name], col)
+                            for col in columns
+                        },
+                        "version": Task.version + 1,
+                    }
+                )
+            )
+        assignments = {}
+        for col in columns:
+            whens = [
+                (
+                    Task.id == literal(item.id, Task.id.type),
+                    literal(getattr(item, col.name), col.type),
+                )
+                for item in updates
+                if getattr(item, col.name) is not None
+            ]
+            if whens:
+                assignments[col.name] = case(*whens, else_=col)
+        return (
+            update(Task)
+            .where(Task.id.in_([item.id for item in updates]))
+            .values(**assignments, version=Task.version + 1)
+        )
+
+    @staticmethod
+    def _parse_task_id(task_id: str) -> UUID:
+        if isinstance(task_id, UUID):
+            return task_id
         try:
-            if not isinstance(task_id, UUID):
-                task_uuid = UUID(task_id)
-            else:
-                task_uuid = task_id
+            return UUID(task_id)
         except ValueError as e:
-            logger.error(f"Invalid UUID format for task_id {task_id}: {e}")
+            logger.error("Invalid UUID format for task_id %s: %s", task_id, e)
             raise TaskNotFoundError(f"Task with id {task_id} not found") from e
-        try:
-            result = await db.execute(
-                select(Task).filter(Task.id == task_uuid)
+
+    @staticmethod
+    async def _raise_precondition_failed(
+        db: AsyncSession, task_id: str
+    ) -> None:
+        # Only reached when a conditional write matched no rows: tell a
+        # missing task apart from a stale version.
+        await TaskService._get_task_or_raise(db, task_id)
+        raise TaskPreconditionFailedError(
+            f"Task with id {task_id} has been modified"
+        )
+
+    @staticmethod
+    def _get_query(task_uuid: UUID):
+        return select(Task).filter(Task.id == task_uuid)
+
+    @staticmethod
+    def _update_query(
+        task_uuid: UUID,
+        changes: dict,
+        expected_versions: List[int] | None = None,
+    ):
+        query = update(Task).where(Task.id == task_uuid)
+        if expected_versions is not None:
+            query = query.where(Task.version.in_(expected_versions))
+        return (
+            query.values(**changes, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(
+                synchronize_session=False, populate_existing=True
             )
+        )
+
+    @staticmethod
+    def _delete_query(
+        db: AsyncSession,
+        task_uuid: UUID,
+        expected_versions: List[int] | None = None,
+    ):
+        query = delete(Task).where(Task.id == task_uuid)
+        if expected_versions is not None:
+            query = query.where(Task.version.in_(expected_versions))
+        if db.get_bind().dialect.delete_returning:
+            query = query.returning(Task.id)
+        return query
+
+    @staticmethod
+    def _invalidate_flights(db: AsyncSession, task_ids: Sequence[UUID]):
+        # Called right after a commit: reads in flight may have seen the
+        # state before it, so readers arriving later must not join them.
+        bind = db.get_bind()
+        for task_id in task_ids:
+            TASK_FLIGHTS.invalidate((bind, task_id))
+        LIST_FLIGHTS.invalidate_all()
+
+    @staticmethod
+    async def _get_task_or_raise(db: AsyncSession, task_id: str) -> Task:
+        task_uuid = TaskService._parse_task_id(task_id)
+        try:
+            result = await db.execute(TaskService._get_query(task_uuid))
             task = result.scalars().first()
             if not task:
                 raise TaskNotFoundError(f"Task with id {task_id} not found")
             return task
         except SQLAlchemyError as e:
-            logger.error(f"Database error on _get_task_or_raise: {e}")
+            logger.error("Database error on _get_task_or_raise: %s", e)
+            raise
+
+    @staticmethod
+    def _status_filter(status: Status):
+        # Rendered inline so PostgreSQL can match the partial index for
+        # the status even when the statement is prepared.
+        return Task.status == literal(
+            status, Task.status.type, literal_execute=True
+        )
+
+    @staticmethod
+    def _search_query(db: AsyncSession, terms: str):
+        """Select (Task, rank) matching ``terms``; higher ranks first.
+
+        Returns None when ``terms`` holds nothing searchable.
+        """
+        if TaskService._is_postgresql(db):
+            vector = literal_column("tasks.search_vector", TSVECTOR)
+            tsquery = func.websearch_to_tsquery(
+                literal_column(f"'{SEARCH_CONFIG}'::regconfig"), terms
+            )
+            rank = func.ts_rank(vector, tsquery)
+            query = select(Task, rank.label("rank")).where(
+                vector.op("@@")(tsquery)
+            )
+            return query, rank
+        # FTS5 has its own query syntax; quote every word so user input
+        # can never be a syntax error, and require all of them.
+        words = re.findall(r"\w+", terms)
+        if not words:
+            return None
+        rank = -func.bm25(search_fts.c.tasks_fts, 0.0, 2.0, 1.0)
+        query = (
+            select(Task, rank.label("rank"))
+            .join(search_fts, search_fts.c.id == Task.id)
+            .where(
+                search_fts.c.tasks_fts.op("MATCH")(
+                    " ".join(f'"{word}"' for word in words)
+                )
+            )
+        )
+        return query, rank
+
+    @staticmethod
+    def _list_query(
+        query,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+        status: Status | None = None,
+        title_prefix: str | None = None,
+    ):
+        # Keyset on (created_at, id): served by ix_tasks_created_at_id, or
+        # by the status indexes when filtering on status.
+        query = query.order_by(Task.created_at, Task.id)
+        if status is not None:
+            query = query.filter(TaskService._status_filter(status))
+        if title_prefix:
+            query = query.filter(
+                Task.title.startswith(title_prefix, autoescape=True)
+            )
+        if after is not None:
+            query = query.filter(tuple_(Task.created_at, Task.id) > after)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    @_timed
+    async def get_tasks(
+        db: AsyncSession,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+        status: Status | None = None,
+        title_prefix: str | None = None,
+    ) -> List[Task]:
+        query = TaskService._list_query(
+            select(Task), limit, after, status, title_prefix
+        )
+
+        async def load() -> List[Task]:
+            try:
+                result = await db.execute(query)
+                return result.scalars().all()
+            except SQLAlchemyError as e:
+                logger.error("Database error on get_tasks: %s", e)
+                raise
+
+        return await LIST_FLIGHTS.do(
+            (db.get_bind(), "tasks", limit, after, status, title_prefix),
+            load,
+        )
+
+    @staticmethod
+    @_timed
+    async def get_task_rows(
+        db: AsyncSession,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+        status: Status | None = None,
+        title_prefix: str | None = None,
+    ) -> Sequence[Row]:
+        # Plain column tuples: no ORM identity map, no per-row model.
+        query = TaskService._list_query(
+            select(*TASK_ROW_COLUMNS), limit, after, status, title_prefix
+        )
+
+        async def load() -> Sequence[Row]:
+            try:
+                result = await db.execute(query)
+                return result.all()
+            except SQLAlchemyError as e:
+                logger.error("Database error on get_task_rows: %s", e)
+                raise
+
+        return await LIST_FLIGHTS.do(
+            (db.get_bind(), "rows", limit, after, status, title_prefix),
+            load,
+        )
+
+    @staticmethod
+    @_timed
+    async def get_tasks_by_ids(
+        db: AsyncSession, task_ids: Sequence[UUID], chunk_size: int
+    ) -> List[Row]:
+        """Rows of the tasks among ``task_ids`` that exist, in no order.
+
+        One statement per ``chunk_size`` ids.
+        """
+        query = select(*TASK_ROW_COLUMNS)
+        rows = []
+        try:
+            for start in range(0, len(task_ids), chunk_size):
+                chunk = list(task_ids[start:start + chunk_size])
+                result = await db.execute(
+                    query.where(TaskService._id_in(db, chunk))
+                )
+                rows.extend(result.all())
+        except SQLAlchemyError as e:
+            logger.error("Database error on get_tasks_by_ids: %s", e)
             raise
+        return rows
 
     @staticmethod
-    async def get_tasks(db: AsyncSession) -> List[Task]:
+    @_timed
+    async def stream_tasks(
+        db: AsyncSession,
+        batch_size: int,
+        status: Status | None = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        query = (
+            select(Task.id, Task.title, Task.description, Task.status)
+            .order_by(Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if status is not None:
+            query = query.filter(Task.status == status)
         try:
-            result = await db.execute(select(Task))
-            return result.scalars().all()
+            result = await db.stream(query)
+            async for partition in result.partitions():
+                yield partition
         except SQLAlchemyError as e:
-            logger.error(f"Database error on get_tasks: {e}")
+            logger.error("Database error on stream_tasks: %s", e)
             raise
 
     @staticmethod
-    async def get_task(db: AsyncSession, task_id: str) -> Task:
-        return await TaskService._get_task_or_raise(db, task_id)
+    @_timed
+    async def search_tasks(
+        db: AsyncSession,
+        terms: str,
+        limit: int | None = None,
+        after: tuple[float, UUID] | None = None,
+        status: Status | None = None,
+    ) -> Sequence[Row]:
+        built = TaskService._search_query(db, terms)
+        if built is None:
+            return []
+        query, rank = built
+        if status is not None:
+            query = query.filter(TaskService._status_filter(status))
+        if after is not None:
+            after_rank, after_id = after
+            query = query.filter(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, Task.id > after_id),
+                )
+            )
+        query = query.order_by(rank.desc(), Task.id)
+        if limit is not None:
+            query = query.limit(limit)
+        try:
+            result = await db.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error("Database error on search_tasks: %s", e)
+            raise
 
     @staticmethod
+    @_timed
+    async def get_task(
+        db: AsyncSession, task_id: str
+    ) -> Task | TaskVersioned:
+        task_uuid = TaskService._parse_task_id(task_id)
+        cached = await cache.task_cache.get(task_uuid)
+        if cached is not None:
+            return cached
+
+        async def load() -> Task:
+            task = await TaskService._get_task_or_raise(db, task_id)
+            # The cache is shared by clients that must read their own
+            # writes, so it only takes rows read from the primary.
+            if not is_replica_session(db):
+                await cache.task_cache.set(task_uuid, task)
+            return task
+
+        # Followers share the leader's task, and their own session never
+        # checks out a connection.
+        return await TASK_FLIGHTS.do((db.get_bind(), task_uuid), load)
+
+    @staticmethod
+    @_timed
     async def create_task(db: AsyncSession, task_create: TaskCreate) -> Task:
         task = Task(**task_create.model_dump())
         db.add(task)
         try:
+            # Column values are generated client-side and the session keeps
+            # them after commit, so the INSERT needs no follow-up SELECT.
             await db.commit()
-            await db.refresh(task)
+            TaskService._invalidate_flights(db, [task.id])
+            await feed.change_feed.publish(feed.EventType.created, [task])
             return task
         except IntegrityError as e:
             await db.rollback()
-            logger.error(f"Integrity error on create_task: {e}")
+            logger.error("Integrity error on create_task: %s", e)
             raise TaskAlreadyExistsError(
                 "Task with this UUID already exists"
             ) from e
         except SQLAlchemyError as e:
             await db.rollback()
-            logger.error(f"Database error on create_task: {e}")
+            logger.error("Database error on create_task: %s", e)
             raise
 
     @staticmethod
+    @_timed
+    async def create_tasks(
+        db: AsyncSession, tasks_create: List[TaskCreate]
+    ) -> List[Task]:
+        try:
+            result = await db.execute(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                [task_create.model_dump() for task_create in tasks_create],
+            )
+            tasks = result.scalars().all()
+            await db.commit()
+            TaskService._invalidate_flights(db, [task.id for task in tasks])
+            await feed.change_feed.publish(feed.EventType.created, tasks)
+            return tasks
+        except IntegrityError as e:
+            await db.rollback()
+            logger.error("Integrity error on create_tasks: %s", e)
+            raise TaskAlreadyExistsError(
+                "Task with this UUID already exists"
+            ) from e
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error on create_tasks: %s", e)
+            raise
+
+    @staticmethod
+    @_timed
+    async def update_tasks(
+        db: AsyncSession, tasks_update: List[TaskBulkUpdate]
+    ) -> List[Task]:
+        updates = list({item.id: item for item in tasks_update}.values())
+        try:
+            result = await db.execute(
+                TaskService._bulk_update_statement(db, updates)
+                .returning(Task)
+                .execution_options(
+                    synchronize_session=False, populate_existing=True
+                )
+            )
+            tasks = result.scalars().all()
+            await db.commit()
+            TaskService._invalidate_flights(db, [task.id for task in tasks])
+            for task in tasks:
+                await cache.task_cache.set(task.id, task)
+            await feed.change_feed.publish(feed.EventType.updated, tasks)
+            return tasks
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error on update_tasks: %s", e)
+            raise
+
+    @staticmethod
+    @_timed
+    async def delete_tasks(
+        db: AsyncSession, task_ids: List[UUID]
+    ) -> List[UUID]:
+        try:
+            result = await db.execute(
+                delete(Task)
+                .where(TaskService._id_in(db, list(set(task_ids))))
+                .returning(Task.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = result.scalars().all()
+            await db.commit()
+            TaskService._invalidate_flights(db, deleted)
+            for task_id in deleted:
+                await cache.task_cache.delete(task_id)
+            await feed.change_feed.publish(feed.EventType.deleted, deleted)
+            return deleted
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error on delete_tasks: %s", e)
+            raise
+
+    @staticmethod
+    @_timed
     async def update_task(
-        db: AsyncSession, task_id: str, task_update: TaskUpdate
+        db: AsyncSession,
+        task_id: str,
+        task_update: TaskUpdate,
+        expected_versions: List[int] | None = None,
     ) -> Task:
+        task_uuid = TaskService._parse_task_id(task_id)
+        # null leaves a field unchanged, as in _bulk_update_statement.
+        changes = task_update.model_dump(exclude_unset=True, exclude_none=True)
+        if not changes:
+            task = await TaskService._get_task_or_raise(db, task_uuid)
+            if (
+                expected_versions is not None
+                and task.version not in expected_versions
+            ):
+                raise TaskPreconditionFailedError(
+                    f"Task with id {task_id} has been modified"
+                )
+            return task
+        query = TaskService._update_query(
+            task_uuid, changes, expected_versions
+        )
         try:
-            task = await TaskService._get_task_or_raise(db, task_id)
-            for key, value in task_update.model_dump(
-                exclude_unset=True
-            ).items():
-                setattr(task, key, value)
+            result = await db.execute(query)
+            task = result.scalars().first()
+            if not task and expected_versions is not None:
+                await TaskService._raise_precondition_failed(db, task_id)
+            if not task:
+                raise TaskNotFoundError(f"Task with id {task_id} not found")
             await db.commit()
-            await db.refresh(task)
+            TaskService._invalidate_flights(db, [task_uuid])
+            await cache.task_cache.set(task_uuid, task)
+            await feed.change_feed.publish(feed.EventType.updated, [task])
             return task
         except IntegrityError as e:
             await db.rollback()
-            logger.error(f"Integrity error on update_task: {e}")
+            logger.error("Integrity error on update_task: %s", e)
             raise
         except SQLAlchemyError as e:
             await db.rollback()
-            logger.error(f"Database error on update_task: {e}")
+            logger.error("Database error on update_task: %s", e)
             raise
 
     @staticmethod
-    async def delete_task(db: AsyncSession, task_id: str) -> UUID:
+    @_timed
+    async def delete_task(
+        db: AsyncSession,
+        task_id: str,
+        expected_versions: List[int] | None = None,
+    ) -> UUID:
+        task_uuid = TaskService._parse_task_id(task_id)
+        query = TaskService._delete_query(db, task_uuid, expected_versions)
         try:
-            task = await TaskService._get_task_or_raise(db, task_id)
-            await db.delete(task)
+            if db.get_bind().dialect.delete_returning:
+                result = await db.execute(query)
+                deleted = result.scalars().first() is not None
+            else:
+                result = await db.execute(query)
+                deleted = result.rowcount > 0
+            if not deleted and expected_versions is not None:
+                await TaskService._raise_precondition_failed(db, task_id)
+            if not deleted:
+                raise TaskNotFoundError(f"Task with id {task_id} not found")
             await db.commit()
-            return task.id
+            TaskService._invalidate_flights(db, [task_uuid])
+            await cache.task_cache.delete(task_uuid)
+            await feed.change_feed.publish(
+                feed.EventType.deleted, [task_uuid]
+            )
+            return task_uuid
         except TaskNotFoundError:
-            logger.error(f"Task with id {task_id} not found for deletion")
+            logger.error("Task with id %s not found for deletion", task_id)
             raise
         except SQLAlchemyError as e:
             await db.rollback()
-            logger.error(f"Database error on delete_task: {e}")
+            logger.error("Database error on delete_task: %s", e)
             raise
+
+    @staticmethod
+    async def warm_up(db: AsyncSession, writes: bool = True) -> None:
+        """Run the hot statements once against a nil id and roll back.
+
+        Nothing matches, but the engine caches the compiled SQL and, on
+        asyncpg, the connection keeps the prepared statements. Replicas
+        are read only and are warmed with ``writes=False``.
+        """
+        nil = UUID(int=0)
+        epoch = datetime.fromtimestamp(0, timezone.utc)
+        page = settings.TASKS_PAGE_SIZE + 1
+        changes = {
+            "title": "",
+            "description": "",
+            "status": Status.created,
+        }
+        statements = (
+            TaskService._get_query(nil),
+            TaskService._list_query(select(Task), page),
+            TaskService._list_query(select(Task), page, (epoch, nil)),
+            TaskService._list_query(select(*TASK_ROW_COLUMNS), page),
+            TaskService._list_query(
+                select(*TASK_ROW_COLUMNS), page, (epoch, nil)
+            ),
+        )
+        if writes:
+            statements += (
+                TaskService._update_query(nil, changes),
+                TaskService._delete_query(db, nil),
+            )
+        try:
+            for statement in statements:
+                await db.execute(statement)
+        finally:
+            await db.rollback()
@@ -0,0 +1,168 @@
+"""Load test for the task API, run in-process through httpx.ASGITransport.
+
+Seeds the database, then runs each scenario (create, get, list, patch,
+delete) with a number of concurrent clients. For every scenario it
+reports throughput, p50/p95/p99 latency and DB statements per request.
+
+    python -m benchmarks.api --concurrency 16 --requests 2000 --rows 10000
+    python -m benchmarks.api --scenarios get,list --json > run.json
+
+Set BENCH_DATABASE_URL to run against PostgreSQL instead of a temporary
+SQLite file; its tasks table is dropped and recreated.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+from benchmarks.harness import (
+    make_client,
+    make_rows,
+    percentile,
+    reset_database,
+)
+
+SCENARIOS = ("create", "get", "list", "patch", "delete")
+
+
+class Scenario:
+    def __init__(self, name: str, args, rows: list, delete_rows: list):
+        self.name = name
+        self.args = args
+        self.ids = [str(row[0]) for row in rows]
+        self.delete_ids = iter(str(row[0]) for row in delete_rows)
+        self.description = "x" * args.description_size
+        self.rng = random.Random(SCENARIOS.index(name))
+
+    def request(self, number: int) -> tuple[str, str, dict | None, dict]:
+        if self.name == "create":
+            body = {
+                "title": f"Bench {number}",
+                "description": self.description,
+            }
+            return "POST", "/tasks/", body, {}
+        if self.name == "get":
+            return "GET", f"/tasks/{self.rng.choice(self.ids)}", None, {}
+        if self.name == "list":
+            return "GET", "/tasks/", None, {"limit": self.args.page_size}
+        if self.name == "patch":
+            body = {
+                "title": f"Patched {number}",
+                "description": self.description,
+                "status": self.rng.choice((1, 2, 3)),
+            }
+            return "PATCH", f"/tasks/{self.rng.choice(self.ids)}", body, {}
+        return "DELETE", f"/tasks/{next(self.delete_ids)}", None, {}
+
+
+async def run_scenario(client, scenario: Scenario, args) -> dict:
+    from app.database import count_statements
+
+    latencies: list[float] = []
+    statements: list[int] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (number := next(counter)) < args.requests:
+            method, url, body, params = scenario.request(number)
+            with count_statements() as statement_counter:
+                start = time.perf_counter()
+                response = await client.request(
+                    method, url, json=body, params=params
+                )
+                latencies.append(time.perf_counter() - start)
+            statements.append(statement_counter.statements)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "db_statements_per_request": statistics.fmean(statements or [0]),
+    }
+
+
+async def run(args) -> dict:
+    from app.database import engine
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    rows = make_rows(args.rows, args.description_size)
+    delete_rows = (
+        make_rows(args.requests, args.description_size, seed=7)
+        if "delete" in scenarios
+        else []
+    )
+    await reset_database(rows + delete_rows)
+    results = []
+    async with make_client() as client:
+        for name in scenarios:
+            scenario = Scenario(name, args, rows, delete_rows)
+            results.append(await run_scenario(client, scenario, args))
+    await engine.dispose()
+    return {
+        "database": engine.url.get_backend_name(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "rows": args.rows,
+        "description_size": args.description_size,
+        "results": results,
+    }
+
+
+def print_table(report: dict) -> None:
+    print(
+        f"{report['database']}, {report['rows']} rows, "
+        f"concurrency {report['concurrency']}"
+    )
+    print(
+        f"{'scenario':<8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'stmts':>6} {'errors':>6}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['scenario']:<8} {result['throughput_rps']:>9.1f} "
+            f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} "
+            f"{result['db_statements_per_request']:>6.2f} "
+            f"{result['errors']:>6}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--description-size", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
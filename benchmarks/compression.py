@@ -0,0 +1,121 @@
+"""Compare response compression codecs and levels.
+
+A GET /tasks/ page of ``--rows`` tasks is rendered with
+``app.common.serialization.dumps`` and compressed by every installed codec
+(gzip always; zstd and br with the zstandard / brotli packages) at each
+level in ``--levels``. The report shows the time per response, the
+throughput, the compression ratio and the bytes saved per CPU millisecond,
+the figure to maximise when choosing COMPRESSION_*_LEVEL.
+
+    python -m benchmarks.compression --rows 100 --repeat 200
+    python -m benchmarks.compression --levels 1,4,6,9 --json
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+# benchmarks.harness configures the environment and must precede app imports.
+import benchmarks.harness  # noqa: F401
+from app.common.serialization import dumps, task_row_to_dict
+from app.middleware.compression import available_codecs
+from app.models import Status
+
+# Task descriptions are prose, not random letters: random text barely
+# compresses and would understate every codec.
+WORDS = (
+    "buy milk bread call the bank about the card renew insurance before "
+    "friday fix the leaking tap book a table for dinner send the report to "
+    "the team review pull request prepare slides for the meeting pay rent"
+).split()
+
+LEVEL_RANGES = {"gzip": range(1, 10), "br": range(0, 12), "zstd": range(1, 23)}
+
+
+def make_page(rows: int, description_size: int, seed: int = 42) -> bytes:
+    rng = random.Random(seed)
+    page = []
+    for i in range(rows):
+        description = ""
+        while len(description) < description_size:
+            description += rng.choice(WORDS) + " "
+        page.append(
+            (
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                f"Task {i}",
+                description.strip(),
+                rng.choice(list(Status)),
+                1,
+            )
+        )
+    return dumps([task_row_to_dict(row) for row in page])
+
+
+def timeit(function, repeat: int) -> float:
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(args) -> dict:
+    body = make_page(args.rows, args.description_size)
+    levels = [int(level) for level in args.levels.split(",") if level]
+    results = []
+    for name in ("gzip", "br", "zstd"):
+        for level in levels:
+            if level not in LEVEL_RANGES[name]:
+                continue
+            codecs = available_codecs(
+                gzip_level=level, brotli_level=level, zstd_level=level
+            )
+            codec = next((c for c in codecs if c.name == name), None)
+            if codec is None:
+                continue
+            size = len(codec.compress(body))
+            elapsed = timeit(lambda: codec.compress(body), args.repeat)
+            results.append(
+                {
+                    "encoding": name,
+                    "level": level,
+                    "bytes": size,
+                    "ratio": len(body) / size,
+                    "ms": elapsed * 1000,
+                    "mb_per_s": len(body) / elapsed / 1e6,
+                    "saved_per_ms": (len(body) - size) / (elapsed * 1000),
+                }
+            )
+    return {"rows": args.rows, "bytes": len(body), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--description-size", type=int, default=200)
+    parser.add_argument("--levels", default="1,3,4,6,9")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['rows']} rows, {report['bytes']} bytes per response")
+    print(
+        f"{'encoding':>8} {'level':>5} {'bytes':>8} {'ratio':>6} "
+        f"{'ms':>7} {'MB/s':>7} {'saved B/ms':>10}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['encoding']:>8} {result['level']:>5} "
+            f"{result['bytes']:>8} {result['ratio']:>6.2f} "
+            f"{result['ms']:>7.3f} {result['mb_per_s']:>7.1f} "
+            f"{result['saved_per_ms']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Shared setup for the benchmarks.
+
+Importing this module points the app at BENCH_DATABASE_URL, or at a
+fresh SQLite file when it is unset, so it must be imported before
+anything from ``app``. The benchmarks drop and recreate the tasks table
+in that database.
+"""
+import os
+import random
+import string
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL",
+    f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='bench-tasks-')}/bench.db",
+)
+for _name in ("DB_USER", "DB_PASSWORD", "DB_NAME"):
+    os.environ.setdefault(_name, "bench")
+
+import httpx  # noqa: E402
+
+from app.models import Status  # noqa: E402
+
+SEED_BATCH_SIZE = 1000
+
+
+def make_rows(count: int, description_size: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + " "
+    return [
+        (
+            uuid.uuid4(),
+            f"Task {i}",
+            "".join(rng.choices(alphabet, k=description_size)),
+            rng.choice(list(Status)),
+            1,
+        )
+        for i in range(count)
+    ]
+
+
+async def reset_database(rows: list | None = None) -> None:
+    from app.database import Base, engine
+    from app.models import Task
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        rows = rows or []
+        for start in range(0, len(rows), SEED_BATCH_SIZE):
+            await conn.execute(
+                Task.__table__.insert(),
+                [
+                    dict(zip(("id", "title", "description", "status"), row))
+                    for row in rows[start:start + SEED_BATCH_SIZE]
+                ],
+            )
+
+
+def make_client() -> httpx.AsyncClient:
+    from app.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = round(fraction * len(sorted_values)) - 1
+    index = min(len(sorted_values) - 1, max(0, rank))
+    return sorted_values[index]
@@ -0,0 +1,113 @@
+"""Compare the two GET /tasks/ response paths.
+
+``orm`` is the default path: ORM entities validated into
+``list[TaskResponse]`` and rendered the way FastAPI does it. ``fast`` is
+the TASKS_FAST_JSON path: column tuples rendered with
+``app.common.serialization.dumps``.
+
+    python -m benchmarks.list_serialization --rows 500 --repeat 200
+    python -m benchmarks.list_serialization --e2e
+
+``--e2e`` also runs both paths through the ASGI app against a temporary
+SQLite database (or BENCH_DATABASE_URL, whose tasks table is recreated),
+so query and HTTP overhead are included.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+from benchmarks.harness import (
+    make_client,
+    make_rows,
+    reset_database,
+)
+from pydantic import TypeAdapter
+
+from app.common.serialization import dumps, task_row_to_dict
+from app.models import Task
+from app.schemas import TaskResponse
+
+
+def orm_path(tasks: list[Task], adapter: TypeAdapter) -> bytes:
+    content = adapter.dump_python(
+        adapter.validate_python(tasks, from_attributes=True), mode="json"
+    )
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(rows: list[tuple]) -> bytes:
+    return dumps([task_row_to_dict(row) for row in rows])
+
+
+def timeit(function, repeat: int) -> float:
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_cpu(args) -> dict:
+    rows = make_rows(args.rows, args.description_size)
+    tasks = [
+        Task(id=r[0], title=r[1], description=r[2], status=r[3], version=r[4])
+        for r in rows
+    ]
+    adapter = TypeAdapter(list[TaskResponse])
+    assert orm_path(tasks, adapter) == fast_path(rows)
+    orm = timeit(lambda: orm_path(tasks, adapter), args.repeat)
+    fast = timeit(lambda: fast_path(rows), args.repeat)
+    return {"orm_ms": orm * 1000, "fast_ms": fast * 1000}
+
+
+async def run_e2e(args) -> dict:
+    from app.config import settings
+    from app.database import engine
+
+    await reset_database(make_rows(args.rows, args.description_size))
+    results = {}
+    async with make_client() as client:
+        for mode, enabled in (("orm", False), ("fast", True)):
+            settings.TASKS_FAST_JSON = enabled
+            params = {"limit": min(args.rows, settings.TASKS_MAX_PAGE_SIZE)}
+            await client.get("/tasks/", params=params)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                response = await client.get("/tasks/", params=params)
+                response.raise_for_status()
+            elapsed = (time.perf_counter() - start) / args.repeat
+            results[f"{mode}_e2e_ms"] = elapsed * 1000
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--description-size", type=int, default=200)
+    parser.add_argument("--e2e", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = {"rows": args.rows, **run_cpu(args)}
+    if args.e2e:
+        results.update(asyncio.run(run_e2e(args)))
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"rows per response: {args.rows}")
+    print(f"orm+pydantic: {results['orm_ms']:.3f} ms/response")
+    print(f"fast path:    {results['fast_ms']:.3f} ms/response")
+    print(f"speedup:      {results['orm_ms'] / results['fast_ms']:.1f}x")
+    if args.e2e:
+        print(f"e2e orm:      {results['orm_e2e_ms']:.3f} ms/request")
+        print(f"e2e fast:     {results['fast_e2e_ms']:.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Measure what the metrics instrumentation costs on the hot path.
+
+The micro benchmark times MetricsMiddleware around a no-op ASGI app and a
+``metrics.timed`` coroutine against their bare equivalents and reports
+the added cost per call. ``--e2e`` then runs ``benchmarks.api`` twice in
+subprocesses, with METRICS_ENABLED off and on, and compares throughput
+and p50 latency per scenario. That run includes the SQL statement
+timers, which are registered at import time.
+
+    python -m benchmarks.metrics_overhead
+    python -m benchmarks.metrics_overhead --e2e --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+import benchmarks.harness  # noqa: F401
+from app.common import metrics
+from app.middleware.metrics import MetricsMiddleware
+
+
+class _Route:
+    path = "/tasks/{task_id}"
+
+
+async def _endpoint(scope, receive, send) -> None:
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _time_asgi(app, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await app({"type": "http", "method": "GET"}, _receive, _send)
+    return (time.perf_counter() - start) / repeat
+
+
+async def _time_calls(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await function()
+    return (time.perf_counter() - start) / repeat
+
+
+async def run_micro(args) -> dict:
+    async def service_call() -> None:
+        pass
+
+    timed_call = metrics.timed(
+        metrics.Histogram("bench_seconds", "Benchmark.", labels=("method",)),
+        metrics.Counter(
+            "bench_errors_total", "Benchmark.", labels=("method",)
+        ),
+        method="service_call",
+    )(service_call)
+
+    middleware = MetricsMiddleware(_endpoint)
+    await _time_asgi(middleware, 1000)
+    bare_asgi = await _time_asgi(_endpoint, args.repeat)
+    wrapped_asgi = await _time_asgi(middleware, args.repeat)
+    bare_call = await _time_calls(service_call, args.repeat)
+    wrapped_call = await _time_calls(timed_call, args.repeat)
+    return {
+        "middleware_us": (wrapped_asgi - bare_asgi) * 1e6,
+        "timed_us": (wrapped_call - bare_call) * 1e6,
+    }
+
+
+def run_api(args, enabled: bool) -> dict:
+    env = dict(os.environ, METRICS_ENABLED="true" if enabled else "false")
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.api",
+            "--json",
+            "--scenarios",
+            args.scenarios,
+            "--requests",
+            str(args.requests),
+            "--concurrency",
+            str(args.concurrency),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    results = json.loads(output)["results"]
+    return {result["scenario"]: result for result in results}
+
+
+def run_e2e(args) -> dict:
+    disabled = run_api(args, enabled=False)
+    enabled = run_api(args, enabled=True)
+    return {
+        name: {
+            "rps_off": disabled[name]["throughput_rps"],
+            "rps_on": enabled[name]["throughput_rps"],
+            "p50_ms_off": disabled[name]["p50_ms"],
+            "p50_ms_on": enabled[name]["p50_ms"],
+            "throughput_change_pct": (
+                enabled[name]["throughput_rps"]
+                / disabled[name]["throughput_rps"]
+                - 1
+            )
+            * 100,
+        }
+        for name in disabled
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100000)
+    parser.add_argument("--e2e", action="store_true")
+    parser.add_argument("--scenarios", default="get,list,patch")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_micro(args))
+    if args.e2e:
+        results["e2e"] = run_e2e(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"middleware:    +{results['middleware_us']:.2f} us/request")
+    print(f"timed wrapper: +{results['timed_us']:.2f} us/call")
+    if args.e2e:
+        print(
+            f"{'scenario':<8} {'req/s off':>10} {'req/s on':>10} "
+            f"{'p50 off':>8} {'p50 on':>8} {'change':>8}"
+        )
+        for name, result in results["e2e"].items():
+            print(
+                f"{name:<8} {result['rps_off']:>10.1f} "
+                f"{result['rps_on']:>10.1f} {result['p50_ms_off']:>8.2f} "
+                f"{result['p50_ms_on']:>8.2f} "
+                f"{result['throughput_change_pct']:>+7.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure outbox dispatch throughput for several batch sizes.
+
+For each batch size in ``--batch-sizes`` the tables are recreated,
+``--events`` tasks are inserted (the triggers add one outbox row each)
+and an OutboxDispatcher drains the outbox into a sink that only counts
+events. The report shows events per second and the time per batch.
+
+    python -m benchmarks.outbox --events 20000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.outbox --events 100000 --workers 4
+
+With ``--workers N`` that many dispatchers drain the outbox concurrently;
+on PostgreSQL they claim disjoint batches with FOR UPDATE SKIP LOCKED.
+Set BENCH_DATABASE_URL to run against PostgreSQL instead of a temporary
+SQLite file; its tables are dropped and recreated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# The triggers only record events with the outbox enabled, which the app
+# reads from its settings on import. The sink is never built: the
+# dispatchers below get CountingSink.
+os.environ["OUTBOX_ENABLED"] = "true"
+os.environ["OUTBOX_SINK"] = "file"
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+from benchmarks.harness import make_rows, reset_database  # noqa: E402
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.outbox import OutboxDispatcher, OutboxSink  # noqa: E402
+
+
+class CountingSink(OutboxSink):
+    def __init__(self) -> None:
+        self.events = 0
+
+    async def send(self, events) -> None:
+        self.events += len(events)
+
+
+async def drain(dispatcher: OutboxDispatcher) -> int:
+    batches = 0
+    while await dispatcher.dispatch_batch():
+        batches += 1
+    return batches
+
+
+async def run_batch_size(batch_size: int, args) -> dict:
+    await reset_database(make_rows(args.events, args.description_size))
+    sink = CountingSink()
+    dispatchers = [
+        OutboxDispatcher(SessionLocal, sink, batch_size=batch_size)
+        for _ in range(args.workers)
+    ]
+    start = time.perf_counter()
+    batches = sum(
+        await asyncio.gather(*(drain(worker) for worker in dispatchers))
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "batch_size": batch_size,
+        "events": sink.events,
+        "events_per_s": sink.events / elapsed,
+        "ms_per_batch": elapsed / max(batches, 1) * 1000,
+    }
+
+
+async def run(args) -> dict:
+    sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    results = [await run_batch_size(size, args) for size in sizes]
+    await engine.dispose()
+    return {
+        "database": engine.url.get_backend_name(),
+        "workers": args.workers,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch-sizes", default="50,500,2000")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--description-size", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['database']}, {report['workers']} dispatcher(s)")
+    print(f"{'batch':>6} {'events':>8} {'events/s':>10} {'ms/batch':>9}")
+    for result in report["results"]:
+        print(
+            f"{result['batch_size']:>6} {result['events']:>8} "
+            f"{result['events_per_s']:>10.0f} "
+            f"{result['ms_per_batch']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Measure how full-text search latency scales with table size.
+
+For each size in ``--sizes`` the tasks table is recreated and filled
+with text drawn from a Zipf-like vocabulary. The benchmark then times
+TaskService.search_tasks for a rare, a medium and a common word, and for
+a two-word query, fetching one page of ``--page-size`` results. The
+report shows p50/p95 latency and how many tasks each term matches.
+
+    python -m benchmarks.search --sizes 10000,100000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.search --sizes 100000,1000000,3000000
+
+Set BENCH_DATABASE_URL to run against PostgreSQL (tsvector + GIN)
+instead of a temporary SQLite file (FTS5); its tasks table is dropped
+and recreated.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+from benchmarks.harness import percentile, reset_database
+from sqlalchemy import func, select
+
+from app.database import SessionLocal, engine
+from app.models import Status
+from app.services.task_service import TaskService
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_TITLE = 4
+WORDS_PER_DESCRIPTION = 30
+
+
+def make_vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 9))))
+    return sorted(words)
+
+
+def make_text_rows(count: int, vocabulary: list[str], seed: int) -> list:
+    rng = random.Random(seed)
+    # Zipf-like: the word at position k is drawn with weight 1 / (k + 1).
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    cumulative = list(itertools.accumulate(weights))
+
+    def draw(count: int) -> list[str]:
+        return rng.choices(vocabulary, cum_weights=cumulative, k=count)
+
+    return [
+        (
+            uuid.uuid4(),
+            " ".join(draw(WORDS_PER_TITLE)),
+            " ".join(draw(WORDS_PER_DESCRIPTION)),
+            rng.choice(list(Status)),
+            1,
+        )
+        for _ in range(count)
+    ]
+
+
+def query_terms(vocabulary: list[str]) -> dict[str, str]:
+    return {
+        "common": vocabulary[0],
+        "medium": vocabulary[100],
+        "rare": vocabulary[10000],
+        "two words": f"{vocabulary[5]} {vocabulary[50]}",
+    }
+
+
+async def count_matches(db, terms: str) -> int:
+    built = TaskService._search_query(db, terms)
+    if built is None:
+        return 0
+    query, _ = built
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def time_query(db, terms: str, args) -> list[float]:
+    latencies = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await TaskService.search_tasks(db, terms, limit=args.page_size + 1)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+async def run(args) -> dict:
+    vocabulary = make_vocabulary(random.Random(42))
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = []
+    for size in sizes:
+        await reset_database(make_text_rows(size, vocabulary, seed=size))
+        async with SessionLocal() as db:
+            for name, terms in query_terms(vocabulary).items():
+                await TaskService.search_tasks(db, terms, limit=1)
+                latencies = await time_query(db, terms, args)
+                results.append(
+                    {
+                        "rows": size,
+                        "query": name,
+                        "matches": await count_matches(db, terms),
+                        "p50_ms": percentile(latencies, 0.50) * 1000,
+                        "p95_ms": percentile(latencies, 0.95) * 1000,
+                    }
+                )
+    await engine.dispose()
+    return {"database": engine.url.get_backend_name(), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(report["database"])
+    print(
+        f"{'rows':>9} {'query':<10} {'matches':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['rows']:>9} {result['query']:<10} "
+            f"{result['matches']:>9} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
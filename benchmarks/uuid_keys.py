@@ -0,0 +1,139 @@
+"""Compare UUIDv4 and UUIDv7 primary keys on a large synthetic table.
+
+For each id version the tasks table is recreated and filled with
+``--rows`` rows in committed batches. The report shows overall insert
+throughput, throughput over the last tenth of the load (when the B-tree
+is largest), and the size of the primary-key index afterwards. On
+PostgreSQL it also shows the WAL written during the load.
+
+    python -m benchmarks.uuid_keys --rows 200000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.uuid_keys --rows 2000000 --json
+
+Set BENCH_DATABASE_URL to run against PostgreSQL instead of a temporary
+SQLite file; its tasks table is dropped and recreated.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+# benchmarks.harness configures DATABASE_URL and must precede app imports.
+from benchmarks.harness import make_rows, reset_database
+from sqlalchemy import text
+
+from app.common.ids import uuid7
+from app.database import engine
+from app.models import Task
+
+ID_FACTORIES = {4: uuid.uuid4, 7: uuid7}
+
+
+async def primary_key_size(conn) -> int:
+    if conn.dialect.name == "postgresql":
+        return await conn.scalar(text("SELECT pg_relation_size('tasks_pkey')"))
+    # The primary key on a non-integer column is SQLite's first autoindex.
+    return await conn.scalar(
+        text(
+            "SELECT SUM(pgsize) FROM dbstat "
+            "WHERE name = 'sqlite_autoindex_tasks_1'"
+        )
+    )
+
+
+async def wal_position(conn) -> str | None:
+    if conn.dialect.name != "postgresql":
+        return None
+    return await conn.scalar(text("SELECT pg_current_wal_lsn()::text"))
+
+
+async def wal_bytes(conn, start: str | None) -> int | None:
+    if start is None:
+        return None
+    return await conn.scalar(
+        text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)"),
+        {"start": start},
+    )
+
+
+async def load(version: int, args) -> dict:
+    new_id = ID_FACTORIES[version]
+    template = make_rows(args.batch_size, args.description_size)
+    await reset_database()
+    async with engine.connect() as conn:
+        wal_start = await wal_position(conn)
+
+    batches = -(-args.rows // args.batch_size)
+    tail_from = batches - max(1, batches // 10)
+    tail_rows, tail_elapsed = 0, 0.0
+    start = time.perf_counter()
+    for batch in range(batches):
+        size = min(args.batch_size, args.rows - batch * args.batch_size)
+        values = [
+            {
+                "id": new_id(),
+                "title": title,
+                "description": description,
+                "status": status,
+            }
+            for _, title, description, status, _ in template[:size]
+        ]
+        batch_start = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(Task.__table__.insert(), values)
+        if batch >= tail_from:
+            tail_rows += size
+            tail_elapsed += time.perf_counter() - batch_start
+    elapsed = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        written = await wal_bytes(conn, wal_start)
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE tasks"))
+        index_bytes = await primary_key_size(conn)
+    return {
+        "version": version,
+        "rows": args.rows,
+        "rows_per_s": args.rows / elapsed,
+        "tail_rows_per_s": tail_rows / tail_elapsed,
+        "pk_index_mb": index_bytes / 2**20,
+        "wal_mb": written / 2**20 if written is not None else None,
+    }
+
+
+async def run(args) -> dict:
+    results = [await load(version, args) for version in (4, 7)]
+    await engine.dispose()
+    return {"database": engine.url.get_backend_name(), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--description-size", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['database']}, {args.rows} rows")
+    print(
+        f"{'id':<6} {'rows/s':>10} {'tail rows/s':>12} {'pk MB':>8} "
+        f"{'WAL MB':>8}"
+    )
+    for result in report["results"]:
+        wal = result["wal_mb"]
+        print(
+            f"uuid{result['version']:<2} {result['rows_per_s']:>10.0f} "
+            f"{result['tail_rows_per_s']:>12.0f} "
+            f"{result['pk_index_mb']:>8.1f} "
+            f"{'-' if wal is None else f'{wal:.1f}':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
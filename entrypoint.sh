@@ -2,4 +2,4 @@
 set -e
 
 alembic upgrade head || echo "Alembic migration failed or not configured, skipping"
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+exec python -m app.server
\ No newline at end of file
@@ -0,0 +1,151 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import RecentAverage, get_read_db
+from app.main import app as main_app
+from app.middleware.admission import (
+    ADMISSION_SHED,
+    READ,
+    SCAN,
+    WRITE,
+    AdmissionController,
+    AdmissionMiddleware,
+    classify,
+)
+
+
+def test_routes_are_classified_by_cost():
+    """Тест классификации маршрутов: дешёвые чтения, записи и выборки"""
+    task_path = "/tasks/0b0e6a1c-1a4c-4c53-9d07-5c1f0e1f2a3b"
+
+    assert classify("GET", task_path) == READ
+    assert classify("GET", "/tasks/stats") == READ
+    assert classify("GET", "/tasks/") == SCAN
+    assert classify("GET", "/tasks/export") == SCAN
+    assert classify("POST", "/tasks/") == WRITE
+    assert classify("POST", "/tasks/lookup") == SCAN
+    assert classify("DELETE", task_path) == WRITE
+    assert classify("GET", "/tasks/changes") is None
+    assert classify("GET", "/health") is None
+
+
+@pytest.mark.asyncio
+async def test_waiting_reads_are_admitted_before_writes():
+    """Тест приоритета: освободившийся слот достаётся чтению"""
+    controller = AdmissionController(1, {}, queue_timeout=1)
+    assert await controller.acquire(SCAN) is None
+    write = asyncio.ensure_future(controller.acquire(WRITE))
+    await asyncio.sleep(0)
+    read = asyncio.ensure_future(controller.acquire(READ))
+    await asyncio.sleep(0)
+
+    controller.release(SCAN)
+    await asyncio.sleep(0)
+
+    assert read.done() and read.result() is None
+    assert not write.done()
+    controller.release(READ)
+    assert await write is None
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_timeout_shed_requests():
+    """Тест отказа при переполнении очереди и истечении ожидания"""
+    controller = AdmissionController(
+        2, {WRITE: 1}, queue_size=1, queue_timeout=0.01
+    )
+    assert await controller.acquire(WRITE) is None
+    queued = asyncio.ensure_future(controller.acquire(WRITE))
+    await asyncio.sleep(0)
+
+    assert await controller.acquire(WRITE) == "queue_full"
+    assert await queued == "timeout"
+    assert await controller.acquire(READ) is None
+    assert not controller._waiters[WRITE]
+
+
+@pytest.mark.asyncio
+async def test_pool_saturation_sheds_writes_and_scans_only():
+    """Тест сброса записей и выборок при долгом ожидании соединения"""
+    controller = AdmissionController(
+        10, {}, pool_wait_threshold=0.1, pool_wait=lambda: 0.5
+    )
+
+    assert await controller.acquire(WRITE) == "pool_saturated"
+    assert await controller.acquire(SCAN) == "pool_saturated"
+    assert await controller.acquire(READ) is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_responds_503_with_retry_after():
+    """Тест ответа 503 с Retry-After и счётчика отказов"""
+    app = FastAPI()
+
+    @app.get("/tasks/{task_id}")
+    async def get_task(task_id: str):
+        return {"id": task_id}
+
+    @app.post("/tasks/")
+    async def create_task():
+        return {}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=AdmissionController(
+            10, {}, pool_wait_threshold=0.1, pool_wait=lambda: 0.5
+        ),
+        retry_after=3,
+    )
+    shed = ADMISSION_SHED.value(kind=WRITE, reason="pool_saturated")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        rejected = await client.post("/tasks/")
+        admitted = await client.get("/tasks/1")
+
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "3"
+    assert admitted.status_code == 200
+    assert (
+        ADMISSION_SHED.value(kind=WRITE, reason="pool_saturated")
+        == shed + 1
+    )
+
+
+def test_recent_average_decays_when_idle():
+    """Тест затухания среднего времени ожидания пула без новых замеров"""
+    with patch("app.database.time.monotonic", return_value=100.0):
+        average = RecentAverage(half_life=1.0, weight=0.5)
+        average.observe(1.0)
+        assert average.value() == 0.5
+    with patch("app.database.time.monotonic", return_value=102.0):
+        assert average.value() == 0.125
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_becomes_503():
+    """Тест ответа 503 вместо 500 при исчерпании пула соединений"""
+
+    async def exhausted_pool():
+        raise PoolTimeoutError("QueuePool limit reached")
+        yield
+
+    main_app.dependency_overrides[get_read_db] = exhausted_pool
+    try:
+        transport = httpx.ASGITransport(app=main_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/tasks/stats")
+    finally:
+        main_app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.models import Task, Status
+from app.schemas import TaskCreate, TaskBulkUpdate
+from app.services.task_service import TaskService
+from app.exceptions import TaskAlreadyExistsError
+
+
+@pytest.fixture
+def mock_db():
+    """Фикстура для мока базы данных"""
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.fixture
+def postgres_db(mock_db):
+    """Фикстура для мока базы данных PostgreSQL"""
+    mock_db.get_bind.return_value.dialect.name = "postgresql"
+    return mock_db
+
+
+@pytest.fixture
+def sample_tasks():
+    """Фикстура с примером задач"""
+    return [
+        Task(
+            id=uuid4(),
+            title=f"Task {i}",
+            description="Test Description",
+            status=Status.created,
+        )
+        for i in range(3)
+    ]
+
+
+def make_mock_result(values):
+    """Helper to mock query results."""
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = values
+    return mock_result
+
+
+def compile_sql(statement):
+    """Helper to render a statement for PostgreSQL."""
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_single_statement(mock_db, sample_tasks):
+    """Тест массового создания задач одним запросом"""
+    mock_db.execute.return_value = make_mock_result(sample_tasks)
+    tasks_create = [
+        TaskCreate(title=task.title, description=task.description)
+        for task in sample_tasks
+    ]
+
+    result = await TaskService.create_tasks(mock_db, tasks_create)
+
+    assert result == sample_tasks
+    mock_db.execute.assert_called_once()
+    args, _ = mock_db.execute.call_args
+    assert args[1] == [task.model_dump() for task in tasks_create]
+    mock_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_integrity_error(mock_db):
+    """Тест ошибки целостности при массовом создании задач"""
+    mock_db.execute.side_effect = IntegrityError("Integrity error", None, None)
+
+    with pytest.raises(TaskAlreadyExistsError):
+        await TaskService.create_tasks(
+            mock_db, [TaskCreate(title="Task", description="Description")]
+        )
+
+    mock_db.rollback.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_values_join(postgres_db, sample_tasks):
+    """Тест массового обновления через UPDATE ... FROM VALUES"""
+    postgres_db.execute.return_value = make_mock_result(sample_tasks[:1])
+    updates = [
+        TaskBulkUpdate(
+            id=task.id, title="Updated", description=None, status=None
+        )
+        for task in sample_tasks
+    ]
+
+    result = await TaskService.update_tasks(postgres_db, updates)
+
+    assert result == sample_tasks[:1]
+    args, _ = postgres_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert "FROM (VALUES" in sql
+    assert "coalesce(bulk_update.title, tasks.title)" in sql
+    assert "RETURNING" in sql
+    postgres_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_case_fallback(mock_db, sample_tasks):
+    """Тест массового обновления через CASE для других СУБД"""
+    mock_db.execute.return_value = make_mock_result([])
+    updates = [
+        TaskBulkUpdate(
+            id=sample_tasks[0].id,
+            title=None,
+            description=None,
+            status=Status.completed,
+        )
+    ]
+
+    await TaskService.update_tasks(mock_db, updates)
+
+    args, _ = mock_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert "status=CASE WHEN" in sql
+    assert "title=" not in sql
+    assert "tasks.id IN" in sql
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_database_error(mock_db, sample_tasks):
+    """Тест ошибки базы данных при массовом обновлении задач"""
+    mock_db.execute.side_effect = SQLAlchemyError("Database error")
+    updates = [
+        TaskBulkUpdate(
+            id=sample_tasks[0].id,
+            title="Updated",
+            description=None,
+            status=None,
+        )
+    ]
+
+    with pytest.raises(SQLAlchemyError):
+        await TaskService.update_tasks(mock_db, updates)
+
+    mock_db.rollback.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_tasks_any_array(postgres_db, sample_tasks):
+    """Тест массового удаления через = ANY(...)"""
+    deleted_ids = [task.id for task in sample_tasks]
+    postgres_db.execute.return_value = make_mock_result(deleted_ids)
+
+    result = await TaskService.delete_tasks(
+        postgres_db, deleted_ids + [uuid4()]
+    )
+
+    assert result == deleted_ids
+    args, _ = postgres_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert "tasks.id = ANY (%(ids)s" in sql
+    assert "RETURNING tasks.id" in sql
+    postgres_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_tasks_database_error(mock_db):
+    """Тест ошибки базы данных при массовом удалении задач"""
+    mock_db.execute.side_effect = SQLAlchemyError("Database error")
+
+    with pytest.raises(SQLAlchemyError):
+        await TaskService.delete_tasks(mock_db, [uuid4()])
+
+    mock_db.rollback.assert_called_once()
@@ -0,0 +1,257 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import (
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    MemoryTaskCache,
+    RedisTaskCache,
+)
+from app.models import Task, Status
+from app.schemas import TaskVersioned, TaskUpdate
+from app.services.task_service import TaskService
+
+
+class FakeRedis:
+    """Локальная замена клиента Redis"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        async def set_if_newer(keys, args):
+            # Повторяет REDIS_SET_IF_NEWER.
+            current = self.data.get(keys[0])
+            if current is not None and (
+                current == args[3]
+                or json.loads(current)["version"] >= args[1]
+            ):
+                return 0
+            self.data[keys[0]] = args[0]
+            return 1
+
+        return set_if_newer
+
+
+@pytest.fixture
+def mock_db():
+    """Фикстура для мока базы данных"""
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.fixture
+def sample_task():
+    """Фикстура с примером задачи"""
+    return Task(
+        id=uuid4(),
+        title="Test Task",
+        description="Test Description",
+        status=Status.created,
+        version=1,
+    )
+
+
+@pytest.fixture
+def memory_cache():
+    """Фикстура с in-process кэшем задач"""
+    memory_cache = MemoryTaskCache(max_entries=2, ttl=60)
+    with patch("app.cache.task_cache", memory_cache):
+        yield memory_cache
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_lru_eviction(sample_task):
+    """Тест вытеснения давно не использованных записей"""
+    cache = MemoryTaskCache(max_entries=2, ttl=60)
+    evictions = CACHE_EVICTIONS.value()
+    ids = [uuid4() for _ in range(3)]
+
+    await cache.set(ids[0], sample_task)
+    await cache.set(ids[1], sample_task)
+    await cache.get(ids[0])
+    await cache.set(ids[2], sample_task)
+
+    assert await cache.get(ids[1]) is None
+    assert await cache.get(ids[0]) is not None
+    assert await cache.get(ids[2]) is not None
+    assert CACHE_EVICTIONS.value() == evictions + 1
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_ttl(sample_task):
+    """Тест истечения срока жизни записи"""
+    cache = MemoryTaskCache(max_entries=10, ttl=-1)
+    misses = CACHE_MISSES.value()
+
+    await cache.set(sample_task.id, sample_task)
+
+    assert await cache.get(sample_task.id) is None
+    assert CACHE_MISSES.value() == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_roundtrip(sample_task):
+    """Тест Redis-бэкенда кэша на локальной замене"""
+    cache = RedisTaskCache(FakeRedis(), ttl=60)
+    hits = CACHE_HITS.value()
+
+    await cache.set(sample_task.id, sample_task)
+    cached = await cache.get(sample_task.id)
+
+    assert cached == TaskVersioned.model_validate(sample_task)
+    assert CACHE_HITS.value() == hits + 1
+    await cache.delete(sample_task.id)
+    assert await cache.get(sample_task.id) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_errors_are_misses(sample_task):
+    """Тест обработки ошибок Redis как промаха"""
+    client = FakeRedis()
+    client.get = AsyncMock(side_effect=ConnectionError("down"))
+    cache = RedisTaskCache(client, ttl=60)
+
+    assert await cache.get(sample_task.id) is None
+
+
+@pytest.mark.asyncio
+async def test_get_task_read_through(mock_db, sample_task, memory_cache):
+    """Тест чтения задачи через кэш"""
+    with patch.object(
+        TaskService, "_get_task_or_raise", AsyncMock(return_value=sample_task)
+    ):
+        first = await TaskService.get_task(mock_db, str(sample_task.id))
+        second = await TaskService.get_task(mock_db, str(sample_task.id))
+
+        TaskService._get_task_or_raise.assert_called_once()
+    assert first is sample_task
+    assert second == TaskVersioned.model_validate(sample_task)
+
+
+@pytest.mark.asyncio
+async def test_update_task_refreshes_cache(
+    mock_db, sample_task, memory_cache
+):
+    """Тест обновления записи кэша после изменения задачи"""
+    await memory_cache.set(sample_task.id, sample_task)
+    updated = Task(
+        id=sample_task.id,
+        title="Updated",
+        description=sample_task.description,
+        status=Status.completed,
+        version=2,
+    )
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = updated
+    mock_db.execute.return_value = mock_result
+
+    await TaskService.update_task(
+        mock_db,
+        sample_task.id,
+        TaskUpdate(title="Updated", description=None, status=None),
+    )
+
+    cached = await memory_cache.get(sample_task.id)
+    assert cached.title == "Updated"
+    assert cached.status == Status.completed
+    assert cached.version == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_task_invalidates_cache(
+    mock_db, sample_task, memory_cache
+):
+    """Тест инвалидации кэша при удалении задачи"""
+    await memory_cache.set(sample_task.id, sample_task)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = sample_task.id
+    mock_db.execute.return_value = mock_result
+
+    await TaskService.delete_task(mock_db, sample_task.id)
+
+    assert await memory_cache.get(sample_task.id) is None
+
+
+def versioned(task, version, title):
+    return TaskVersioned(
+        id=task.id,
+        title=title,
+        description=task.description,
+        status=task.status,
+        version=version,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+async def test_cache_keeps_newer_version_and_tombstones(backend, sample_task):
+    """Тест: старая версия и удалённая задача не перезаписывают кэш"""
+    if backend == "memory":
+        cache = MemoryTaskCache(max_entries=10, ttl=60)
+    else:
+        cache = RedisTaskCache(FakeRedis(), ttl=60)
+
+    await cache.set(sample_task.id, versioned(sample_task, 2, "New"))
+    await cache.set(sample_task.id, versioned(sample_task, 1, "Old"))
+    assert (await cache.get(sample_task.id)).title == "New"
+
+    await cache.delete(sample_task.id)
+    await cache.set(sample_task.id, versioned(sample_task, 2, "New"))
+    assert await cache.get(sample_task.id) is None
+
+
+@pytest.mark.asyncio
+async def test_read_finishing_after_write_keeps_new_version(
+    mock_db, sample_task, memory_cache
+):
+    """Тест: чтение, завершившееся после записи, не кэширует старую версию"""
+    loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_load(db, task_id):
+        loaded.set()
+        await release.wait()
+        return sample_task
+
+    updated = Task(
+        id=sample_task.id,
+        title="Updated",
+        description=sample_task.description,
+        status=Status.completed,
+        version=2,
+    )
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = updated
+    mock_db.execute.return_value = mock_result
+
+    with patch.object(TaskService, "_get_task_or_raise", slow_load):
+        read = asyncio.ensure_future(
+            TaskService.get_task(mock_db, str(sample_task.id))
+        )
+        await loaded.wait()
+        await TaskService.update_task(
+            mock_db,
+            sample_task.id,
+            TaskUpdate(title="Updated", description=None, status=None),
+        )
+        release.set()
+        assert (await read).version == 1
+
+    cached = await memory_cache.get(sample_task.id)
+    assert cached.version == 2
+    assert cached.title == "Updated"
@@ -0,0 +1,200 @@
+import asyncio
+import gzip
+import zlib
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Header, Response
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+
+from app.common.etag import if_none_match, task_etag
+from app.middleware import compression
+from app.middleware.compression import (
+    Codec,
+    CompressionMiddleware,
+    available_codecs,
+    negotiate,
+)
+
+BODY = [
+    {"title": f"Task {i}", "description": "Buy milk " * 20}
+    for i in range(50)
+]
+
+
+def make_app(**options):
+    app = FastAPI()
+
+    @app.get("/tasks/")
+    async def tasks():
+        return BODY
+
+    @app.get("/tasks/1")
+    async def task(
+        if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    ):
+        etag = task_etag(3)
+        if if_none_match(if_none_match_header, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(BODY, headers={"ETag": etag})
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/export")
+    async def export():
+        async def chunks():
+            for i in range(3):
+                yield f'{{"chunk":{i}}}\n'.encode() * 100
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/changes")
+    async def changes():
+        return PlainTextResponse(
+            "data: {}\n\n" * 500, media_type="text/event-stream"
+        )
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+async def get(app, path, encoding="gzip", **headers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        return await client.get(
+            path, headers={"Accept-Encoding": encoding, **headers}
+        )
+
+
+def test_negotiation_follows_q_values_and_server_preference():
+    """Тест выбора кодирования по q-значениям и порядку сервера"""
+    zstd, br, gz = (Codec(name, None, 1) for name in ("zstd", "br", "gzip"))
+    codecs = [zstd, br, gz]
+
+    assert negotiate("gzip, br", codecs) is br
+    assert negotiate("gzip;q=1, br;q=0.5", codecs) is gz
+    assert negotiate("br;q=0, *", codecs) is zstd
+    assert negotiate("identity", codecs) is None
+    assert negotiate("gzip;q=0", codecs) is None
+    assert negotiate(None, codecs) is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped():
+    """Тест сжатия большого JSON-ответа gzip"""
+    response = await get(make_app(), "/tasks/")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.json() == BODY
+    assert int(response.headers["Content-Length"]) < len(response.content) / 5
+
+
+@pytest.mark.asyncio
+async def test_compressed_variant_has_its_own_etag():
+    """Тест отдельного ETag у сжатого варианта ответа"""
+    app = make_app()
+
+    compressed = await get(app, "/tasks/1")
+    identity = await get(app, "/tasks/1", encoding="identity")
+    revalidated = await get(app, "/tasks/1", **{"If-None-Match": '"3-gzip"'})
+
+    assert compressed.headers["ETag"] == '"3-gzip"'
+    assert identity.headers["ETag"] == '"3"'
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == '"3-gzip"'
+
+
+@pytest.mark.asyncio
+async def test_small_and_event_stream_responses_are_not_compressed():
+    """Тест: маленькие ответы и SSE не сжимаются"""
+    app = make_app()
+
+    small = await get(app, "/small")
+    events = await get(app, "/changes")
+    identity = await get(app, "/tasks/", encoding="identity")
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in events.headers
+    assert "Content-Encoding" not in identity.headers
+    assert identity.json() == BODY
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_decode_as_they_arrive():
+    """Тест потокового сжатия: каждый фрагмент декодируется сразу"""
+    messages = []
+    finished = asyncio.Event()
+
+    async def send(message):
+        messages.append(message)
+        if not message.get("more_body", True):
+            finished.set()
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/export",
+        "raw_path": b"/export",
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "server": ("test", 80),
+    }
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    await make_app()(scope, receive, send)
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    for i, message in enumerate(bodies[:3]):
+        assert decoder.decompress(message["body"]).startswith(
+            f'{{"chunk":{i}}}'.encode()
+        )
+    assert bodies[-1]["more_body"] is False
+    decoder.decompress(bodies[-1]["body"])
+    assert decoder.eof
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_are_compressed_in_a_thread():
+    """Тест сжатия больших ответов вне цикла событий"""
+    app = make_app(thread_min_size=4096)
+
+    with patch.object(
+        compression.asyncio,
+        "to_thread",
+        wraps=compression.asyncio.to_thread,
+    ) as to_thread:
+        response = await get(app, "/tasks/")
+
+    assert to_thread.call_count == 1
+    assert response.json() == BODY
+
+
+def test_gzip_codec_output_is_standard_gzip():
+    """Тест совместимости вывода кодека gzip со стандартным модулем"""
+    codec = available_codecs(gzip_level=9)[-1]
+
+    assert codec.name == "gzip"
+    assert gzip.decompress(codec.compress(b"task" * 100)) == b"task" * 100
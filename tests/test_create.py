@@ -51,7 +51,7 @@ async def test_create_task_success(mock_db, sample_task_create, sample_task):
 
         mock_db.add.assert_called_once_with(sample_task)
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(sample_task)
+        mock_db.refresh.assert_not_called()
         assert result == sample_task
 
 
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
@@ -27,53 +27,71 @@ def sample_task():
     )
 
 
+def make_mock_result(deleted_ids, rowcount=None):
+    """Helper to mock DELETE results."""
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = (
+        deleted_ids[0] if deleted_ids else None
+    )
+    mock_result.rowcount = (
+        len(deleted_ids) if rowcount is None else rowcount
+    )
+    return mock_result
+
+
 @pytest.mark.asyncio
 async def test_delete_task_success(mock_db, sample_task):
-    """Тест успешного удаления задачи"""
+    """Тест успешного удаления задачи одним запросом"""
     task_id = str(sample_task.id)
+    mock_db.execute.return_value = make_mock_result([sample_task.id])
+
+    result = await TaskService.delete_task(mock_db, task_id)
 
-    with patch.object(
-        TaskService, '_get_task_or_raise', AsyncMock(return_value=sample_task)
-    ):
-        mock_db.delete = AsyncMock()
-        mock_db.commit = AsyncMock()
+    assert result == sample_task.id
+    mock_db.execute.assert_called_once()
+    args, _ = mock_db.execute.call_args
+    sql = str(args[0])
+    assert sql.startswith("DELETE FROM tasks WHERE tasks.id =")
+    assert "RETURNING tasks.id" in sql
+    mock_db.delete.assert_not_called()
+    mock_db.commit.assert_called_once()
 
-        result = await TaskService.delete_task(mock_db, task_id)
 
-        assert result == sample_task.id
-        mock_db.delete.assert_called_once_with(sample_task)
-        mock_db.commit.assert_called_once()
+@pytest.mark.asyncio
+async def test_delete_task_without_returning(mock_db, sample_task):
+    """Тест удаления задачи в СУБД без поддержки RETURNING"""
+    mock_db.get_bind.return_value.dialect.delete_returning = False
+    mock_db.execute.return_value = make_mock_result([sample_task.id])
+
+    result = await TaskService.delete_task(mock_db, sample_task.id)
+
+    assert result == sample_task.id
+    args, _ = mock_db.execute.call_args
+    assert "RETURNING" not in str(args[0])
+    mock_db.commit.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_delete_task_not_found(mock_db):
     """Тест несуществующей задачи при удалении"""
     task_id = str(uuid4())
+    mock_db.execute.return_value = make_mock_result([])
 
-    with patch.object(
-        TaskService,
-        '_get_task_or_raise',
-        AsyncMock(side_effect=TaskNotFoundError("Not found")),
-    ):
-        with pytest.raises(TaskNotFoundError):
-            await TaskService.delete_task(mock_db, task_id)
+    with pytest.raises(TaskNotFoundError):
+        await TaskService.delete_task(mock_db, task_id)
+
+    mock_db.commit.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_delete_task_database_error(mock_db, sample_task):
     """Тест ошибки базы данных при удалении задачи"""
     task_id = str(sample_task.id)
+    mock_db.execute.return_value = make_mock_result([sample_task.id])
+    mock_db.commit = AsyncMock(side_effect=SQLAlchemyError("Database error"))
+    mock_db.rollback = AsyncMock()
 
-    with patch.object(
-        TaskService, '_get_task_or_raise', AsyncMock(return_value=sample_task)
-    ):
-        mock_db.delete = AsyncMock()
-        mock_db.commit = AsyncMock(
-            side_effect=SQLAlchemyError("Database error")
-        )
-        mock_db.rollback = AsyncMock()
-
-        with pytest.raises(SQLAlchemyError):
-            await TaskService.delete_task(mock_db, task_id)
+    with pytest.raises(SQLAlchemyError):
+        await TaskService.delete_task(mock_db, task_id)
 
-        mock_db.rollback.assert_called_once()
+    mock_db.rollback.assert_called_once()
@@ -0,0 +1,172 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.etag import (
+    if_match_versions,
+    if_none_match,
+    list_etag,
+    task_etag,
+)
+from app.models import Task, Status
+from app.routes.tasks import create_task
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+from app.exceptions import TaskNotFoundError, TaskPreconditionFailedError
+
+
+@pytest.fixture
+def mock_db():
+    """Фикстура для мока базы данных"""
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.fixture
+def sample_task():
+    """Фикстура с примером задачи"""
+    return Task(
+        id=uuid4(),
+        title="Test Task",
+        description="Test Description",
+        status=Status.created,
+        version=3,
+    )
+
+
+@pytest.fixture
+def sample_task_update():
+    """Фикстура с примером схемы обновления задачи"""
+    return TaskUpdate(
+        title="Updated Task", description=None, status=Status.completed
+    )
+
+
+def make_mock_result(value):
+    """Helper to mock single-row RETURNING results."""
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = value
+    return mock_result
+
+
+def test_if_none_match_weak_comparison():
+    """Тест слабого сравнения ETag в If-None-Match"""
+    etag = task_etag(3)
+
+    assert if_none_match('"3"', etag)
+    assert if_none_match('W/"3"', etag)
+    assert if_none_match('"1", "3"', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match('"2"', etag)
+    assert not if_none_match(None, etag)
+    assert if_none_match('"3-gzip"', etag)
+    assert if_none_match('W/"3-br"', etag)
+    assert not if_none_match('"3-deflate"', etag)
+
+
+def test_if_match_versions():
+    """Тест разбора заголовка If-Match"""
+    assert if_match_versions(None) is None
+    assert if_match_versions("*") is None
+    assert if_match_versions('"3", "4"') == [3, 4]
+    assert if_match_versions('W/"3", "abc"') == []
+    assert if_match_versions('"3-zstd"') == [3]
+
+
+def test_list_etag_changes_with_version(sample_task):
+    """Тест изменения ETag списка при изменении версии"""
+    before = list_etag([sample_task])
+    sample_task.version += 1
+
+    assert list_etag([sample_task]) != before
+    assert list_etag([sample_task]) == list_etag([sample_task])
+
+
+@pytest.mark.asyncio
+async def test_create_task_sets_etag(mock_db, sample_task):
+    """Тест заголовка ETag в ответе на создание задачи"""
+    response = Response()
+
+    with patch.object(
+        TaskService, "create_task", AsyncMock(return_value=sample_task)
+    ):
+        await create_task(
+            TaskCreate(title="Test Task", description="Test Description"),
+            response,
+            mock_db,
+        )
+
+    assert response.headers["ETag"] == task_etag(3)
+
+
+@pytest.mark.asyncio
+async def test_update_task_if_match_in_where(
+    mock_db, sample_task, sample_task_update
+):
+    """Тест проверки версии в WHERE при обновлении"""
+    mock_db.execute.return_value = make_mock_result(sample_task)
+
+    await TaskService.update_task(
+        mock_db, sample_task.id, sample_task_update, expected_versions=[3]
+    )
+
+    args, _ = mock_db.execute.call_args
+    sql = str(args[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "tasks.version IN (3)" in sql
+    mock_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_task_precondition_failed(
+    mock_db, sample_task, sample_task_update
+):
+    """Тест устаревшей версии при обновлении задачи"""
+    mock_db.execute.return_value = make_mock_result(None)
+
+    with patch.object(
+        TaskService, "_get_task_or_raise", AsyncMock(return_value=sample_task)
+    ):
+        with pytest.raises(TaskPreconditionFailedError):
+            await TaskService.update_task(
+                mock_db,
+                sample_task.id,
+                sample_task_update,
+                expected_versions=[2],
+            )
+
+    mock_db.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_task_if_match_not_found(mock_db, sample_task_update):
+    """Тест условного обновления несуществующей задачи"""
+    mock_db.execute.return_value = make_mock_result(None)
+
+    with patch.object(
+        TaskService,
+        "_get_task_or_raise",
+        AsyncMock(side_effect=TaskNotFoundError("Not found")),
+    ):
+        with pytest.raises(TaskNotFoundError):
+            await TaskService.update_task(
+                mock_db, uuid4(), sample_task_update, expected_versions=[1]
+            )
+
+
+@pytest.mark.asyncio
+async def test_delete_task_precondition_failed(mock_db, sample_task):
+    """Тест устаревшей версии при удалении задачи"""
+    mock_db.execute.return_value = make_mock_result(None)
+
+    with patch.object(
+        TaskService, "_get_task_or_raise", AsyncMock(return_value=sample_task)
+    ):
+        with pytest.raises(TaskPreconditionFailedError):
+            await TaskService.delete_task(
+                mock_db, sample_task.id, expected_versions=[2]
+            )
+
+    args, _ = mock_db.execute.call_args
+    assert "tasks.version IN" in str(args[0])
+    mock_db.commit.assert_not_called()
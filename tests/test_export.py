@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.common.export import csv_chunk, ndjson_chunk
+from app.models import Status
+from app.schemas import TaskResponse
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+def mock_db():
+    """Фикстура для мока базы данных"""
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.fixture
+def sample_rows():
+    """Фикстура с примером строк выгрузки"""
+    return [
+        (uuid4(), "Задача", 'Описание, "с кавычками"', Status.created),
+        (uuid4(), "Second", "Line\nbreak", Status.completed),
+    ]
+
+
+def make_mock_stream(partitions):
+    """Helper to mock streaming results."""
+
+    async def iterate():
+        for partition in partitions:
+            yield partition
+
+    mock_result = MagicMock()
+    mock_result.partitions.return_value = iterate()
+    return mock_result
+
+
+def test_ndjson_chunk_matches_response_schema(sample_rows):
+    """Тест совпадения NDJSON со схемой ответа"""
+    lines = ndjson_chunk(sample_rows).decode().splitlines()
+
+    assert len(lines) == len(sample_rows)
+    for line, (task_id, title, description, task_status) in zip(
+        lines, sample_rows
+    ):
+        expected = TaskResponse(
+            id=task_id,
+            title=title,
+            description=description,
+            status=task_status,
+        )
+        assert line == expected.model_dump_json()
+
+
+def test_csv_chunk_header(sample_rows):
+    """Тест заголовка CSV выгрузки"""
+    chunk = csv_chunk(sample_rows, header=True)
+
+    assert chunk.startswith("id,title,description,status\r\n")
+    assert '"Описание, ""с кавычками"""' in chunk
+    assert csv_chunk([], header=False) == ""
+
+
+@pytest.mark.asyncio
+async def test_stream_tasks_partitions(mock_db, sample_rows):
+    """Тест потоковой выгрузки задач пачками"""
+    mock_db.stream.return_value = make_mock_stream(
+        [sample_rows[:1], sample_rows[1:]]
+    )
+
+    partitions = [
+        rows async for rows in TaskService.stream_tasks(mock_db, 1)
+    ]
+
+    assert partitions == [sample_rows[:1], sample_rows[1:]]
+    args, _ = mock_db.stream.call_args
+    assert args[0].get_execution_options()["yield_per"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_tasks_database_error(mock_db):
+    """Тест ошибки базы данных при потоковой выгрузке"""
+    mock_db.stream.side_effect = SQLAlchemyError("Database error")
+
+    with pytest.raises(SQLAlchemyError):
+        async for _ in TaskService.stream_tasks(mock_db, 100):
+            pass
@@ -0,0 +1,228 @@
+import asyncio
+import json
+from unittest.mock import patch
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app import feed
+from app.database import FEED_SETTING, Base, engine_options
+from app.feed import (
+    FEED_LAGGED,
+    RESET_MESSAGE,
+    ChangeFeed,
+    EventType,
+    PostgresChangeFeed,
+    feed_backend,
+)
+from app.models import Status
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Фикстура с сессией in-memory SQLite"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def change_feed():
+    """Фикстура с отдельным брокером изменений"""
+    feed = ChangeFeed(queue_size=2, history_size=3)
+    with patch("app.feed.change_feed", feed):
+        yield feed
+
+
+def parse(message: bytes) -> dict:
+    fields = dict(
+        line.split(": ", 1) for line in message.decode().strip().split("\n")
+    )
+    return {
+        "id": int(fields["id"]),
+        "event": fields["event"],
+        "data": json.loads(fields["data"]),
+    }
+
+
+async def take(stream, count):
+    return [await asyncio.wait_for(anext(stream), 1) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_service_writes_publish_events(db, change_feed):
+    """Тест событий создания, изменения и удаления из TaskService"""
+    stream = change_feed.stream()
+    pending = asyncio.ensure_future(take(stream, 3))
+    await asyncio.sleep(0)
+
+    task = await TaskService.create_task(
+        db, TaskCreate(title="Task", description="Description")
+    )
+    await TaskService.update_task(
+        db,
+        str(task.id),
+        TaskUpdate(title="Done", description="Text", status=Status.completed),
+    )
+    await TaskService.delete_task(db, str(task.id))
+    events = [parse(message) for message in await pending]
+    await stream.aclose()
+
+    assert [e["id"] for e in events] == [1, 2, 3]
+    assert [e["event"] for e in events] == ["created", "updated", "deleted"]
+    assert events[1]["data"]["task"]["title"] == "Done"
+    assert events[1]["data"]["task"]["version"] == 2
+    assert events[2]["data"] == {
+        "type": "deleted",
+        "id": str(task.id),
+        "task": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_history_or_resets(change_feed):
+    """Тест возобновления по номеру события и сброса при потере истории"""
+    await change_feed.publish(
+        EventType.deleted, [UUID(int=i) for i in range(5)]
+    )
+
+    resumed = change_feed.stream(after=3)
+    replayed = [parse(m)["id"] for m in await take(resumed, 2)]
+    too_old = change_feed.stream(after=0)
+    first = await take(too_old, 1)
+    await resumed.aclose()
+    await too_old.aclose()
+
+    assert replayed == [4, 5]
+    assert first == [RESET_MESSAGE]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped(change_feed):
+    """Тест отключения медленного подписчика при переполнении очереди"""
+    subscription = change_feed.subscribe()
+    lagged = FEED_LAGGED.value()
+
+    await change_feed.publish(EventType.deleted, [uuid4() for _ in range(3)])
+
+    assert subscription.closed
+    assert subscription.queue.qsize() == 2
+    assert FEED_LAGGED.value() == lagged + 1
+    assert subscription not in change_feed._subscribers
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_keepalive():
+    """Тест комментария keepalive при отсутствии событий"""
+    stream = ChangeFeed(queue_size=1, history_size=1).stream(keepalive=0.01)
+
+    assert await take(stream, 1) == [b": keepalive\n\n"]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_postgres_notification_is_dispatched_with_its_sequence():
+    """Тест разбора уведомления NOTIFY с номером события"""
+    feed = PostgresChangeFeed(None, queue_size=1, history_size=10)
+    subscription = feed.subscribe()
+
+    feed._on_notify(
+        None, 1, "task_events", '42:deleted:{"type":"deleted","id":"x"}'
+    )
+
+    event = parse(subscription.queue.get_nowait())
+    assert event["id"] == 42
+    assert event["event"] == "deleted"
+    assert feed.subscribe(after=42).reset is False
+    assert feed.subscribe(after=41).reset is True
+
+
+@pytest.mark.asyncio
+async def test_postgres_feed_resumes_only_from_known_events():
+    """Тест возобновления при номерах событий с пропусками"""
+    feed = PostgresChangeFeed(None, queue_size=10, history_size=2)
+    for seq in (10, 12, 15):
+        feed._on_notify(
+            None, 1, "task_events", f'{seq}:deleted:{{"id":"{seq}"}}'
+        )
+
+    # Событие 10 вытеснено из истории: 11 могло быть пропущено.
+    assert feed.subscribe(after=11).reset is True
+    assert feed.subscribe(after=10).reset is True
+    resumed = feed.subscribe(after=12)
+    assert resumed.reset is False
+    assert [parse(message)["id"] for message in resumed.backlog] == [15]
+    assert feed.subscribe(after=13).reset is True
+
+
+def test_memory_feed_resumes_right_before_its_history():
+    """Тест: в памяти номера подряд, история с after + 1 продолжает ленту"""
+    feed = ChangeFeed(queue_size=10, history_size=2)
+    for seq in (1, 2, 3):
+        feed._dispatch(seq, "deleted", b"{}")
+
+    assert len(feed.subscribe(after=1).backlog) == 2
+    assert feed.subscribe(after=0).reset is True
+
+
+@pytest.mark.asyncio
+async def test_postgres_publish_leaves_events_to_the_trigger():
+    """Тест: приложение не отправляет NOTIFY, это делает триггер"""
+    feed = PostgresChangeFeed(None, queue_size=1, history_size=10)
+    subscription = feed.subscribe()
+
+    await feed.publish(EventType.deleted, [uuid4()])
+
+    assert subscription.queue.empty()
+
+
+def test_auto_backend_follows_database_url(monkeypatch):
+    """Тест выбора брокера по DATABASE_URL при FEED_BACKEND=auto"""
+    monkeypatch.setattr(feed.settings, "FEED_BACKEND", "auto")
+    monkeypatch.setattr(
+        feed.settings, "DATABASE_URL", "postgresql+asyncpg://u:p@db/tasks"
+    )
+    assert feed_backend() == "postgres"
+
+    monkeypatch.setattr(
+        feed.settings, "DATABASE_URL", "sqlite+aiosqlite:///tasks.db"
+    )
+    assert feed_backend() == "memory"
+
+    monkeypatch.setattr(feed.settings, "FEED_BACKEND", "postgres")
+    assert feed_backend() == "postgres"
+
+
+def test_notify_is_enabled_only_for_postgres_feed(monkeypatch):
+    """Тест: триггеры шлют NOTIFY только с соединений брокера postgres"""
+    url = "postgresql+asyncpg://u:p@db/tasks"
+    monkeypatch.setattr(feed.settings, "FEED_BACKEND", "postgres")
+    server_settings = engine_options(url, "primary")["connect_args"][
+        "server_settings"
+    ]
+    assert server_settings[FEED_SETTING] == "on"
+
+    monkeypatch.setattr(feed.settings, "FEED_BACKEND", "memory")
+    server_settings = engine_options(url, "primary")["connect_args"][
+        "server_settings"
+    ]
+    assert FEED_SETTING not in server_settings
@@ -1,13 +1,15 @@
 import pytest
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
 
+from app.common.pagination import decode_cursor, encode_cursor
 from app.models import Task, Status
 from app.services.task_service import TaskService
-from app.exceptions import TaskNotFoundError
+from app.exceptions import TaskNotFoundError, InvalidCursorError
 
 
 @pytest.fixture
@@ -73,6 +75,42 @@ async def test_get_tasks_database_error(mock_db):
         await TaskService.get_tasks(mock_db)
 
 
+@pytest.mark.asyncio
+async def test_get_tasks_keyset_filters(mock_db, sample_task):
+    """Тест фильтров и keyset-пагинации при получении задач"""
+    mock_db.execute.return_value = make_mock_result([sample_task])
+    after = (datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), uuid4())
+
+    await TaskService.get_tasks(
+        mock_db,
+        limit=10,
+        after=after,
+        status=Status.in_progress,
+        title_prefix="50%_",
+    )
+
+    args, _ = mock_db.execute.call_args
+    sql = str(args[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "tasks.status = 'in_progress'" in sql
+    assert "tasks.title LIKE '50/%/_' || '%' ESCAPE '/'" in sql
+    assert "(tasks.created_at, tasks.id) > ('2026-01-02 03:04:05" in sql
+    assert f"'{after[1].hex}')" in sql
+    assert "ORDER BY tasks.created_at, tasks.id" in sql
+    assert "LIMIT 10" in sql
+
+
+def test_cursor_roundtrip():
+    """Тест кодирования и декодирования курсора"""
+    position = (datetime.now(timezone.utc), uuid4())
+    assert decode_cursor(encode_cursor(*position)) == position
+
+
+def test_cursor_invalid():
+    """Тест недопустимого курсора"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
 @pytest.mark.asyncio
 async def test_get_task_success(mock_db, sample_task):
     """Тест успешного получения задачи"""
@@ -0,0 +1,34 @@
+import time
+import uuid
+
+from app.common.ids import uuid7, uuid7_timestamp
+from app.models import new_task_id
+
+
+def test_uuid7_layout():
+    """Тест версии, варианта и метки времени UUIDv7"""
+    before = time.time()
+    value = uuid7()
+    after = time.time()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before - 0.001 <= uuid7_timestamp(value) <= after + 0.001
+    assert uuid.UUID(str(value)) == value
+
+
+def test_uuid7_strictly_increasing():
+    """Тест строгой монотонности UUIDv7 в пределах процесса"""
+    values = [uuid7() for _ in range(20000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_new_task_id_follows_setting(monkeypatch):
+    """Тест выбора версии идентификатора задачи через настройки"""
+    monkeypatch.setattr("app.models.settings.TASK_ID_VERSION", 7)
+    assert new_task_id().version == 7
+
+    monkeypatch.setattr("app.models.settings.TASK_ID_VERSION", 4)
+    assert new_task_id().version == 4
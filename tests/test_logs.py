@@ -0,0 +1,95 @@
+import json
+import logging
+import queue
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.common.logs import (
+    LOG_RECORDS_DROPPED,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    RequestIdFilter,
+    TextFormatter,
+    request_id,
+)
+from app.middleware.request_id import RequestIdMiddleware
+
+
+def make_record(msg="Database error: %s", args=("boom",), level=logging.ERROR):
+    return logging.LogRecord(
+        "app", level, "/app/service.py", 42, msg, args, None
+    )
+
+
+def test_rate_limit_filter_suppresses_repeats():
+    """Тест ограничения повторяющихся ошибок одного места вызова"""
+    now = [0.0]
+    rate_limit = RateLimitFilter(burst=2, window=60, clock=lambda: now[0])
+
+    passed = [rate_limit.filter(make_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert rate_limit.filter(make_record("Other error: %s"))
+    assert rate_limit.filter(make_record(level=logging.INFO))
+
+    now[0] = 61.0
+    record = make_record()
+    assert rate_limit.filter(record)
+    assert record.suppressed == 3
+    assert "[3 similar messages suppressed]" in TextFormatter().format(record)
+
+
+def test_json_formatter_includes_request_id():
+    """Тест JSON-формата с идентификатором запроса"""
+    record = make_record()
+    token = request_id.set("req-1")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "Database error: boom"
+    assert payload["level"] == "ERROR"
+    assert payload["request_id"] == "req-1"
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    """Тест отложенного форматирования и отбрасывания при полной очереди"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped = LOG_RECORDS_DROPPED.value()
+    record = make_record()
+
+    handler.handle(record)
+    handler.handle(make_record())
+
+    queued = handler.queue.get_nowait()
+    assert queued is record
+    assert queued.args == ("boom",)
+    assert LOG_RECORDS_DROPPED.value() == dropped + 1
+
+
+@pytest.mark.asyncio
+async def test_request_id_middleware():
+    """Тест передачи и генерации X-Request-ID"""
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/")
+    async def index():
+        return {"request_id": request_id.get()}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        given = await client.get("/", headers={"X-Request-ID": "abc-123"})
+        generated = await client.get("/")
+
+    assert given.headers["X-Request-ID"] == "abc-123"
+    assert given.json() == {"request_id": "abc-123"}
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert generated.json()["request_id"] == generated.headers["X-Request-ID"]
@@ -0,0 +1,106 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, count_statements, get_read_db
+from app.main import app
+from app.schemas import TaskCreate
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Фикстура с сессией in-memory SQLite"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def create(db, count):
+    return await TaskService.create_tasks(
+        db,
+        [
+            TaskCreate(title=f"Task {i}", description="Description")
+            for i in range(count)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookup_endpoint_returns_found_and_missing(db):
+    """Тест пакетного чтения: найденные задачи и отсутствующие id"""
+    tasks = await create(db, 300)
+    missing = [str(uuid4()) for _ in range(2)]
+    ids = [str(task.id) for task in reversed(tasks)]
+    request = [missing[0], *ids, ids[0], missing[1]]
+    app.dependency_overrides[get_read_db] = lambda: db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            with count_statements() as counter:
+                response = await client.post("/tasks/lookup", json=request)
+            empty = await client.post("/tasks/lookup", json=[])
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [task["id"] for task in body["tasks"]] == ids
+    assert body["tasks"][0] == {
+        "id": ids[0],
+        "title": "Task 299",
+        "description": "Description",
+        "status": 1,
+    }
+    assert body["missing"] == missing
+    assert counter.statements == 1
+    assert empty.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_large_lookup_is_chunked(db):
+    """Тест разбиения большого списка id на запросы по chunk_size"""
+    tasks = await create(db, 25)
+    ids = [task.id for task in tasks] + [uuid4()]
+
+    with count_statements() as counter:
+        rows = await TaskService.get_tasks_by_ids(db, ids, chunk_size=10)
+
+    assert counter.statements == 3
+    assert {row.id for row in rows} == {task.id for task in tasks}
+
+
+@pytest.mark.asyncio
+async def test_lookup_uses_any_array_on_postgresql():
+    """Тест поиска по массиву id одним параметром в PostgreSQL"""
+    db = AsyncMock(spec=AsyncSession)
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value = MagicMock()
+
+    await TaskService.get_tasks_by_ids(db, [uuid4(), uuid4()], 1000)
+
+    statement = db.execute.call_args[0][0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "tasks.id = ANY (%(ids)s::UUID[])" in sql
@@ -0,0 +1,205 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.common.metrics import Counter, Gauge, Histogram, Registry, timed
+from app.database import STATEMENT_DURATION, engine_options
+from app.middleware.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    MetricsMiddleware,
+)
+
+
+def test_counter_and_gauge_render():
+    """Тест вывода счётчика и gauge в формате Prometheus"""
+    registry = Registry()
+    requests = registry.register(
+        Counter("requests_total", "Requests.", labels=("route",))
+    )
+    in_flight = registry.register(Gauge("in_flight", "In flight."))
+    requests.inc(route="/tasks/")
+    requests.inc(2, route="/tasks/")
+    in_flight.set_function(lambda: 3)
+
+    output = registry.render()
+
+    assert "# TYPE requests_total counter" in output
+    assert 'requests_total{route="/tasks/"} 3' in output
+    assert "in_flight 3" in output
+
+
+def test_histogram_buckets_are_cumulative():
+    """Тест накопительных бакетов гистограммы"""
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value)
+
+    output = histogram.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in output
+    assert 'latency_seconds_bucket{le="1"} 3' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in output
+    assert "latency_seconds_count 4" in output
+    assert histogram.count() == 4
+
+
+def test_engine_options_postgres():
+    """Тест параметров пула и asyncpg для PostgreSQL"""
+    options = engine_options(
+        "postgresql+asyncpg://user:password@db:5432/tasks", "primary"
+    )
+
+    assert options["pool_size"] >= 1
+    assert "max_overflow" in options
+    assert "pool_timeout" in options
+    assert "statement_cache_size" in options["connect_args"]
+
+
+def test_engine_options_sqlite_memory():
+    """Тест параметров движка для in-memory SQLite"""
+    options = engine_options("sqlite+aiosqlite://", "primary")
+
+    assert "pool_size" not in options
+    assert "poolclass" not in options
+
+
+@pytest.mark.asyncio
+async def test_timed_counts_calls_and_errors():
+    """Тест замера времени и подсчёта ошибок декоратором timed"""
+    duration = Histogram("call_seconds", "Calls.", labels=("method",))
+    errors = Counter("call_errors_total", "Errors.", labels=("method",))
+
+    @timed(duration, errors, method="work")
+    async def work(fail: bool) -> str:
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    assert await work(False) == "done"
+    with pytest.raises(ValueError):
+        await work(True)
+
+    assert work.__name__ == "work"
+    assert duration.count(method="work") == 2
+    assert errors.value(method="work") == 1
+
+
+@pytest.mark.asyncio
+async def test_timed_async_generator_closed_early():
+    """Тест замера асинхронного генератора при досрочном закрытии"""
+    duration = Histogram("stream_seconds", "Streams.")
+    closed = []
+
+    @timed(duration)
+    async def numbers():
+        try:
+            for number in range(10):
+                yield number
+        finally:
+            closed.append(True)
+
+    stream = numbers()
+    assert await anext(stream) == 0
+    await stream.aclose()
+
+    assert closed == [True]
+    assert duration.count() == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_requests_by_route_template():
+    """Тест меток маршрута по шаблону пути, а не по самому пути"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        assert HTTP_REQUESTS_IN_FLIGHT.value(method="GET") >= 1
+        return {"id": item_id}
+
+    route = "/items/{item_id}"
+    before = HTTP_REQUESTS.value(method="GET", route=route, status=200)
+    observed = HTTP_REQUEST_DURATION.count(method="GET", route=route)
+    unmatched = HTTP_REQUESTS.value(
+        method="GET", route="unmatched", status=404
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        assert (await client.get("/items/1")).status_code == 200
+        assert (await client.get("/items/2")).status_code == 200
+        assert (await client.get("/missing")).status_code == 404
+
+    assert HTTP_REQUESTS.value(method="GET", route=route, status=200) == (
+        before + 2
+    )
+    assert HTTP_REQUEST_DURATION.count(method="GET", route=route) == (
+        observed + 2
+    )
+    assert HTTP_REQUESTS.value(
+        method="GET", route="unmatched", status=404
+    ) == (unmatched + 1)
+    assert HTTP_REQUESTS_IN_FLIGHT.value(method="GET") == 0
+
+
+@pytest.mark.asyncio
+async def test_statement_duration_by_operation():
+    """Тест замера SQL-запросов по типу операции"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    before = STATEMENT_DURATION.count(operation="SELECT")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("  select 2"))
+    await engine.dispose()
+
+    assert STATEMENT_DURATION.count(operation="SELECT") == before + 2
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_include_router_prefix():
+    """Тест меток маршрутов подключённого роутера с префиксом"""
+    router = APIRouter()
+
+    @router.get("/")
+    async def list_items():
+        return []
+
+    @router.get("/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/things")
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/")
+    async def root():
+        return {}
+
+    routes = ("/", "/things/", "/things/{item_id}")
+    before = {
+        route: HTTP_REQUESTS.value(method="GET", route=route, status=200)
+        for route in routes
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        for path in ("/", "/things/", "/things/1"):
+            assert (await client.get(path)).status_code == 200
+
+    for route in routes:
+        assert HTTP_REQUESTS.value(method="GET", route=route, status=200) == (
+            before[route] + 1
+        )
+    assert not HTTP_REQUESTS.value(
+        method="GET", route="/{item_id}", status=200
+    )
@@ -0,0 +1,274 @@
+import json
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app import outbox
+from app.database import OUTBOX_SETTING, Base, engine_options
+from app.models import Status, TaskOutbox, utcnow
+from app.outbox import (
+    OUTBOX_FAILURES,
+    FileSink,
+    OutboxDispatcher,
+    OutboxSink,
+    QueueSink,
+    build_dispatcher,
+)
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Фикстура с фабрикой сессий in-memory SQLite"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    await engine.dispose()
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch, tmp_path):
+    """Фикстура, включающая outbox с файловым приёмником"""
+    monkeypatch.setattr(outbox.settings, "OUTBOX_ENABLED", True)
+    monkeypatch.setattr(outbox.settings, "OUTBOX_SINK", "file")
+    monkeypatch.setattr(
+        outbox.settings, "OUTBOX_FILE_PATH", str(tmp_path / "out.ndjson")
+    )
+
+
+class FailingSink(OutboxSink):
+    """Приёмник, отклоняющий первые ``failures`` пачек"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    async def send(self, events):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        self.sent.extend(events)
+
+
+class Clock:
+    def __init__(self):
+        self.now = utcnow()
+
+    def __call__(self):
+        return self.now
+
+
+async def write_tasks(session_factory):
+    async with session_factory() as db:
+        task = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+        await TaskService.update_task(
+            db,
+            str(task.id),
+            TaskUpdate(
+                title="Task", description="Done", status=Status.completed
+            ),
+        )
+        await TaskService.delete_task(db, str(task.id))
+        await TaskService.create_tasks(
+            db,
+            [TaskCreate(title="Bulk", description="") for _ in range(2)],
+        )
+    return task
+
+
+@pytest.mark.asyncio
+async def test_writes_add_outbox_events(session_factory, outbox_enabled):
+    """Тест записи событий в outbox в транзакциях изменений"""
+    task = await write_tasks(session_factory)
+
+    async with session_factory() as db:
+        rows = (
+            await db.execute(select(TaskOutbox).order_by(TaskOutbox.id))
+        ).scalars().all()
+
+    assert [row.event_type for row in rows] == [
+        "created",
+        "updated",
+        "deleted",
+        "created",
+        "created",
+    ]
+    assert rows[0].task_id == task.id
+    assert rows[1].payload == {
+        "title": "Task",
+        "description": "Done",
+        "status": 3,
+        "version": 2,
+    }
+    assert rows[2].payload is None
+
+
+@pytest.mark.asyncio
+async def test_writes_add_no_events_when_outbox_disabled(
+    session_factory, monkeypatch
+):
+    """Тест: с настройками по умолчанию outbox не растёт"""
+    monkeypatch.setattr(outbox.settings, "OUTBOX_ENABLED", False)
+    monkeypatch.setattr(outbox.settings, "OUTBOX_SINK", "none")
+
+    for _ in range(3):
+        await write_tasks(session_factory)
+
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(TaskOutbox))
+    assert count == 0
+
+    # Включённый outbox без приёмника тоже ничего не копит.
+    monkeypatch.setattr(outbox.settings, "OUTBOX_ENABLED", True)
+    await write_tasks(session_factory)
+
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(TaskOutbox))
+    assert count == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_batches_once(
+    session_factory, outbox_enabled
+):
+    """Тест доставки пачками и отметки доставленных событий"""
+    task = await write_tasks(session_factory)
+    sink = QueueSink()
+    dispatcher = OutboxDispatcher(session_factory, sink, batch_size=3)
+
+    assert await dispatcher.dispatch_batch() == 3
+    assert await dispatcher.dispatch_batch() == 2
+    assert await dispatcher.dispatch_batch() == 0
+
+    events = [sink.queue.get_nowait() for _ in range(sink.queue.qsize())]
+    assert [event["id"] for event in events] == [1, 2, 3, 4, 5]
+    assert events[0]["task_id"] == str(task.id)
+    assert events[2]["type"] == "deleted"
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_with_backoff(
+    session_factory, outbox_enabled
+):
+    """Тест повторной доставки с экспоненциальной задержкой"""
+    await write_tasks(session_factory)
+    clock = Clock()
+    sink = FailingSink(failures=2)
+    dispatcher = OutboxDispatcher(
+        session_factory, sink, retry_base=10, clock=clock
+    )
+    failures = OUTBOX_FAILURES.value()
+
+    assert await dispatcher.dispatch_batch() == 5
+    assert await dispatcher.dispatch_batch() == 0
+    clock.now += timedelta(seconds=11)
+    assert await dispatcher.dispatch_batch() == 5
+    clock.now += timedelta(seconds=11)
+    assert await dispatcher.dispatch_batch() == 0
+    clock.now += timedelta(seconds=10)
+    assert await dispatcher.dispatch_batch() == 5
+
+    assert OUTBOX_FAILURES.value() == failures + 2
+    assert len(sink.sent) == 5
+    async with session_factory() as db:
+        row = await db.get(TaskOutbox, 1)
+    assert row.attempts == 2
+    assert row.last_error == "sink unavailable"
+
+
+@pytest.mark.asyncio
+async def test_compaction_deletes_delivered_rows(
+    session_factory, outbox_enabled
+):
+    """Тест удаления доставленных событий после срока хранения"""
+    await write_tasks(session_factory)
+    clock = Clock()
+    dispatcher = OutboxDispatcher(
+        session_factory,
+        OutboxSink(),
+        batch_size=2,
+        retention=60,
+        clock=clock,
+    )
+    await dispatcher.dispatch_batch()
+
+    assert await dispatcher.compact() == 0
+    clock.now += timedelta(seconds=61)
+    assert await dispatcher.compact() == 2
+    async with session_factory() as db:
+        remaining = await db.scalar(select(func.count(TaskOutbox.id)))
+    assert remaining == 3
+
+
+@pytest.mark.asyncio
+async def test_file_sink_appends_ndjson(tmp_path):
+    """Тест файлового приёмника в формате NDJSON"""
+    sink = FileSink(str(tmp_path / "outbox.ndjson"))
+
+    await sink.send([{"id": 1}, {"id": 2}])
+    await sink.send([{"id": 3}])
+
+    lines = (tmp_path / "outbox.ndjson").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+
+def test_dispatcher_requires_sink(monkeypatch, tmp_path):
+    """Тест: OUTBOX_ENABLED без приёмника — ошибка запуска"""
+    monkeypatch.setattr(outbox.settings, "OUTBOX_SINK", "none")
+    with pytest.raises(RuntimeError, match="OUTBOX_SINK"):
+        build_dispatcher()
+
+    monkeypatch.setattr(outbox.settings, "OUTBOX_SINK", "file")
+    monkeypatch.setattr(
+        outbox.settings, "OUTBOX_FILE_PATH", str(tmp_path / "out.ndjson")
+    )
+    assert isinstance(build_dispatcher().sink, FileSink)
+
+
+def test_outbox_setting_follows_config(monkeypatch, outbox_enabled):
+    """Тест: триггеры PostgreSQL пишут outbox только при включённом outbox"""
+    url = "postgresql+asyncpg://u:p@db/tasks"
+    server_settings = engine_options(url, "primary")["connect_args"][
+        "server_settings"
+    ]
+    assert server_settings[OUTBOX_SETTING] == "on"
+
+    monkeypatch.setattr(outbox.settings, "OUTBOX_ENABLED", False)
+    server_settings = engine_options(url, "primary")["connect_args"][
+        "server_settings"
+    ]
+    assert OUTBOX_SETTING not in server_settings
+
+
+def test_claim_query_skips_locked_rows_on_postgresql():
+    """Тест выборки пачки с FOR UPDATE SKIP LOCKED в PostgreSQL"""
+    dispatcher = OutboxDispatcher(None, OutboxSink(), batch_size=100)
+
+    sql = str(
+        dispatcher._claim_query(utcnow()).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+
+    assert "task_outbox.delivered_at IS NULL" in sql
+    assert "ORDER BY task_outbox.id" in sql
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
@@ -0,0 +1,221 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.requests import Request
+
+from app.cache import MemoryTaskCache
+from app.database import (
+    READ_SESSIONS,
+    REPLICA_EJECTIONS,
+    Base,
+    ReplicaSet,
+    _wants_primary,
+    check_replicas,
+    read_session,
+    warm_up_replicas,
+)
+from app.main import app
+from app.models import Status, Task
+from app.schemas import TaskCreate
+from app.services.task_service import TaskService
+
+
+async def sqlite_engine(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    """Фикстура с основной базой и репликой в двух файлах SQLite"""
+    primary = await sqlite_engine(tmp_path / "primary.db")
+    replica = await sqlite_engine(tmp_path / "replica.db")
+    session_factory = async_sessionmaker(
+        bind=primary, expire_on_commit=False, class_=AsyncSession
+    )
+    replica_set = ReplicaSet({"replica-0": replica})
+    with (
+        patch("app.database.SessionLocal", session_factory),
+        patch("app.database.replicas", replica_set),
+    ):
+        yield session_factory, replica_set
+    await primary.dispose()
+    await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_unless_client_needs_primary(databases):
+    """Тест чтения с реплики и с основной базы после своей записи"""
+    session_factory, _ = databases
+    async with session_factory() as db:
+        task = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+    replica_reads = READ_SESSIONS.value(pool="replica-0")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        from_replica = await client.get("/tasks/")
+        strong = await client.get(
+            "/tasks/", headers={"X-Consistency": "strong"}
+        )
+        created = await client.post(
+            "/tasks/", json={"title": "New", "description": ""}
+        )
+        own_write = await client.get("/tasks/")
+
+    # The replica file never receives the writes.
+    assert from_replica.json() == []
+    assert [t["id"] for t in strong.json()] == [str(task.id)]
+    assert created.status_code == 201
+    assert "primary_until" in created.cookies
+    assert len(own_write.json()) == 2
+    assert READ_SESSIONS.value(pool="replica-0") == replica_reads + 1
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_do_not_fill_the_cache(databases):
+    """Тест: отстающая реплика не записывает задачу в общий кэш"""
+    session_factory, replica_set = databases
+    replica_factory = async_sessionmaker(
+        bind=replica_set.engines["replica-0"],
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+    task_id = uuid4()
+    for factory, title, version in (
+        (replica_factory, "Old", 1),
+        (session_factory, "New", 2),
+    ):
+        async with factory() as db:
+            db.add(
+                Task(
+                    id=task_id,
+                    title=title,
+                    description="",
+                    status=Status.created,
+                    version=version,
+                )
+            )
+            await db.commit()
+    task_cache = MemoryTaskCache(max_entries=10, ttl=60)
+
+    with patch("app.cache.task_cache", task_cache):
+        async with read_session() as db:
+            stale = await TaskService.get_task(db, str(task_id))
+        assert await task_cache.get(task_id) is None
+        async with session_factory() as db:
+            await TaskService.get_task(db, str(task_id))
+
+    assert stale.title == "Old"
+    assert (await task_cache.get(task_id)).title == "New"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_is_ejected_and_restored(tmp_path):
+    """Тест исключения недоступной реплики и возврата после проверки"""
+    good = await sqlite_engine(tmp_path / "good.db")
+    missing_dir = tmp_path / "missing"
+    bad = create_async_engine(f"sqlite+aiosqlite:///{missing_dir}/bad.db")
+    replica_set = ReplicaSet({"good": good, "bad": bad})
+    ejections = REPLICA_EJECTIONS.value(pool="bad")
+
+    await replica_set.check(timeout=1)
+
+    assert [replica_set.choose()[0] for _ in range(3)] == ["good"] * 3
+    assert REPLICA_EJECTIONS.value(pool="bad") == ejections + 1
+    missing_dir.mkdir()
+    await replica_set.check(timeout=1)
+    assert {replica_set.choose()[0] for _ in range(2)} == {"good", "bad"}
+    await good.dispose()
+    await bad.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_connection_ejects_replica_at_once(tmp_path):
+    """Тест исключения реплики при ошибке подключения в запросе"""
+    bad = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}"
+    )
+    replica_set = ReplicaSet({"bad": bad})
+
+    with patch("app.database.replicas", replica_set):
+        async with read_session() as db:
+            with pytest.raises(Exception):
+                await db.execute(text("SELECT 1"))
+        # With every replica ejected, reads fall back to the primary.
+        assert replica_set.choose() is None
+        primary_reads = READ_SESSIONS.value(pool="primary")
+        async with read_session():
+            pass
+        assert READ_SESSIONS.value(pool="primary") == primary_reads + 1
+    await bad.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replicas_are_warmed_with_reads_only(tmp_path):
+    """Тест прогрева реплик: только чтения, недоступная исключается"""
+    good = await sqlite_engine(tmp_path / "good.db")
+    bad = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}"
+    )
+    replica_set = ReplicaSet({"good": good, "bad": bad})
+    statements = []
+
+    @event.listens_for(good.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, many):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    with patch("app.database.replicas", replica_set):
+        await warm_up_replicas(
+            2, lambda db: TaskService.warm_up(db, writes=False)
+        )
+
+        assert statements and set(statements) == {"SELECT"}
+        assert replica_set.healthy == ["good"]
+        assert await check_replicas() is True
+    await good.dispose()
+    await bad.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replicas_are_not_ready_when_all_are_down(tmp_path):
+    """Тест готовности: ни одна реплика не отвечает"""
+    bad = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}"
+    )
+
+    with patch("app.database.replicas", ReplicaSet({"bad": bad})):
+        assert await check_replicas() is False
+    with patch("app.database.replicas", None):
+        assert await check_replicas() is True
+    await bad.dispose()
+
+
+def test_sticky_cookie_is_not_trusted_when_malformed():
+    """Тест: испорченная cookie не направляет чтения на основную базу"""
+
+    def request(cookie):
+        return Request(
+            {
+                "type": "http",
+                "headers": [(b"cookie", cookie.encode())],
+            }
+        )
+
+    assert _wants_primary(request("primary_until=99999999999"))
+    assert not _wants_primary(request("primary_until=1"))
+    assert not _wants_primary(request(f"primary_until={uuid4()}"))
@@ -0,0 +1,176 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from app.common.pagination import decode_cursor, encode_cursor
+from app.database import Base, count_statements, warm_up
+from app.models import Status, Task
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Фикстура с сессией in-memory SQLite"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_task_one_statement(db):
+    """Тест создания задачи за один запрос"""
+    with count_statements() as counter:
+        task = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+
+    assert counter.statements == 1
+    assert task.id is not None
+    assert task.status == Status.created
+
+
+@pytest.mark.asyncio
+async def test_update_task_one_statement(db):
+    """Тест обновления задачи за один запрос"""
+    task = await TaskService.create_task(
+        db, TaskCreate(title="Task", description="Description")
+    )
+
+    with count_statements() as counter:
+        updated = await TaskService.update_task(
+            db,
+            task.id,
+            TaskUpdate(
+                title="Updated", description="New", status=Status.completed
+            ),
+        )
+
+    assert counter.statements == 1
+    assert updated.title == "Updated"
+    assert updated.status == Status.completed
+
+
+@pytest.mark.asyncio
+async def test_delete_task_one_statement(db):
+    """Тест удаления задачи за один запрос"""
+    task = await TaskService.create_task(
+        db, TaskCreate(title="Task", description="Description")
+    )
+
+    with count_statements() as counter:
+        deleted_id = await TaskService.delete_task(db, str(task.id))
+
+    assert counter.statements == 1
+    assert deleted_id == task.id
+    assert await TaskService.get_tasks(db) == []
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_hot_statements_without_changes(db):
+    """Тест прогрева: запросы выполняются, изменения откатываются"""
+    task = await TaskService.create_task(
+        db, TaskCreate(title="Task", description="Description")
+    )
+
+    with count_statements() as counter:
+        await TaskService.warm_up(db)
+
+    assert counter.statements >= 7
+    assert [t.id for t in await TaskService.get_tasks(db)] == [task.id]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_pooled_connections(tmp_path):
+    """Тест прогрева пула: соединения открыты и возвращены в пул"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm_up.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=5,
+    )
+    prepared = []
+
+    async def prepare(session):
+        prepared.append(await session.connection())
+
+    try:
+        await warm_up(3, prepare, bind=engine)
+
+        assert len({id(conn) for conn in prepared}) == 3
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_closes_connections_when_a_connect_fails(tmp_path):
+    """Тест прогрева: при ошибке соединения открытые не утекают"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm_up.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=5,
+    )
+    connects = []
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def fail_first_connect(dbapi_connection, connection_record):
+        connects.append(dbapi_connection)
+        if len(connects) == 1:
+            raise ConnectionError("database unavailable")
+
+    try:
+        with pytest.raises(ConnectionError):
+            await warm_up(5, bind=engine)
+        # Connects still pending when the error was raised must not
+        # check out a connection afterwards.
+        await asyncio.sleep(0.2)
+
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_through_equal_created_at(db):
+    """Тест keyset-пагинации по задачам с одинаковым created_at"""
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tasks = [
+        Task(
+            title=f"Task {i}",
+            description="Description",
+            status=Status.created,
+            created_at=created_at,
+        )
+        for i in range(5)
+    ]
+    db.add_all(tasks)
+    await db.commit()
+
+    seen, after = [], None
+    while True:
+        page = await TaskService.get_tasks(db, limit=2, after=after)
+        if not page:
+            break
+        seen.extend(task.id for task in page)
+        after = decode_cursor(encode_cursor(page[-1].created_at, page[-1].id))
+
+    assert seen == sorted(task.id for task in tasks)
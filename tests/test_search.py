@@ -0,0 +1,123 @@
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app.common.pagination import decode_search_cursor, encode_search_cursor
+from app.database import Base
+from app.models import Status
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Фикстура с сессией in-memory SQLite и таблицей FTS5"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with session_factory() as session:
+        for title, description in (
+            ("Buy milk", "Milk and bread"),
+            ("Write report", "Quarterly report, mention milk prices"),
+            ("Milk the cow", "Milk twice a day"),
+            ("Call mom", "Nothing to search for here"),
+        ):
+            await TaskService.create_task(
+                session, TaskCreate(title=title, description=description)
+            )
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_matches_first(db):
+    """Тест ранжирования: совпадения в заголовке выше"""
+    rows = await TaskService.search_tasks(db, "milk")
+
+    titles = [row.Task.title for row in rows]
+    assert titles[-1] == "Write report"
+    assert set(titles) == {"Buy milk", "Write report", "Milk the cow"}
+    assert [row.rank for row in rows] == sorted(
+        (row.rank for row in rows), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_pages_with_cursor_and_filters_status(db):
+    """Тест пагинации по курсору и фильтра по статусу"""
+    seen, after = [], None
+    while True:
+        rows = await TaskService.search_tasks(db, "milk", limit=1, after=after)
+        if not rows:
+            break
+        seen.append(rows[0].Task.title)
+        after = decode_search_cursor(
+            encode_search_cursor(rows[0].rank, rows[0].Task.id)
+        )
+
+    assert len(seen) == 3
+    assert len(set(seen)) == 3
+    assert (
+        await TaskService.search_tasks(db, "milk", status=Status.completed)
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(db):
+    """Тест синхронизации индекса при изменении и удалении"""
+    report = (await TaskService.search_tasks(db, "quarterly"))[0].Task
+    await TaskService.update_task(
+        db,
+        report.id,
+        TaskUpdate(
+            title="Write memo", description="Annual", status=Status.created
+        ),
+    )
+    cow = (await TaskService.search_tasks(db, "cow"))[0].Task
+    await TaskService.delete_task(db, cow.id)
+
+    assert await TaskService.search_tasks(db, "quarterly") == []
+    assert len(await TaskService.search_tasks(db, "annual")) == 1
+    assert await TaskService.search_tasks(db, "cow") == []
+
+
+@pytest.mark.asyncio
+async def test_search_tolerates_query_syntax(db):
+    """Тест защиты от синтаксиса запросов FTS5 во вводе"""
+    assert len(await TaskService.search_tasks(db, 'milk" (bread*')) == 1
+    assert await TaskService.search_tasks(db, '"*()') == []
+
+
+@pytest.mark.asyncio
+async def test_search_postgresql_uses_tsvector():
+    """Тест запроса PostgreSQL по tsvector с websearch_to_tsquery"""
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_db.get_bind = MagicMock()
+    mock_db.get_bind.return_value.dialect.name = "postgresql"
+    mock_db.execute.return_value = MagicMock()
+
+    await TaskService.search_tasks(mock_db, "milk bread", limit=10)
+
+    args, _ = mock_db.execute.call_args
+    sql = str(args[0].compile(dialect=postgresql.dialect()))
+    assert (
+        "tasks.search_vector @@ websearch_to_tsquery('simple'::regconfig"
+        in sql
+    )
+    assert "ts_rank(tasks.search_vector" in sql
+    assert "DESC, tasks.id" in sql
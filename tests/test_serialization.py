@@ -0,0 +1,32 @@
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.common.serialization import dumps, task_row_to_dict
+from app.models import Task, Status
+from app.schemas import TaskResponse
+
+
+def test_fast_path_matches_response_model():
+    """Тест побайтового совпадения быстрого пути с TaskResponse"""
+    rows = [
+        (
+            uuid4(),
+            "Задача \"1\"",
+            "tab\t ctl\x01 emoji 🎉 \\ /",
+            Status.created,
+            1,
+        ),
+        (uuid4(), "Second", "Line\nbreak ", Status.completed, 7),
+    ]
+    tasks = [
+        Task(id=r[0], title=r[1], description=r[2], status=r[3])
+        for r in rows
+    ]
+
+    expected = JSONResponse(
+        jsonable_encoder([TaskResponse.model_validate(t) for t in tasks])
+    ).body
+
+    assert dumps([task_row_to_dict(row) for row in rows]) == expected
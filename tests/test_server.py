@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app import server
+from app.main import app
+
+
+def test_server_options_production(monkeypatch):
+    """Тест параметров запуска в production-режиме"""
+    monkeypatch.setattr(server.settings, "SERVER_RELOAD", False)
+    monkeypatch.setattr(server.settings, "SERVER_WORKERS", 0)
+
+    options = server.server_options()
+
+    assert options["workers"] >= 1
+    assert "reload" not in options
+    assert options["timeout_graceful_shutdown"] > 0
+
+
+def test_server_options_reload(monkeypatch):
+    """Тест режима разработки с перезагрузкой в одном процессе"""
+    monkeypatch.setattr(server.settings, "SERVER_RELOAD", True)
+    monkeypatch.setattr(server.settings, "SERVER_WORKERS", 8)
+
+    options = server.server_options()
+
+    assert options["reload"] is True
+    assert "workers" not in options
+    assert server.worker_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_up_and_disposes_engine_once():
+    """Тест прогрева при старте и однократного освобождения пула"""
+    with (
+        patch("app.main.shutdown", new_callable=AsyncMock) as shutdown,
+        patch(
+            "app.main.warm_up_worker", AsyncMock(return_value=True)
+        ) as warm_up_worker,
+    ):
+        async with app.router.lifespan_context(app):
+            warm_up_worker.assert_awaited_once()
+            assert app.state.warmed is True
+            shutdown.assert_not_called()
+
+    shutdown.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_readiness_requires_warm_up_and_database():
+    """Тест проверки готовности: прогрев и доступность БД"""
+    transport = httpx.ASGITransport(app=app)
+    app.state.warmed = False
+    with (
+        patch(
+            "app.main.warm_up_worker", AsyncMock(return_value=False)
+        ) as warm_up_worker,
+        patch("app.main.check_db_connection", AsyncMock(return_value=True)),
+    ):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            not_ready = await client.get("/health/ready")
+            warm_up_worker.return_value = True
+            ready = await client.get("/health/ready")
+            live = await client.get("/health/live")
+
+    assert not_ready.status_code == 503
+    assert ready.status_code == 200
+    assert ready.json() == {"status": "ready"}
+    assert live.json() == {"status": "ok"}
+    assert warm_up_worker.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_readiness_requires_a_replica_when_configured():
+    """Тест проверки готовности: при репликах нужна хотя бы одна живая"""
+    transport = httpx.ASGITransport(app=app)
+    app.state.warmed = True
+    with (
+        patch("app.main.check_db_connection", AsyncMock(return_value=True)),
+        patch(
+            "app.main.check_replicas", AsyncMock(return_value=False)
+        ) as check_replicas,
+    ):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            not_ready = await client.get("/health/ready")
+            check_replicas.return_value = True
+            ready = await client.get("/health/ready")
+
+    assert not_ready.status_code == 503
+    assert ready.status_code == 200
@@ -0,0 +1,146 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app.common.singleflight import SingleFlight
+from app.database import Base, count_statements
+from app.exceptions import TaskNotFoundError
+from app.schemas import TaskCreate, TaskUpdate
+from app.services.task_service import TASK_FLIGHTS, TaskService
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Фикстура с фабрикой сессий in-memory SQLite"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    await engine.dispose()
+
+
+class Call:
+    """Вызов, который ждёт разрешения и считает запуски"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        result = self.calls
+        await self.release.wait()
+        return result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_flight():
+    """Тест объединения одновременных вызовов с одним ключом"""
+    flights = SingleFlight("test")
+    call = Call()
+
+    pending = [asyncio.ensure_future(flights.do("a", call)) for _ in range(4)]
+    other = asyncio.ensure_future(flights.do("b", call))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*pending) == [1, 1, 1, 1]
+    assert await other == 2
+    assert call.calls == 2
+    assert flights.coalescing_ratio() == 0.6
+    assert not flights._flights
+
+
+@pytest.mark.asyncio
+async def test_callers_after_invalidation_start_a_new_flight():
+    """Тест: после записи новые вызовы не присоединяются к старому"""
+    flights = SingleFlight("test")
+    call = Call()
+
+    before = [asyncio.ensure_future(flights.do("a", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    flights.invalidate("a")
+    after = asyncio.ensure_future(flights.do("a", call))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*before) == [1, 1]
+    assert await after == 2
+
+
+@pytest.mark.asyncio
+async def test_follower_runs_call_when_leader_is_cancelled():
+    """Тест: отмена ведущего вызова не отменяет ожидающих"""
+    flights = SingleFlight("test")
+    call = Call()
+
+    leader = asyncio.ensure_future(flights.do("a", call))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flights.do("a", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await follower == 2
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_task_runs_one_query(session_factory):
+    """Тест одного запроса к БД на одновременные чтения одной задачи"""
+    async with session_factory() as db:
+        task = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+    sessions = [session_factory() for _ in range(5)]
+    missing_id = str(uuid4())
+
+    with count_statements() as counter:
+        tasks = await asyncio.gather(
+            *(TaskService.get_task(db, str(task.id)) for db in sessions)
+        )
+        missing = await asyncio.gather(
+            *(TaskService.get_task(db, missing_id) for db in sessions[:2]),
+            return_exceptions=True,
+        )
+    for db in sessions:
+        await db.close()
+
+    assert counter.statements == 2
+    assert {t.id for t in tasks} == {task.id}
+    assert all(isinstance(e, TaskNotFoundError) for e in missing)
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_flight_for_the_task(session_factory):
+    """Тест сброса чтения в полёте после изменения задачи"""
+    async with session_factory() as db:
+        task = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+        key = (db.get_bind(), task.id)
+        flight = asyncio.get_running_loop().create_future()
+        TASK_FLIGHTS._flights[key] = flight
+
+        await TaskService.update_task(
+            db,
+            str(task.id),
+            TaskUpdate(title="Done", description="Description", status=1),
+        )
+
+    assert key not in TASK_FLIGHTS._flights
@@ -0,0 +1,152 @@
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, count_statements, get_read_db
+from app.main import app
+from app.models import Status
+from app.schemas import TaskBulkUpdate, TaskCreate, TaskUpdate
+from app.services.stats_service import STATS_DRIFT, StatsService
+from app.services.task_service import TaskService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Фикстура с сессией in-memory SQLite и триггерами счётчиков"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def create(db, count):
+    return await TaskService.create_tasks(
+        db,
+        [
+            TaskCreate(title=f"Task {i}", description="Description")
+            for i in range(count)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_writes_without_extra_statements(db):
+    """Тест обновления счётчиков в транзакциях записи без лишних запросов"""
+    tasks = await create(db, 3)
+    with count_statements() as counter:
+        single = await TaskService.create_task(
+            db, TaskCreate(title="Task", description="Description")
+        )
+        await TaskService.update_task(
+            db,
+            str(single.id),
+            TaskUpdate(
+                title="Task", description="Done", status=Status.completed
+            ),
+        )
+        await TaskService.delete_task(db, str(tasks[0].id))
+    await TaskService.update_tasks(
+        db,
+        [
+            TaskBulkUpdate(
+                id=tasks[1].id,
+                title=None,
+                description=None,
+                status=Status.in_progress,
+            )
+        ],
+    )
+
+    stats = await StatsService.get_stats(db, hours=1)
+
+    assert counter.statements == 3
+    assert stats.by_status == {
+        Status.created: 1,
+        Status.in_progress: 1,
+        Status.completed: 1,
+    }
+    assert stats.total == 3
+    assert len(stats.buckets) == 1
+    assert stats.buckets[0].created == 4
+    assert stats.buckets[0].completed == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_buckets_cover_window_with_zeros(db):
+    """Тест почасовых интервалов: пустые часы заполнены нулями"""
+    stats = await StatsService.get_stats(db, hours=24)
+
+    assert stats.total == 0
+    assert len(stats.buckets) == 24
+    assert all(b.created == 0 and b.completed == 0 for b in stats.buckets)
+    assert stats.buckets[-1].start > stats.buckets[0].start
+
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_drift(db):
+    """Тест фоновой сверки: расхождение счётчиков исправляется"""
+    await create(db, 2)
+    await db.execute(
+        text(
+            "UPDATE task_status_counts SET count = 7 "
+            "WHERE status = 'created'"
+        )
+    )
+    await db.execute(
+        text(
+            "INSERT INTO task_status_counts (status, shard, count) "
+            "VALUES ('completed', 3, 1)"
+        )
+    )
+    await db.commit()
+    drifted = STATS_DRIFT.value(status="created")
+
+    drift = await StatsService.reconcile(db)
+
+    assert drift == {Status.created: -5, Status.completed: -1}
+    assert STATS_DRIFT.value(status="created") == drifted + 5
+    stats = await StatsService.get_stats(db, hours=1)
+    assert stats.by_status[Status.created] == 2
+    assert stats.by_status[Status.completed] == 0
+    assert await StatsService.reconcile(db) == {}
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint(db):
+    """Тест эндпоинта GET /tasks/stats"""
+    await create(db, 2)
+    app.dependency_overrides[get_read_db] = lambda: db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/tasks/stats", params={"hours": 2})
+            too_long = await client.get(
+                "/tasks/stats", params={"hours": 100000}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["by_status"] == {"1": 2, "2": 0, "3": 0}
+    assert body["total"] == 2
+    assert [b["created"] for b in body["buckets"]] == [0, 2]
+    assert too_long.status_code == 422
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
@@ -47,24 +47,27 @@ def sample_task_update():
     )
 
 
-@pytest.fixture
-def patch_get_task(sample_task):
-    """Фикстура для патча метода получения задачи"""
-    with patch.object(
-        TaskService, '_get_task_or_raise', AsyncMock(return_value=sample_task)
-    ) as mock:
-        yield mock
+def make_mock_result(tasks_list):
+    """Helper to mock UPDATE ... RETURNING results."""
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = (
+        tasks_list[0] if tasks_list else None
+    )
+    return mock_result
+
+
+def compile_sql(statement):
+    """Helper to render a statement with literal values."""
+    return str(statement.compile(compile_kwargs={"literal_binds": True}))
 
 
 @pytest.mark.asyncio
-async def test_update_task_success(
-    mock_db, sample_task_update, patch_get_task, sample_task
-):
-    """Тест успешного обновления задачи"""
+async def test_update_task_success(mock_db, sample_task_update, sample_task):
+    """Тест успешного обновления задачи одним запросом"""
     task_id = str(sample_task.id)
-
-    mock_db.commit = AsyncMock()
-    mock_db.refresh = AsyncMock()
+    for key, value in sample_task_update.model_dump().items():
+        setattr(sample_task, key, value)
+    mock_db.execute.return_value = make_mock_result([sample_task])
 
     result = await TaskService.update_task(
         mock_db, task_id, sample_task_update
@@ -74,12 +77,18 @@ async def test_update_task_success(
     assert result.description == sample_task_update.description
     assert result.status == sample_task_update.status
 
+    mock_db.execute.assert_called_once()
+    args, _ = mock_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert sql.startswith("UPDATE tasks SET")
+    assert f"WHERE tasks.id = '{sample_task.id.hex}'" in sql
+    assert "RETURNING" in sql
     mock_db.commit.assert_called_once()
-    mock_db.refresh.assert_called_once_with(sample_task)
+    mock_db.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_update_task_partial(mock_db, sample_task, patch_get_task):
+async def test_update_task_partial(mock_db, sample_task):
     """Тест частичного обновления задачи"""
 
     class TaskUpdatePartial(TaskUpdate):
@@ -89,38 +98,67 @@ async def test_update_task_partial(mock_db, sample_task, patch_get_task):
 
     partial_update = TaskUpdatePartial(title="Partial Update")
     task_id = str(sample_task.id)
-
-    mock_db.commit = AsyncMock()
-    mock_db.refresh = AsyncMock()
+    sample_task.title = "Partial Update"
+    mock_db.execute.return_value = make_mock_result([sample_task])
 
     result = await TaskService.update_task(mock_db, task_id, partial_update)
 
     assert result.title == "Partial Update"
-    assert result.description == sample_task.description
-    assert result.status == sample_task.status
+    args, _ = mock_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert (
+        "SET title='Partial Update', version=(tasks.version + 1), "
+        "updated_at=" in sql
+    )
+    assert "description=" not in sql
+
+
+@pytest.mark.asyncio
+async def test_update_task_skips_null_fields(mock_db, sample_task):
+    """Тест: null в PATCH оставляет поле без изменений, как в пакетном"""
+    update = TaskUpdate(title="Title", description=None)
+    mock_db.execute.return_value = make_mock_result([sample_task])
+
+    await TaskService.update_task(mock_db, str(sample_task.id), update)
+
+    args, _ = mock_db.execute.call_args
+    sql = compile_sql(args[0])
+    assert "SET title='Title', version=(tasks.version + 1)" in sql
+    assert "description=" not in sql
+    assert "status=" not in sql
 
 
 @pytest.mark.asyncio
 async def test_update_task_not_found(mock_db, sample_task_update):
     """Тест обновления несуществующей задачи"""
     task_id = str(uuid4())
+    mock_db.execute.return_value = make_mock_result([])
+
+    with pytest.raises(TaskNotFoundError):
+        await TaskService.update_task(mock_db, task_id, sample_task_update)
 
-    with patch.object(
-        TaskService,
-        '_get_task_or_raise',
-        AsyncMock(side_effect=TaskNotFoundError("Not found")),
-    ):
-        with pytest.raises(TaskNotFoundError):
-            await TaskService.update_task(mock_db, task_id, sample_task_update)
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_task_invalid_uuid(mock_db, sample_task_update):
+    """Тест обновления задачи по недопустимому UUID"""
+    with pytest.raises(TaskNotFoundError):
+        await TaskService.update_task(
+            mock_db, "invalid-uuid", sample_task_update
+        )
+
+    mock_db.execute.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_update_task_database_error(
-    mock_db, sample_task_update, patch_get_task
+    mock_db, sample_task_update, sample_task
 ):
     """Тест ошибки базы данных при обновления задачи"""
-    task_id = str(patch_get_task.return_value.id)
-
+    task_id = str(sample_task.id)
+    mock_db.execute.return_value = make_mock_result([sample_task])
     mock_db.commit = AsyncMock(side_effect=SQLAlchemyError("Database error"))
     mock_db.rollback = AsyncMock()
 
@@ -131,9 +169,7 @@ async def test_update_task_database_error(
 
 
 @pytest.mark.asyncio
-async def test_update_task_partial_database_error(
-    mock_db, sample_task, patch_get_task
-):
+async def test_update_task_partial_database_error(mock_db, sample_task):
     """Тест ошибки базы данных при частичном обновлении задачи"""
 
     class TaskUpdatePartial(TaskUpdate):
@@ -144,7 +180,7 @@ async def test_update_task_partial_database_error(
     partial_update = TaskUpdatePartial(title="Partial Update")
     task_id = str(sample_task.id)
 
-    mock_db.commit = AsyncMock(side_effect=SQLAlchemyError("Database error"))
+    mock_db.execute = AsyncMock(side_effect=SQLAlchemyError("Database error"))
     mock_db.rollback = AsyncMock()
 
     with pytest.raises(SQLAlchemyError):